@@ -1,39 +1,138 @@
 import os
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from flask_socketio import SocketIO, emit, join_room, leave_room
 import random
 import string
 import json
+import logging
 import time  # 添加时间戳支持
 
+import broadcast
+from broadcast import RoomBroadcaster
+from chat import ChatHistory, RateLimiter, WordFilter, load_words
+from delta import TableState
+from metrics import Metrics
+from offload import LoopMonitor
+import logs
+from logs import log_event
+from reaper import RoomReaper
+from sessions import SessionIndex
+from ticker import RoomTicker
+from store import HashRing, create_store, parse_workers
+import wire
+
+# JSON结构化日志，经队列由后台任务写出（级别和采样见 logs.py）
+logs.setup()
+logger = logging.getLogger(__name__)
+
 # 初始化Flask应用
 app = Flask(__name__, static_folder='static', template_folder='templates')
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'poker_secret_key')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 限制上传大小为16MB
 
+# 多进程部署: 房间按一致性哈希分配给工作进程，房间目录放在共享存储里
+WORKER_ID = os.environ.get('WORKER_ID', 'w0')
+WORKERS = parse_workers(os.environ.get('WORKERS'), WORKER_ID)
+ring = HashRing(WORKERS)
+room_store = create_store(os.environ.get('ROOM_STORE'))
+
 # 初始化SocketIO，允许跨域访问，使用eventlet作为异步模式
 socketio = SocketIO(app, 
                    cors_allowed_origins="*", 
                    async_mode='eventlet',
                    ping_timeout=60,
-                   ping_interval=25)
+                   ping_interval=25,
+                   message_queue=os.environ.get('MESSAGE_QUEUE'),
+                   json=broadcast)
+# 之后定义的每个Socket.IO事件处理函数都记录调用数、出错数和耗时，见 /metrics
+metrics = Metrics()
+metrics.instrument(socketio)
 
 # 存储游戏房间信息
 rooms = {}
-# 存储玩家会话ID与用户名的映射
-player_sessions = {}
+# 玩家会话索引: sid <-> 房间/玩家 双向映射
+player_sessions = SessionIndex()
 # 记录上次活动时间，用于清理不活跃的房间
 last_activity = {}
+# 房间广播：同一版本的状态只编码一次
+broadcaster = RoomBroadcaster(socketio, player_sessions.sids)
+# 聊天: 每个连接每秒1条、最多连发5条；敏感词自动机；每个房间保留最近50条给新加入的玩家
+chat_limiter = RateLimiter(rate=1.0, burst=5)
+chat_filter = WordFilter(load_words())
+chat_history = ChatHistory(50)
+# 表情、聊天、离开房间的通知按房间攒起来，每个节拍（默认50毫秒）合成一帧发送
+room_ticker = RoomTicker(lambda event, data, room_id: socketio.emit(event, data, to=room_id),
+                         interval=int(os.environ.get('ROOM_TICK_MS', 50)) / 1000)
+tick_task = None
+log_task = None
+# 事件循环卡顿监测
+loop_monitor = LoopMonitor()
+monitor_task = None
+
+metrics.gauge('poker_active_rooms', 'Rooms on this worker', lambda: len(rooms))
+metrics.gauge('poker_active_hands', 'Rooms with a game in progress',
+              lambda: sum(1 for room in rooms.values() if room['status'] == 'playing'))
+metrics.watch_loop(loop_monitor)
+
+# 清理一个不活跃的房间
+def expire_room(room_id):
+    if room_id not in rooms:
+        return
+    log_event(logger, 'room_expired', room=room_id)
+    del rooms[room_id]
+    room_store.delete(room_id)
+    player_sessions.drop_room(room_id)
+    broadcaster.forget(room_id)
+    chat_history.forget(room_id)
+    room_ticker.forget(room_id)
+    if room_id in last_activity:
+        del last_activity[room_id]
+
+# 按到期时间清理不活跃的房间（1小时不活跃），由后台任务每分钟运行一次
+room_reaper = RoomReaper(3600, last_activity, expire_room)
+reaper_task = None
+
+def ensure_reaper_task():
+    global reaper_task
+    if reaper_task is None:
+        reaper_task = socketio.start_background_task(room_reaper.run, socketio.sleep, 60)
 
-# 定期清理不活跃的房间
-def cleanup_inactive_rooms():
-    current_time = time.time()
-    for room_id in list(rooms.keys()):
-        if current_time - last_activity.get(room_id, current_time) > 3600:  # 1小时不活跃
-            print(f"Cleaning up inactive room: {room_id}")
-            del rooms[room_id]
-            if room_id in last_activity:
-                del last_activity[room_id]
+def ensure_monitor_task():
+    global monitor_task
+    if monitor_task is None:
+        monitor_task = socketio.start_background_task(loop_monitor.run, socketio.sleep)
+
+def ensure_log_task():
+    global log_task
+    if log_task is None:
+        log_task = socketio.start_background_task(logs.handler.run, socketio.sleep)
+
+def ensure_tick_task():
+    global tick_task
+    if tick_task is None:
+        tick_task = socketio.start_background_task(room_ticker.run, socketio.sleep)
+
+# 把房间的目录记录同步到共享存储
+def sync_room(room_id):
+    room_data = rooms[room_id]
+    room_store.put(room_id, {
+        'owner': WORKER_ID,
+        'players': len(room_data['players']),
+        'status': room_data['status'],
+        'settings': room_data['settings']
+    })
+
+# 向房间广播状态差量（状态、玩家列表中变化的部分）；skip_sid 用于刚收到完整状态的新玩家
+def publish_state(room_id, skip_sid=None):
+    room_data = rooms[room_id]
+    delta = room_data['state'].publish({'status': room_data['status']}, room_data['players'])
+    if delta:
+        broadcaster.emit('table_delta', room_id, delta['version'], delta, skip_sid=skip_sid)
+
+# 向单个玩家发送完整状态，同一版本的快照只编码一次
+def send_snapshot(room_id, sid):
+    state = rooms[room_id]['state']
+    broadcaster.emit('table_state', room_id, state.version, state.snapshot, to=sid)
 
 # 主页路由
 @app.route('/')
@@ -43,8 +142,16 @@ def index():
 # 健康检查路由(Render需要)
 @app.route('/health')
 def health_check():
-    cleanup_inactive_rooms()  # 顺便清理不活跃的房间
-    return jsonify({"status": "ok", "active_rooms": len(rooms)})
+    ensure_reaper_task()
+    return jsonify({"status": "ok", "worker": WORKER_ID, "active_rooms": len(rooms),
+                    "total_rooms": len(room_store), "reaper": room_reaper.stats(),
+                    "broadcast": broadcaster.stats(), "ticker": room_ticker.stats(), "logging": logs.stats()})
+
+# Prometheus 文本格式的运行指标
+@app.route('/metrics')
+def get_metrics():
+    ensure_monitor_task()
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 # 错误处理
 @app.errorhandler(404)
@@ -58,56 +165,64 @@ def server_error(e):
 # Socket.IO事件处理
 @socketio.on('connect')
 def handle_connect():
-    print(f'Client connected: {request.sid}')
+    log_event(logger, 'connect', sid=request.sid)
+    ensure_reaper_task()
+    ensure_tick_task()
+    ensure_log_task()
+    ensure_monitor_task()
     emit('connection_success', {'message': 'Successfully connected to server'})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     player_id = request.sid
-    print(f'Client disconnected: {player_id}')
+    log_event(logger, 'disconnect', sid=player_id)
+    broadcaster.drop_sid(player_id)
+    chat_limiter.forget(player_id)
     
-    # 查找玩家所在的房间并处理退出逻辑
-    for room_id, room_data in list(rooms.items()):
-        players = room_data['players']
-        for i, player in enumerate(players):
-            if player.get('id') == player_id:
-                username = player.get('username', 'Unknown')
-                print(f'Player {username} left room {room_id}')
-                
-                # 移除玩家
-                room_data['players'].pop(i)
-                
-                # 更新房间状态
-                if len(room_data['players']) == 0:
-                    # 如果房间空了，删除房间
-                    del rooms[room_id]
-                    if room_id in last_activity:
-                        del last_activity[room_id]
-                    print(f'Room {room_id} deleted (empty)')
-                else:
-                    # 如果房主离开，将房主转给第一个玩家
-                    if room_data['host'] == player_id:
-                        room_data['host'] = room_data['players'][0]['id']
-                        room_data['players'][0]['isHost'] = True
-                        print(f'Host transferred to {room_data["players"][0]["username"]}')
-                    
-                    # 通知房间其他人
-                    emit('player_left', {
-                        'username': username,
-                        'players': room_data['players']
-                    }, to=room_id)
-                    
-                    # 更新房间活动时间
-                    last_activity[room_id] = time.time()
-                
-                # 玩家退出房间
-                leave_room(room_id)
-                
-                # 从玩家会话映射中移除
-                if player_id in player_sessions:
-                    del player_sessions[player_id]
-                    
-                break
+    # 通过会话索引直接定位玩家所在的房间
+    room_id, player = player_sessions.remove(player_id)
+    if room_id is None or room_id not in rooms:
+        return
+
+    room_data = rooms[room_id]
+    username = player.get('username', 'Unknown')
+    log_event(logger, 'leave_room', room=room_id, sid=player_id, username=username)
+    
+    # 移除玩家
+    room_data['players'].remove(player)
+    
+    # 更新房间状态
+    if len(room_data['players']) == 0:
+        # 如果房间空了，删除房间
+        del rooms[room_id]
+        room_store.delete(room_id)
+        player_sessions.drop_room(room_id)
+        room_reaper.discard(room_id)
+        broadcaster.forget(room_id)
+        chat_history.forget(room_id)
+        room_ticker.forget(room_id)
+        if room_id in last_activity:
+            del last_activity[room_id]
+        log_event(logger, 'room_deleted', room=room_id)
+    else:
+        # 如果房主离开，将房主转给第一个玩家
+        if room_data['host'] == player_id:
+            room_data['host'] = room_data['players'][0]['id']
+            room_data['players'][0]['isHost'] = True
+            log_event(logger, 'host_transferred', room=room_id, username=room_data['players'][0]['username'])
+        
+        # 通知房间其他人
+        room_ticker.queue(room_id, 'player_left', {
+            'username': username
+        })
+        sync_room(room_id)
+        publish_state(room_id)
+        
+        # 更新房间活动时间
+        last_activity[room_id] = time.time()
+    
+    # 玩家退出房间
+    leave_room(room_id)
 
 @socketio.on('create_room')
 def create_room(data):
@@ -121,14 +236,11 @@ def create_room(data):
             emit('error', {'message': '用户名长度应在2-20个字符之间'})
             return
             
-        # 如果没有提供房间ID，生成一个
-        if not room_id:
-            room_id = ''.join(random.choice(string.digits) for _ in range(6))
+        # 一个连接只能坐在一个房间里，换房间要先断开；否则旧房间会留下没人能清理的座位
+        if request.sid in player_sessions:
+            emit('error', {'message': '你已经在房间里了'})
+            return
             
-        # 确保房间ID不重复
-        while room_id in rooms:
-            room_id = ''.join(random.choice(string.digits) for _ in range(6))
-        
         # 获取游戏设置并转换为正确类型
         try:
             small_blind = int(data.get('small_blind', 10))
@@ -146,11 +258,17 @@ def create_room(data):
             emit('error', {'message': f'无效的游戏设置: {str(e)}'})
             return
         
+        # 房间ID必须不重复且由本进程负责，否则重新生成；设置检查通过后才在共享存储中占位
+        while not room_id or room_id in rooms or ring.node_for(room_id) != WORKER_ID \
+                or not room_store.claim(room_id, {'owner': WORKER_ID}):
+            room_id = ''.join(random.choice(string.digits) for _ in range(6))
+        
         # 创建新房间
         rooms[room_id] = {
             'players': [],
             'host': request.sid,
             'status': 'waiting',
+            'state': TableState(),
             'created_at': time.time(),
             'settings': {
                 'small_blind': small_blind,
@@ -171,25 +289,29 @@ def create_room(data):
         rooms[room_id]['players'].append(player)
         
         # 记录玩家会话
-        player_sessions[request.sid] = {'username': username, 'room': room_id}
+        player_sessions.add(request.sid, room_id, player)
         
         # 加入Socket.IO房间
         join_room(room_id)
+        sync_room(room_id)
         
-        # 更新房间活动时间
+        # 更新房间活动时间并加入清理队列
         last_activity[room_id] = time.time()
+        room_reaper.schedule(room_id)
         
         # 发送房间创建成功事件
+        publish_state(room_id, skip_sid=request.sid)
         emit('room_created', {
             'room_id': room_id,
             'players': rooms[room_id]['players'],
             'settings': rooms[room_id]['settings']
         })
+        send_snapshot(room_id, request.sid)
         
-        print(f'Room created: {room_id} by {username}')
+        log_event(logger, 'create_room', room=room_id, sid=request.sid, username=username)
         
-    except Exception as e:
-        print(f"Error in create_room: {str(e)}")
+    except Exception:
+        log_event(logger, 'create_room_error', logging.ERROR, exc_info=True, sid=request.sid)
         emit('error', {'message': '创建房间时发生错误'})
 
 @socketio.on('join_room')
@@ -204,14 +326,23 @@ def join_game_room(data):
             emit('error', {'message': '用户名长度应在2-20个字符之间'})
             return
         
+        # 一个连接只能坐在一个房间里，换房间要先断开；否则旧房间会留下没人能清理的座位
+        if request.sid in player_sessions:
+            emit('error', {'message': '你已经在房间里了'})
+            return
+        
         # 检查房间ID
         if not room_id:
             emit('error', {'message': '请输入房间号'})
             return
             
-        # 检查房间是否存在
+        # 检查房间是否存在，由其他工作进程负责时让客户端重连到那里
         if room_id not in rooms:
-            emit('error', {'message': '房间不存在'})
+            owner = ring.node_for(room_id)
+            if owner != WORKER_ID and room_id in room_store:
+                emit('room_redirect', {'room_id': room_id, 'url': WORKERS[owner], 'join': data})
+            else:
+                emit('error', {'message': '房间不存在'})
             return
         
         # 检查游戏是否已开始
@@ -244,30 +375,30 @@ def join_game_room(data):
         rooms[room_id]['players'].append(player)
         
         # 记录玩家会话
-        player_sessions[request.sid] = {'username': username, 'room': room_id}
+        player_sessions.add(request.sid, room_id, player)
         
         # 加入Socket.IO房间
         join_room(room_id)
+        sync_room(room_id)
         
         # 更新房间活动时间
         last_activity[room_id] = time.time()
         
         # 发送加入房间成功事件
+        # 通知房间其他人，新玩家收到完整状态
+        publish_state(room_id, skip_sid=request.sid)
         emit('room_joined', {
             'room_id': room_id,
             'players': rooms[room_id]['players'],
             'settings': rooms[room_id]['settings']
         })
+        send_snapshot(room_id, request.sid)
+        emit('chat_history', {'messages': chat_history.recent(room_id)})
         
-        # 通知房间其他人
-        emit('room_update', {
-            'players': rooms[room_id]['players']
-        }, to=room_id)
-        
-        print(f'Player {username} joined room {room_id}')
+        log_event(logger, 'join_room', room=room_id, sid=request.sid, username=username)
         
-    except Exception as e:
-        print(f"Error in join_room: {str(e)}")
+    except Exception:
+        log_event(logger, 'join_room_error', logging.ERROR, exc_info=True, sid=request.sid)
         emit('error', {'message': '加入房间时发生错误'})
 
 @socketio.on('start_game')
@@ -293,32 +424,35 @@ def start_game(data):
         # 更新房间状态
         rooms[room_id]['status'] = 'playing'
         rooms[room_id]['game_started_at'] = time.time()
+        sync_room(room_id)
         
         # 更新房间活动时间
         last_activity[room_id] = time.time()
         
         # 发送游戏开始事件
-        emit('game_start', {
+        broadcaster.emit_room('game_start', room_id, {
             'players': rooms[room_id]['players'],
             'settings': rooms[room_id]['settings']
-        }, to=room_id)
+        })
+        publish_state(room_id)
         
-        print(f'Game started in room {room_id}')
+        log_event(logger, 'start_game', room=room_id, sid=request.sid)
         
-    except Exception as e:
-        print(f"Error in start_game: {str(e)}")
+    except Exception:
+        log_event(logger, 'start_game_error', logging.ERROR, exc_info=True, sid=request.sid)
         emit('error', {'message': '开始游戏时发生错误'})
 
 # 聊天功能
 @socketio.on('chat_message')
 def handle_chat_message(data):
     try:
-        room_id = data.get('room')
+        # 房间和用户名以服务端会话为准
+        room_id, player = player_sessions.lookup(request.sid)
         message = data.get('message')
-        username = data.get('username')
         
-        if not room_id or not message or not username:
+        if not room_id or not message:
             return
+        username = player['username']
             
         # 检查房间是否存在
         if room_id not in rooms:
@@ -330,8 +464,13 @@ def handle_chat_message(data):
             emit('error', {'message': '消息过长，请限制在200字符以内'})
             return
         
-        # 过滤不适当内容（简单示例）
-        if any(word in message.lower() for word in ['脏话1', '脏话2']):
+        # 发言过快
+        if not chat_limiter.allow(request.sid):
+            emit('error', {'message': '发言太快，请稍后再试'})
+            return
+        
+        # 过滤不适当内容
+        if chat_filter.contains(message):
             emit('error', {'message': '请文明聊天'}, room=request.sid)
             return
         
@@ -341,28 +480,28 @@ def handle_chat_message(data):
         # 更新房间活动时间
         last_activity[room_id] = time.time()
         
-        # 发送消息给房间所有人
-        emit('chat_message', {
+        # 发送消息给房间所有人，并留在房间的最近消息里
+        entry = {
             'username': username,
             'message': message,
             'timestamp': timestamp
-        }, to=room_id)
-        
-        print(f'Chat message in room {room_id}: {username}: {message}')
+        }
+        chat_history.append(room_id, entry)
+        room_ticker.queue(room_id, 'chat_message', entry)
         
-    except Exception as e:
-        print(f"Error in chat_message: {str(e)}")
+    except Exception:
+        log_event(logger, 'chat_message_error', logging.ERROR, exc_info=True, sid=request.sid)
 
 # 处理表情动画
 @socketio.on('send_emoji')
 def handle_emoji(data):
     try:
-        room_id = data.get('room')
+        room_id, player = player_sessions.lookup(request.sid)
         emoji = data.get('emoji')
-        username = data.get('username')
         
-        if not room_id or not emoji or not username:
+        if not room_id or not emoji:
             return
+        username = player['username']
             
         # 检查房间是否存在
         if room_id not in rooms:
@@ -377,13 +516,30 @@ def handle_emoji(data):
         last_activity[room_id] = time.time()
         
         # 发送表情给房间所有人
-        emit('emoji_animation', {
+        room_ticker.queue(room_id, 'emoji_animation', {
             'username': username,
             'emoji': emoji
-        }, to=room_id)
+        })
         
-    except Exception as e:
-        print(f"Error in send_emoji: {str(e)}")
+    except Exception:
+        log_event(logger, 'send_emoji_error', logging.ERROR, exc_info=True, sid=request.sid)
+
+# 客户端选择传输格式，选择 msgpack 时返回标签表
+@socketio.on('set_wire_format')
+def handle_set_wire_format(data):
+    fmt = (data or {}).get('format', wire.JSON)
+    if fmt not in wire.FORMATS:
+        emit('error', {'message': '不支持的传输格式'})
+        return
+    broadcaster.set_format(request.sid, fmt)
+    emit('wire_format', wire.schema() if fmt == wire.MSGPACK else {'format': fmt})
+
+# 客户端发现版本号不连续时请求完整状态
+@socketio.on('request_snapshot')
+def handle_request_snapshot(data=None):
+    room_id = player_sessions.room_of(request.sid)
+    if room_id in rooms:
+        send_snapshot(room_id, request.sid)
 
 # 心跳检测，保持连接活跃
 @socketio.on('ping')
@@ -1,18 +1,41 @@
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session
 from flask_socketio import SocketIO, join_room, leave_room, emit
 from flask_cors import CORS
+import broadcast
 import random
 import logging
 import os
 import string
+import time
 from dotenv import load_dotenv
+from eventlet import tpool
+
+from broadcast import RoomBroadcaster
+from cards import to_wire
+from chat import ChatHistory, RateLimiter, WordFilter, load_words
+from handlog import HandLog
+from game import Player, PokerGame
+from history import HandHistory
+from leaderboard import Leaderboard
+from metrics import Metrics
+from odds import OddsService
+from offload import LoopMonitor, WorkerPool
+from room import Room, Seat, Settings, memory_stats
+from sessions import SessionIndex
+from store import HashRing, create_store, parse_workers
+from ticker import RoomTicker
+from timers import TimingWheel
+import logs
+import wire
+from logs import log_event
 
 # 加载环境变量
 load_dotenv()
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
+# 配置日志: JSON格式，经队列由后台任务写出，级别和采样见 logs.py
+logs.setup()
 logger = logging.getLogger(__name__)
+log_drain_task = None
 
 app = Flask(__name__)
 # 启用CORS
@@ -26,283 +49,195 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # session有效期1小时
 app.config['CORS_HEADERS'] = 'Content-Type'
 
+# 多进程部署: 每个房间由一致性哈希选出的工作进程负责，房间目录放在共享存储里，
+# 跨进程的Socket.IO广播通过消息队列转发。不设置时为单进程内存模式。
+WORKER_ID = os.getenv('WORKER_ID', 'w0')
+WORKERS = parse_workers(os.getenv('WORKERS'), WORKER_ID)
+ring = HashRing(WORKERS)
+room_store = create_store(os.getenv('ROOM_STORE'))
+
 # 配置Socket.IO
 socketio = SocketIO(app, 
                    cors_allowed_origins="*",  # 允许所有来源
                    ping_timeout=60,
                    async_mode='eventlet',
-                   logger=True,
-                   engineio_logger=True)
-
-# 游戏房间
+                   message_queue=os.getenv('MESSAGE_QUEUE'),
+                   json=broadcast,
+                   # 逐个数据包的日志只在排查问题时用 SOCKETIO_LOG=1 打开
+                   logger=os.getenv('SOCKETIO_LOG') == '1',
+                   engineio_logger=os.getenv('SOCKETIO_LOG') == '1')
+# 之后定义的每个Socket.IO事件处理函数都记录调用数、出错数和耗时，见 /metrics
+metrics = Metrics()
+metrics.instrument(socketio)
+
+# 游戏房间: room_id -> Room
 rooms = {}
+# 房间号是5位数字，所有工作进程合计的房间数不会超过号段大小；MAX_ROOMS 为0或更大时按号段限制
+ROOM_ID_SPACE = 90000
+MAX_ROOMS = min(int(os.getenv('MAX_ROOMS', '80000')) or ROOM_ID_SPACE, ROOM_ID_SPACE)
+# 随机找空闲房间号的次数；号段按一致性哈希分给各进程，本进程的号快用完时放弃，按房间已满处理
+ROOM_ID_ATTEMPTS = 200
+# 会话索引: sid <-> 房间/玩家
+sessions = SessionIndex()
+# 所有房间共用的决策计时器，由一个后台任务驱动
+decision_timers = TimingWheel(tick=0.1)
+timer_task = None
+# 摊牌评估和全下胜率交给工作进程（OFFLOAD_WORKERS=0 时在事件循环里直接计算）
+offload_pool = WorkerPool(int(os.getenv('OFFLOAD_WORKERS', '2')))
+# 事件循环卡顿监测
+loop_monitor = LoopMonitor()
+monitor_task = None
+# 胜率查询：翻牌前查表，翻牌后查缓存，未命中时交给工作进程计算
+odds_service = OddsService()
+# 房间广播：同一版本的状态只编码一次
+broadcaster = RoomBroadcaster(socketio, sessions.sids)
+# 聊天: 每个连接每秒1条、最多连发5条；敏感词自动机；每个房间保留最近50条给新加入的玩家
+chat_limiter = RateLimiter(rate=1.0, burst=5)
+chat_filter = WordFilter(load_words())
+chat_history = ChatHistory(50)
+# 聊天按房间攒起来、进出房间的状态按房间合并，每个节拍（默认50毫秒）发一次
+room_ticker = RoomTicker(lambda event, data, room_id: socketio.emit(event, data, to=room_id),
+                         interval=int(os.getenv('ROOM_TICK_MS', '50')) / 1000,
+                         publish=lambda room_id: publish_state(room_id))
+tick_task = None
+
+metrics.gauge('poker_active_rooms', 'Rooms on this worker', lambda: len(rooms))
+metrics.gauge('poker_active_hands', 'Hands in progress',
+              lambda: sum(1 for room in rooms.values() if room.game and not room.game.hand_over))
+metrics.watch_loop(loop_monitor)
+
+# 只分配本进程负责的房间号，并在共享存储中占位；找不到空闲的号时返回None
+def new_room_id():
+    for _ in range(ROOM_ID_ATTEMPTS):
+        room_id = str(random.randint(10000, 10000 + ROOM_ID_SPACE - 1))
+        if room_id not in rooms and ring.node_for(room_id) == WORKER_ID \
+                and room_store.claim(room_id, {'owner': WORKER_ID}):
+            return room_id
+    return None
+
+# 把房间的目录记录同步到共享存储
+def sync_room(room_id):
+    room = rooms.get(room_id)
+    if room is None:
+        room_store.delete(room_id)
+        return
+    room_store.put(room_id, {
+        'owner': WORKER_ID,
+        'players': len(room.seats),
+        'status': room.status,
+        'settings': room.settings.to_dict()
+    })
 
-class Card:
-    def __init__(self, suit, value):
-        self.suit = suit
-        self.value = value
-
-    def to_dict(self):
-        return {
-            'suit': self.suit,
-            'value': self.value
-        }
-
-class Deck:
-    def __init__(self):
-        self.cards = []
-        suits = ['hearts', 'diamonds', 'clubs', 'spades']
-        values = list(range(2, 15))  # 2-14 (14 = A)
-        for suit in suits:
-            for value in values:
-                self.cards.append(Card(suit, value))
-        random.shuffle(self.cards)
-
-    def draw(self, count=1):
-        if count == 1:
-            return self.cards.pop() if self.cards else None
-        return [self.cards.pop() for _ in range(min(count, len(self.cards)))]
-
-class Player:
-    def __init__(self, id, username, avatar, chips):
-        self.id = id
-        self.username = username
-        self.avatar = avatar
-        self.chips = chips
-        self.cards = []
-        self.bet = 0
-        self.folded = False
-        self.all_in = False
-        self.is_host = False
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'avatar': self.avatar,
-            'chips': self.chips,
-            'bet': self.bet,
-            'folded': self.folded,
-            'all_in': self.all_in,
-            'is_host': self.is_host
-        }
-
-class PokerGame:
-    def __init__(self, room_id, settings):
-        self.room_id = room_id
-        self.settings = settings
-        self.players = []
-        self.deck = None
-        self.community_cards = []
-        self.current_player_index = 0
-        self.pot = 0
-        self.current_bet = 0
-        self.small_blind = settings['smallBlind']
-        self.big_blind = settings['bigBlind']
-        self.round = 'pre-flop'  # pre-flop, flop, turn, river
-        self.timer = None
-        self.all_in_rounds = 0
-        self.max_all_in_rounds = settings['maxRounds']
-        self.leaderboard = {
-            'room': [],  # 房间内排行
-            'history': []  # 历史最佳
-        }
-
-    def add_player(self, player):
-        if len(self.players) < self.settings['maxPlayers']:
-            if not self.players:  # 第一个玩家是房主
-                player.is_host = True
-            self.players.append(player)
-            return True
-        return False
-
-    def remove_player(self, player_id):
-        self.players = [p for p in self.players if p.id != player_id]
-        if self.players and not any(p.is_host for p in self.players):
-            self.players[0].is_host = True  # 设置新房主
-
-    def start_game(self):
-        if len(self.players) < 4:
-            return False, "至少需要4名玩家才能开始游戏"
-
-        self.deck = Deck()
-        self.deal_initial_cards()
-        self.setup_blinds()
-        return True, None
-
-    def deal_initial_cards(self):
-        for player in self.players:
-            player.cards = self.deck.draw(2)
-            player.folded = False
-            player.all_in = False
-            player.bet = 0
-
-        self.community_cards = []
-        self.pot = 0
-        self.current_bet = self.big_blind
-        self.round = 'pre-flop'
-
-    def setup_blinds(self):
-        # 小盲注
-        small_blind_player = self.players[1 % len(self.players)]
-        small_blind_player.chips -= self.small_blind
-        small_blind_player.bet = self.small_blind
-        self.pot += self.small_blind
-
-        # 大盲注
-        big_blind_player = self.players[2 % len(self.players)]
-        big_blind_player.chips -= self.big_blind
-        big_blind_player.bet = self.big_blind
-        self.pot += self.big_blind
-
-        # 设置起始玩家（大盲注后面的玩家）
-        self.current_player_index = 3 % len(self.players)
-
-    def get_next_player(self):
-        active_players = [p for p in self.players if not p.folded and not p.all_in]
-        if len(active_players) <= 1:
-            return None
-
-        while True:
-            self.current_player_index = (self.current_player_index + 1) % len(self.players)
-            current_player = self.players[self.current_player_index]
-            if not current_player.folded and not current_player.all_in:
-                return current_player
-
-    def get_available_actions(self, player):
-        actions = ['fold']
-        
-        # 如果当前下注等于玩家已下注，可以看牌
-        if self.current_bet == player.bet:
-            actions.append('check')
-        else:
-            actions.append('call')
-        
-        # 如果玩家还有筹码可以加注
-        if player.chips > 0:
-            actions.append('raise')
-
-        return {
-            'actions': actions,
-            'callAmount': self.current_bet - player.bet if 'call' in actions else 0,
-            'minRaise': self.big_blind,
-            'maxRaise': player.chips
-        }
-
-    def process_action(self, player_id, action, amount=None):
-        player = next((p for p in self.players if p.id == player_id), None)
-        if not player or player_id != self.players[self.current_player_index].id:
-            return False, "不是你的回合"
-
-        if action == 'fold':
-            player.folded = True
-        elif action == 'check':
-            if self.current_bet != player.bet:
-                return False, "当前无法看牌"
-        elif action == 'call':
-            call_amount = self.current_bet - player.bet
-            if call_amount > player.chips:
-                call_amount = player.chips
-                player.all_in = True
-            player.chips -= call_amount
-            player.bet += call_amount
-            self.pot += call_amount
-        elif action == 'raise':
-            if not amount or amount < self.big_blind:
-                return False, "加注金额无效"
-            if amount > player.chips:
-                return False, "筹码不足"
-            player.chips -= amount
-            player.bet += amount
-            self.current_bet = player.bet
-            self.pot += amount
-            if player.chips == 0:
-                player.all_in = True
-
-        # 检查是否需要进入下一轮
-        if self.check_round_complete():
-            self.next_round()
-
-        return True, None
-
-    def check_round_complete(self):
-        active_players = [p for p in self.players if not p.folded and not p.all_in]
-        if len(active_players) <= 1:
-            return True
-
-        # 检查所有未弃牌的玩家是否都已经下注相同金额
-        bet_amounts = set(p.bet for p in active_players)
-        return len(bet_amounts) == 1
-
-    def next_round(self):
-        # 重置玩家下注
-        for player in self.players:
-            player.bet = 0
-        self.current_bet = 0
-
-        if self.round == 'pre-flop':
-            self.round = 'flop'
-            self.community_cards.extend(self.deck.draw(3))
-        elif self.round == 'flop':
-            self.round = 'turn'
-            self.community_cards.append(self.deck.draw())
-        elif self.round == 'turn':
-            self.round = 'river'
-            self.community_cards.append(self.deck.draw())
-        else:
-            self.determine_winner()
-
-        # 设置第一个行动的玩家
-        self.current_player_index = 0
-        while self.players[self.current_player_index].folded:
-            self.current_player_index = (self.current_player_index + 1) % len(self.players)
-
-    def determine_winner(self):
-        active_players = [p for p in self.players if not p.folded]
-        if len(active_players) == 1:
-            winner = active_players[0]
-            winner.chips += self.pot
-            return [{
-                'player': winner,
-                'hand': '其他玩家都弃牌',
-                'winnings': self.pot
-            }]
-
-        # TODO: 实现德州扑克牌型判断逻辑
-        # 这里简化为随机选择赢家
-        winner = random.choice(active_players)
-        winner.chips += self.pot
-        return [{
-            'player': winner,
-            'hand': '随机获胜',
-            'winnings': self.pot
-        }]
-
-    def update_leaderboard(self):
-        # 更新房间排行
-        self.leaderboard['room'] = sorted(
-            [p for p in self.players],
-            key=lambda x: x.chips,
-            reverse=True
-        )
-
-        # 更新历史最佳（这里只存储本局游戏的最高记录）
-        for player in self.players:
-            existing = next((p for p in self.leaderboard['history'] if p.id == player.id), None)
-            if existing:
-                existing.highest_chips = max(existing.highest_chips, player.chips)
-                existing.games_played += 1
-            else:
-                player.highest_chips = player.chips
-                player.games_played = 1
-                self.leaderboard['history'].append(player)
-
-        self.leaderboard['history'].sort(key=lambda x: x.highest_chips, reverse=True)
+# 房间目录在共享存储中，多进程部署时计入所有进程的房间
+def room_limit_reached():
+    return len(room_store) >= MAX_ROOMS
+
+# 房间不在本进程时返回负责它的进程地址
+def room_owner_url(room_id):
+    owner = ring.node_for(room_id)
+    if owner != WORKER_ID and room_id in room_store:
+        return WORKERS[owner]
+    return None
+
+# 手牌日志：设置 HAND_LOG_DIR 后记录所有房间事件，重启时恢复牌桌；多进程部署时每个进程一个子目录
+hand_log = HandLog(os.path.join(os.getenv('HAND_LOG_DIR'), WORKER_ID) if os.getenv('HAND_LOG_DIR') else None,
+                   executor=tpool.execute)
+hand_log_task = None
+
+def ensure_hand_log_task():
+    global hand_log_task
+    if hand_log_task is None:
+        hand_log_task = socketio.start_background_task(hand_log.run, socketio.sleep, rooms_snapshot)
+
+# 记录一条房间事件，由后台任务批量写盘
+def record(room_id, event, data):
+    if not hand_log.enabled:
+        return
+    ensure_hand_log_task()
+    hand_log.append(room_id, event, data)
+
+# 手牌历史：每手结束后写入按列存储的历史库，用于玩家统计和导出
+hand_history = HandHistory(os.path.join(os.getenv('HISTORY_DIR', 'data/history'), WORKER_ID))
+
+# 排行榜：每个房间一个，另有本进程所有房间共用的全局榜；只在开局和每手结算时更新
+global_leaderboard = Leaderboard()
+BOOT_ID = f'{WORKER_ID}-{int(time.time())}'
+
+def new_room(host, settings):
+    return Room(host, Settings.of(settings))
+
+def build_game(room_id, room):
+    game = PokerGame(room_id, room.settings.to_dict())
+    for seat in room.seats:
+        game.add_player(Player(seat.sid, seat.username, seat.avatar, room.settings.initial_chips))
+    update_leaderboards(game)
+    return game
+
+def update_leaderboards(game, settled=False):
+    room = rooms.get(game.room_id)
+    players = [(p.username, p.avatar, p.chips) for p in game.players]
+    if room is not None:
+        room.leaderboard.update(players, settled)
+    global_leaderboard.update(players, settled)
+
+# 推进牌局：返回 (下一位行动的玩家, None)；本手结束时结算并返回 (None, 赢家)
+# run 不为None时摊牌评估通过它执行，等待期间本手不再接受操作，也不能开始下一手
+def advance_game(game, run=None):
+    next_player = game.get_next_player()
+    if next_player:
+        return next_player, None
+    game.timer = None
+    game.hand_over = True
+    game.settling = True
+    try:
+        winners = game.determine_winner(run=run)
+    finally:
+        game.settling = False
+    update_leaderboards(game, settled=True)
+    return None, winners
+
+# 座位换到新的sid（重启后玩家重新连接）
+def rebind_seat(room, old_sid, new_sid):
+    for seat in room.seats:
+        if seat.sid == old_sid:
+            seat.sid = new_sid
+    game = room.game
+    if game:
+        game.rebind(old_sid, new_sid)
+
+# 所有房间的快照，实时对象（TableState、计时器）不保存
+def rooms_snapshot():
+    return {room_id: room.snapshot() for room_id, room in rooms.items()}
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+# 健康检查路由(Render需要)
+@app.route('/health')
+def health_check():
+    return jsonify({
+        'status': 'ok',
+        'worker': WORKER_ID,
+        'active_rooms': len(rooms),
+        'total_rooms': len(room_store),
+        'memory': memory_stats(rooms, MAX_ROOMS),
+        'broadcast': broadcaster.stats(),
+        'ticker': room_ticker.stats(),
+        'hand_log': hand_log.stats(),
+        'hand_history': len(hand_history),
+        'offload': offload_pool.stats(),
+        'odds_cache': odds_service.stats(),
+        'event_loop': loop_monitor.stats(),
+        'logging': logs.stats()
+    })
+
+# Prometheus 文本格式的运行指标
+@app.route('/metrics')
+def get_metrics():
+    ensure_monitor_task()
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/join-room', methods=['POST'])
 def api_join_room():
     data = request.json
@@ -313,27 +248,27 @@ def api_join_room():
         return jsonify({"success": False, "message": "缺少用户名或房间号"})
     
     if room_id not in rooms:
+        url = room_owner_url(room_id)
+        if url is not None:
+            return jsonify({"success": False, "message": "房间在其他服务器上", "redirect": url})
         return jsonify({"success": False, "message": "房间不存在"})
     
     # 检查用户名是否已被使用
-    for player in rooms[room_id]['players']:
-        if player['username'] == username:
-            return jsonify({"success": False, "message": "用户名已被使用"})
+    if rooms[room_id].seat_of(username) is not None:
+        return jsonify({"success": False, "message": "用户名已被使用"})
     
     # 添加玩家到房间
-    new_player = {
-        'username': username,
-        'avatar': data.get('avatar', 'avatar1'),
-        'isHost': False,
-        'sid': request.sid if hasattr(request, 'sid') else username
-    }
+    new_player = Seat(username, data.get('avatar', 'avatar1'), False,
+                      request.sid if hasattr(request, 'sid') else username)
     
-    rooms[room_id]['players'].append(new_player)
+    rooms[room_id].seats.append(new_player)
+    record(room_id, 'join', {'player': new_player.to_dict()})
+    sync_room(room_id)
     
     return jsonify({
         "success": True,
         "room_id": room_id,
-        "players": rooms[room_id]['players']
+        "players": rooms[room_id].players()
     })
 
 @app.route('/api/create-room', methods=['POST'])
@@ -343,33 +278,29 @@ def api_create_room():
     
     if not username:
         return jsonify({"success": False, "message": "缺少用户名"})
-    
     # 生成房间ID
-    room_id = str(random.randint(10000, 99999))
-    while room_id in rooms:
-        room_id = str(random.randint(10000, 99999))
+    room_id = None if room_limit_reached() else new_room_id()
+    if room_id is None:
+        return jsonify({"success": False, "message": "服务器房间数已满，请稍后再试"})
     
     # 创建房间
-    rooms[room_id] = {
-        'players': [{
-            'username': username,
-            'avatar': data.get('avatar', 'avatar1'),
-            'isHost': True,
-            'sid': request.sid if hasattr(request, 'sid') else username
-        }],
-        'settings': {
-            'smallBlind': data.get('smallBlind', 10),
-            'bigBlind': data.get('bigBlind', 20),
-            'initialChips': data.get('initialChips', 1000),
-            'minPlayers': 4,
-            'maxPlayers': 10
-        }
+    host = Seat(username, data.get('avatar', 'avatar1'), True, request.sid if hasattr(request, 'sid') else username)
+    settings = {
+        'smallBlind': data.get('smallBlind', 10),
+        'bigBlind': data.get('bigBlind', 20),
+        'initialChips': data.get('initialChips', 1000),
+        'maxRounds': data.get('maxRounds', 1),
+        'minPlayers': 4,
+        'maxPlayers': 10
     }
+    rooms[room_id] = new_room(host, settings)
+    record(room_id, 'create', {'host': host.to_dict(), 'settings': settings})
+    sync_room(room_id)
     
     return jsonify({
         "success": True,
         "room_id": room_id,
-        "players": rooms[room_id]['players']
+        "players": rooms[room_id].players()
     })
 
 @app.route('/api/leaderboard/<room_id>')
@@ -377,241 +308,605 @@ def get_leaderboard(room_id):
     if room_id not in rooms:
         return jsonify({"success": False, "message": "房间不存在"})
     
-    game = rooms[room_id]
-    game.update_leaderboard()
-    
-    return jsonify({
-        "success": True,
-        "room_leaderboard": [{
-            "username": player.username,
-            "avatar": player.avatar,
-            "chips": player.chips,
-            "net_gain": player.chips - game.settings['initialChips']
-        } for player in game.leaderboard['room']],
-        "history_leaderboard": [{
-            "username": player.username,
-            "avatar": player.avatar,
-            "highest_chips": player.highest_chips,
-            "games_played": player.games_played
-        } for player in game.leaderboard['history']]
-    })
+    room = rooms[room_id]
+    if not room.game:
+        return jsonify({"success": False, "message": "游戏尚未开始"})
+    board = room.leaderboard
+    initial_chips = room.settings.initial_chips
+
+    def build():
+        standings = board.standings(len(board.chips))
+        for entry in standings:
+            entry['net_gain'] = entry['chips'] - initial_chips
+        return {
+            "success": True,
+            "room_leaderboard": standings,
+            "history_leaderboard": board.top(len(board.best))
+        }
+    return leaderboard_response(f'{room_id}-{board.version}', build)
+
+# 本进程所有房间的历史最佳排行：?limit=&offset= 分页，?username= 附带该玩家的名次
+@app.route('/api/leaderboard')
+def get_global_leaderboard():
+    limit = min(request.args.get('limit', 10, type=int), 100)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    username = request.args.get('username')
+
+    def build():
+        data = {"success": True, "total": len(global_leaderboard.best),
+                "leaderboard": global_leaderboard.top(limit, offset)}
+        if username:
+            data['player'] = global_leaderboard.entry(username) if username in global_leaderboard.best else None
+        return data
+    return leaderboard_response(f'global-{global_leaderboard.version}', build)
+
+# 排行榜只在结算时变化：版本号作为ETag，轮询的客户端版本未变时得到304
+def leaderboard_response(version, build):
+    etag = f'{BOOT_ID}-{version}'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/player-stats')
+def get_player_stats():
+    usernames = request.args.getlist('username') or None
+    return jsonify({"success": True, "players": query_player_stats(usernames)})
+
+# 统计查询读内存映射的已写盘数据，在线程里执行，不阻塞事件循环
+def query_player_stats(usernames):
+    hand_history.flush()
+    return tpool.execute(hand_history.player_stats, usernames, False)
+
+# 按房间当前公共牌查胜率：?cards=51,47 为自己的两张手牌（牌编码），
+# ?opponents= 不指定时为房间里其他未弃牌的玩家数
+@app.route('/api/odds/<room_id>')
+def get_odds(room_id):
+    game = rooms[room_id].game if room_id in rooms else None
+    if not game:
+        return jsonify({"success": False, "message": "游戏尚未开始"})
+    try:
+        hole = [int(c) for c in request.args.get('cards', '').split(',')]
+    except ValueError:
+        hole = []
+    board = list(game.community_cards)
+    if len(hole) != 2 or len(set(hole + board)) != len(hole) + len(board) or not all(0 <= c < 52 for c in hole):
+        return jsonify({"success": False, "message": "手牌不正确"})
+    opponents = request.args.get('opponents', type=int) or active_opponents(game)
+    return jsonify(dict(query_odds(game, hole, opponents), success=True))
+
+# 未弃牌的对手数：不知道是谁在查询时减去查询者自己
+def active_opponents(game, player_id=None):
+    active = sum(not p.folded for p in game.players if p.id != player_id)
+    return max(active - (player_id is None), 1)
+
+def query_odds(game, hole, opponents):
+    result = odds_service.lookup(hole, game.community_cards, opponents, offload_pool.run)
+    result.update(opponents=min(opponents, 9), round=game.round)
+    return result
+
+# 逐行流式导出手牌结果（NDJSON），可用 ?username= 只导出一个玩家
+@app.route('/api/history/export')
+def export_history():
+    rows = hand_history.export(request.args.get('username'))
+    return Response((broadcast.dumps(row) + '\n' for row in rows), mimetype='application/x-ndjson')
 
 @socketio.on('connect')
 def handle_connect():
-    logger.info(f'Client connected: {request.sid}')
+    log_event(logger, 'connect', sid=request.sid)
+    ensure_log_drain_task()
+    ensure_monitor_task()
+    ensure_tick_task()
+    offload_pool.start()
     emit('connection_response', {'status': 'connected', 'sid': request.sid})
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    logger.info(f'Client disconnected: {request.sid}')
-    # 从所有房间中移除该玩家
-    for room_id in list(rooms.keys()):
-        room = rooms[room_id]
-        room['players'] = [p for p in room['players'] if p.get('sid') != request.sid]
-        if not room['players']:
-            del rooms[room_id]
-        else:
-            emit('player_list_updated', {'players': room['players']}, to=room_id)
+    log_event(logger, 'disconnect', sid=request.sid)
+    # 通过会话索引直接定位玩家所在的房间
+    broadcaster.drop_sid(request.sid)
+    chat_limiter.forget(request.sid)
+    room_id, player = sessions.remove(request.sid)
+    if room_id is None or room_id not in rooms:
+        return
+
+    room = rooms[room_id]
+    room.seats.remove(player)
+    record(room_id, 'leave', {'sid': request.sid})
+    if not room.seats:
+        del rooms[room_id]
+        sync_room(room_id)
+        sessions.drop_room(room_id)
+        decision_timers.cancel(room_id)
+        broadcaster.forget(room_id)
+        chat_history.forget(room_id)
+        room_ticker.forget(room_id)
+    else:
+        sync_room(room_id)
+        room_ticker.touch(room_id)
 
 @socketio.on('join_room')
 def handle_join_room(data):
     username = data.get('username')
     room_id = data.get('room_id')
-    logger.info(f'Join room request: {username} -> {room_id}')
+    log_event(logger, 'join_room', room=room_id, sid=request.sid, username=username)
+    # 一个连接只能坐在一个房间里，换房间要先断开；否则旧房间会留下没人能清理的座位
+    if request.sid in sessions:
+        emit('error', {'message': '你已经在房间里了'})
+        return
     
     if not room_id in rooms:
-        emit('error', {'message': '房间不存在'})
+        # 房间由其他工作进程负责时让客户端重连到那里
+        url = room_owner_url(room_id)
+        if url is not None:
+            emit('room_redirect', {'room_id': room_id, 'url': url, 'join': data})
+        else:
+            emit('error', {'message': '房间不存在'})
         return
     
     room = rooms[room_id]
-    if len(room['players']) >= room['settings']['maxPlayers']:
-        emit('error', {'message': '房间已满'})
+    # 检查用户名是否已被使用；座位的连接已失效（服务重启）时由同名玩家接管
+    existing = room.seat_of(username)
+    if existing is not None:
+        if existing.sid in sessions:
+            emit('error', {'message': '用户名已被使用'})
+        else:
+            rejoin_seat(room_id, room, existing)
         return
     
-    # 检查用户名是否已被使用
-    if any(p['username'] == username for p in room['players']):
-        emit('error', {'message': '用户名已被使用'})
+    if len(room.seats) >= room.settings.max_players:
+        emit('error', {'message': '房间已满'})
         return
     
     # 添加玩家到房间
-    new_player = {
-        'username': username,
-        'avatar': data.get('avatar', 'avatar1'),
-        'isHost': False,
-        'sid': request.sid
-    }
+    new_player = Seat(username, data.get('avatar', 'avatar1'), False, request.sid)
     
-    room['players'].append(new_player)
+    room.seats.append(new_player)
+    record(room_id, 'join', {'player': new_player.to_dict()})
+    sessions.add(request.sid, room_id, new_player)
     join_room(room_id)
+    sync_room(room_id)
     
+    # 其他人在下一个节拍收到差量；新玩家先收到当前完整状态，再和其他人一起收到这次差量
+    room_ticker.touch(room_id)
     emit('room_joined', {
         'room_id': room_id,
-        'players': room['players'],
-        'settings': room['settings']
+        'players': room.players(),
+        'settings': room.settings.to_dict()
     })
-    emit('player_list_updated', {'players': room['players']}, to=room_id)
+    send_snapshot(room_id, request.sid)
+    emit('chat_history', {'messages': chat_history.recent(room_id)})
+
+# 接管已失效的座位，牌局进行中时补发手牌
+def rejoin_seat(room_id, room, seat):
+    old_sid = seat.sid
+    rebind_seat(room, old_sid, request.sid)
+    record(room_id, 'rebind', {'old': old_sid, 'new': request.sid})
+    sessions.add(request.sid, room_id, seat)
+    join_room(room_id)
+    
+    game = room.game
+    if game and game.timer is not None:
+        current = game.players[game.current_player_index]
+        if current.id == request.sid:
+            # 计时器里记录的是旧的sid
+            remaining = decision_timers.remaining(room_id) or game.decision_time
+            decision_timers.arm(room_id, remaining, handle_turn_timeout, room_id, request.sid)
+    
+    publish_state(room_id, skip_sid=request.sid)
+    emit('room_joined', {
+        'room_id': room_id,
+        'players': room.players(),
+        'settings': room.settings.to_dict()
+    })
+    send_snapshot(room_id, request.sid)
+    emit('chat_history', {'messages': chat_history.recent(room_id)})
+    if game:
+        player = game.player_by_id(request.sid)
+        broadcaster.emit_private_cards('your_cards', [(player.id, player.cards)])
 
 @socketio.on('create_room')
 def handle_create_room(data):
     username = data.get('username')
-    logger.info(f'Create room request from: {username}')
+    log_event(logger, 'create_room', sid=request.sid, username=username)
     
     if not username:
         emit('error', {'message': '缺少用户名'})
         return
-    
+    # 一个连接只能坐在一个房间里，换房间要先断开；否则旧房间会留下没人能清理的座位
+    if request.sid in sessions:
+        emit('error', {'message': '你已经在房间里了'})
+        return
     # 生成房间ID
-    room_id = str(random.randint(10000, 99999))
-    while room_id in rooms:
-        room_id = str(random.randint(10000, 99999))
+    room_id = None if room_limit_reached() else new_room_id()
+    if room_id is None:
+        emit('error', {'message': '服务器房间数已满，请稍后再试'})
+        return
     
     # 创建房间
-    rooms[room_id] = {
-        'players': [{
-            'username': username,
-            'avatar': data.get('avatar', 'avatar1'),
-            'isHost': True,
-            'sid': request.sid
-        }],
-        'settings': {
-            'smallBlind': data.get('smallBlind', 10),
-            'bigBlind': data.get('bigBlind', 20),
-            'initialChips': data.get('initialChips', 1000),
-            'minPlayers': 4,
-            'maxPlayers': 10
-        }
+    host = Seat(username, data.get('avatar', 'avatar1'), True, request.sid)
+    settings = {
+        'smallBlind': data.get('smallBlind', 10),
+        'bigBlind': data.get('bigBlind', 20),
+        'initialChips': data.get('initialChips', 1000),
+        'maxRounds': data.get('maxRounds', 1),
+        'minPlayers': 4,
+        'maxPlayers': 10
     }
+    rooms[room_id] = new_room(host, settings)
+    record(room_id, 'create', {'host': host.to_dict(), 'settings': settings})
     
+    sessions.add(request.sid, room_id, host)
     join_room(room_id)
+    sync_room(room_id)
+    publish_state(room_id, skip_sid=request.sid)
     emit('room_created', {
         'room_id': room_id,
-        'players': rooms[room_id]['players'],
-        'settings': rooms[room_id]['settings']
+        'players': rooms[room_id].players(),
+        'settings': rooms[room_id].settings.to_dict()
     })
+    send_snapshot(room_id, request.sid)
+
+# 房间的公共状态：开始前是等待中的玩家，开始后是牌桌
+def public_state(room):
+    game = room.game
+    if not game:
+        return {'status': 'waiting'}, [{
+            'id': seat.sid,
+            'username': seat.username,
+            'avatar': seat.avatar,
+            'isHost': seat.is_host
+        } for seat in room.seats]
+    return {
+        'status': 'playing',
+        'pot': game.pot,
+        'currentBet': game.current_bet,
+        'round': game.round,
+        'communityCards': to_wire(game.community_cards),
+        'currentPlayer': game.players[game.current_player_index].id if game.timer else None
+    }, [p.to_dict() for p in game.players]
+
+# 向房间广播状态差量；skip_sid 用于刚收到完整状态的新玩家
+# 结算等工作进程、写共享存储时会让出事件循环，期间房间里的人可能都已断线，房间已被删除
+def publish_state(room_id, skip_sid=None):
+    room = rooms.get(room_id)
+    if room is None:
+        return
+    delta = room.state.publish(*public_state(room))
+    if delta:
+        broadcaster.emit('table_delta', room_id, delta['version'], delta, skip_sid=skip_sid)
+
+# 向单个玩家发送完整状态，同一版本的快照只编码一次
+def send_snapshot(room_id, sid):
+    state = rooms[room_id].state
+    broadcaster.emit('table_state', room_id, state.version, state.snapshot, to=sid)
+
+# 客户端选择传输格式，选择 msgpack 时返回标签表
+@socketio.on('set_wire_format')
+def handle_set_wire_format(data):
+    fmt = (data or {}).get('format', wire.JSON)
+    if fmt not in wire.FORMATS:
+        emit('error', {'message': '不支持的传输格式'})
+        return
+    broadcaster.set_format(request.sid, fmt)
+    emit('wire_format', wire.schema() if fmt == wire.MSGPACK else {'format': fmt})
+
+# 客户端发现版本号不连续时请求完整状态
+@socketio.on('request_snapshot')
+def handle_request_snapshot(data=None):
+    room_id = sessions.room_of(request.sid)
+    if room_id in rooms:
+        send_snapshot(room_id, request.sid)
 
 @socketio.on('start_game')
 def handle_start_game(data):
     room_id = data.get('room_id')
-    logger.info(f'Start game request for room: {room_id}')
+    log_event(logger, 'start_game', room=room_id, sid=request.sid)
     
     if not room_id in rooms:
         emit('error', {'message': '房间不存在'})
         return
     
     room = rooms[room_id]
+    if room.game and room.game.settling:
+        emit('error', {'message': '上一手正在结算'})
+        return
     
     # 检查玩家数量是否满足最低要求
-    if len(room['players']) < room['settings']['minPlayers']:
-        emit('error', {'message': f'至少需要{room["settings"]["minPlayers"]}名玩家才能开始游戏'})
+    if len(room.seats) < room.settings.min_players:
+        emit('error', {'message': f'至少需要{room.settings.min_players}名玩家才能开始游戏'})
         return
     
-    # 创建扑克牌
-    suits = ['♥', '♦', '♠', '♣']
-    ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-    deck = [{'suit': suit, 'rank': rank} for suit in suits for rank in ranks]
-    
-    # 洗牌
-    random.shuffle(deck)
-    
-    # 为玩家发牌
-    players = room['players']
-    for player in players:
-        player['cards'] = [deck.pop() for _ in range(2)]
-        player['chips'] = room['settings']['initialChips']
-    
-    # 发公共牌
-    community_cards = [deck.pop() for _ in range(5)]
-    
-    # 创建游戏状态
-    room['game_state'] = {
-        'deck': deck,
-        'community_cards': community_cards,
-        'current_stage': 'pre-flop',  # pre-flop, flop, turn, river
-        'pot': 0,
-        'current_player_index': 0,
-        'small_blind': room['settings']['smallBlind'],
-        'big_blind': room['settings']['bigBlind']
-    }
+    # 创建游戏并发牌、下盲注
+    game = build_game(room_id, room)
+    success, error = game.start_game()
+    if not success:
+        emit('error', {'message': error})
+        return
+    room.game = game
+    record(room_id, 'start', {'seed': game.seed})
+    sync_room(room_id)
     
-    # 发送游戏开始事件
-    emit('game_start', {
+    # 发送游戏开始事件（手牌只单独发给本人）
+    broadcaster.emit_room('game_start', room_id, {
         'players': [{
-            'username': p['username'],
-            'avatar': p['avatar'],
-            'isHost': p['isHost'],
-            'chips': p['chips'],
-            # 只发送当前玩家的卡牌信息
-            'cards': p['cards'] if p['sid'] == request.sid else []
-        } for p in players],
+            'username': p.username,
+            'avatar': p.avatar,
+            'isHost': p.is_host,
+            'chips': p.chips,
+            'cards': []
+        } for p in game.players],
         'community_cards': [],  # 游戏开始时不显示公共牌
-        'current_stage': 'pre-flop',
-        'pot': 0,
-        'small_blind': room['settings']['smallBlind'],
-        'big_blind': room['settings']['bigBlind']
-    }, to=room_id)
+        'current_stage': game.round,
+        'pot': game.pot,
+        'small_blind': game.small_blind,
+        'big_blind': game.big_blind
+    })
     
-    # 向每个玩家单独发送他们的牌
-    for player in players:
-        emit('your_cards', {
-            'cards': player['cards']
-        }, to=player['sid'])
+    # 先编码所有玩家的手牌，再逐个单独发送
+    broadcaster.emit_private_cards('your_cards', [(p.id, p.cards) for p in game.players])
+
+    start_turn(room_id, game, game.players[game.current_player_index])
+
+def ensure_timer_task():
+    global timer_task
+    if timer_task is None:
+        timer_task = socketio.start_background_task(decision_timers.run, socketio.sleep)
+
+def ensure_tick_task():
+    global tick_task
+    if tick_task is None:
+        tick_task = socketio.start_background_task(room_ticker.run, socketio.sleep)
+
+def ensure_log_drain_task():
+    global log_drain_task
+    if log_drain_task is None:
+        log_drain_task = socketio.start_background_task(logs.handler.run, socketio.sleep)
+
+# HTTP接口不经过 connect，第一个请求时同样启动日志写出任务
+@app.before_request
+def start_log_drain():
+    ensure_log_drain_task()
+
+def ensure_monitor_task():
+    global monitor_task
+    if monitor_task is None:
+        monitor_task = socketio.start_background_task(loop_monitor.run, socketio.sleep)
+
+# 通知轮到的玩家并开始计时
+def start_turn(room_id, game, player):
+    game.timer = time.time() + game.decision_time
+    ensure_timer_task()
+    decision_timers.arm(room_id, game.decision_time, handle_turn_timeout, room_id, player.id)
+    publish_state(room_id)
+    broadcaster.emit_room('player_turn', room_id, {
+        'playerId': player.id,
+        'availableActions': game.get_available_actions(player),
+        'deadline': game.timer,
+        'timeBank': player.time_bank
+    })
+
+# 决策超时：能看牌则自动看牌，否则自动弃牌
+def handle_turn_timeout(room_id, player_id):
+    room = rooms.get(room_id)
+    game = room.game if room else None
+    if not game or game.players[game.current_player_index].id != player_id:
+        return
+
+    player = game.players[game.current_player_index]
+    action = 'check' if game.current_bet == player.bet else 'fold'
+    success, _ = game.process_action(player_id, action)
+    if success:
+        record(room_id, 'action', {'sid': player_id, 'action': action})
+        broadcaster.emit_room('auto_action', room_id, {'playerId': player_id, 'action': action})
+        # 结算可能要等工作进程，不占用计时器协程
+        socketio.start_background_task(broadcast_action_result, room_id, game)
+
+def broadcast_action_result(room_id, game):
+    # 如果游戏还在继续，通知下一个玩家；状态差量随回合开始或游戏结束一起发送
+    next_player, winners = advance_game(game, offload_pool.run)
+    if next_player:
+        start_turn(room_id, game, next_player)
+    else:
+        # 游戏结束，显示结果
+        decision_timers.cancel(room_id)
+        publish_state(room_id)
+        record_history(game, winners)
+        broadcaster.emit_room('game_over', room_id, {
+            'winners': [{
+                'username': w['player'].username,
+                'avatar': w['player'].avatar,
+                'hand': w['hand'],
+                'winnings': w['winnings']
+            } for w in winners],
+            # 摊牌时所有玩家的牌型和名次
+            'showdown': [{
+                'username': r['player'].username,
+                'cards': to_wire(r['player'].cards),
+                'hand': r['hand'],
+                'category': r['category'],
+                'place': r['place']
+            } for r in game.showdown_results],
+            # 全下时的胜率和多轮发牌结果
+            'equity': [{
+                'username': e['player'].username,
+                'equity': e['equity']
+            } for e in game.all_in_equity],
+            'runouts': [{
+                'community_cards': to_wire(run['community_cards']),
+                'winners': [r['player'].username for r in run['results'] if r['place'] == 1]
+            } for run in game.runouts],
+            'pots': [{
+                'amount': pot['amount'],
+                'players': [p.username for p in pot['players']]
+            } for pot in game.side_pots]
+        })
+
+def record_history(game, winners):
+    won = {}
+    for w in winners:
+        won[w['player'].id] = won.get(w['player'].id, 0) + w['winnings']
+    hand_history.record_hand(time.time(), game.big_blind, sum(p.total_bet for p in game.players),
+                             [(p.username, p.total_bet, won.get(p.id, 0)) for p in game.players],
+                             game.actions)
 
 @socketio.on('player_action')
 def handle_player_action(data):
-    room_id = data['roomId']
+    room_id = sessions.room_of(request.sid)
     if room_id not in rooms:
         emit('error_message', {'message': '房间不存在'})
         return
 
-    game = rooms[room_id]
+    game = rooms[room_id].game
+    if not game:
+        emit('error_message', {'message': '游戏尚未开始'})
+        return
+
     success, error = game.process_action(request.sid, data['action'], data.get('amount'))
     
     if not success:
         emit('error_message', {'message': error})
         return
 
-    # 发送游戏状态更新
-    emit('action_result', {
-        'players': [p.to_dict() for p in game.players],
-        'pot': game.pot,
-        'currentBet': game.current_bet,
-        'round': game.round
-    }, room=room_id)
+    record(room_id, 'action', {'sid': request.sid, 'action': data['action'], 'amount': data.get('amount')})
+    broadcast_action_result(room_id, game)
 
-    # 如果游戏还在继续，通知下一个玩家
-    next_player = game.get_next_player()
-    if next_player:
-        emit('player_turn', {
-            'playerId': next_player.id,
-            'availableActions': game.get_available_actions(next_player)
-        }, room=room_id)
-    else:
-        # 游戏结束，显示结果
-        winners = game.determine_winner()
-        emit('game_over', {
-            'winners': [{
-                'username': w['player'].username,
-                'avatar': w['player'].avatar,
-                'hand': w['hand'],
-                'winnings': w['winnings']
-            } for w in winners]
-        }, room=room_id)
+# 使用时间银行延长当前决策时间
+@socketio.on('use_time_bank')
+def handle_use_time_bank(data=None):
+    room_id = sessions.room_of(request.sid)
+    game = rooms[room_id].game if room_id in rooms else None
+    if not game:
+        return
+
+    player = game.players[game.current_player_index]
+    if player.id != request.sid or player.time_bank <= 0:
+        emit('error_message', {'message': '无法使用时间银行'})
+        return
+
+    remaining = decision_timers.extend(room_id, player.time_bank)
+    if remaining is None:
+        return
+    game.timer += player.time_bank
+    player.time_bank = 0
+    record(room_id, 'time_bank', {'sid': player.id})
+    emit('time_bank_used', {
+        'playerId': player.id,
+        'deadline': game.timer,
+        'remaining': remaining
+    }, to=room_id)
 
 @socketio.on('chat_message')
 def handle_chat_message(data):
-    room_id = data['roomId']
-    if room_id not in rooms:
+    room_id, player = sessions.lookup(request.sid)
+    message = data.get('message')
+    if room_id not in rooms or not message:
         return
-
-    game = rooms[room_id]
-    player = next((p for p in game.players if p.id == request.sid), None)
-    if not player:
+    if len(message) > 200:
+        emit('error_message', {'message': '消息过长，请限制在200字符以内'})
+        return
+    if not chat_limiter.allow(request.sid):
+        emit('error_message', {'message': '发言太快，请稍后再试'})
+        return
+    if chat_filter.contains(message):
+        emit('error_message', {'message': '请文明聊天'})
         return
 
-    emit('chat_message', {
+    # 发送给房间所有人，并留在房间的最近消息里
+    entry = {
         'username': player.username,
-        'message': data['message']
-    }, room=room_id)
+        'message': message,
+        'timestamp': int(time.time() * 1000)
+    }
+    chat_history.append(room_id, entry)
+    room_ticker.queue(room_id, 'chat_message', entry)
+
+# 房间内玩家的历史统计（VPIP/PFR/AF/胜率），与牌桌上的实时筹码统计分开
+@socketio.on('request_hand_stats')
+def handle_request_hand_stats(data=None):
+    room_id = sessions.room_of(request.sid)
+    if room_id not in rooms:
+        return
+    usernames = [seat.username for seat in rooms[room_id].seats]
+    emit('hand_stats', {'players': query_player_stats(usernames)})
+
+# 自己手牌在当前公共牌下对其他未弃牌玩家的胜率
+@socketio.on('request_odds')
+def handle_request_odds(data=None):
+    room_id, player = sessions.lookup(request.sid)
+    game = rooms[room_id].game if room_id in rooms else None
+    if not game:
+        return
+    seat = game.player_by_id(request.sid)
+    if seat is None or len(seat.cards) != 2 or seat.folded:
+        return
+    emit('hand_odds', query_odds(game, seat.cards, active_opponents(game, seat.id)))
+
+# 重放一条手牌日志记录：与实时处理走同样的状态修改，但不发送消息；
+# game.timer 只用来标记有人等待行动，恢复完成后重新计时
+def replay_event(room_id, event, data):
+    if event == 'create':
+        rooms[room_id] = new_room(Seat.from_dict(data['host']), data['settings'])
+        return
+    room = rooms.get(room_id)
+    if room is None:
+        return
+    game = room.game
+    if event == 'join':
+        room.seats.append(Seat.from_dict(data['player']))
+    elif event == 'leave':
+        room.seats = [seat for seat in room.seats if seat.sid != data['sid']]
+        if not room.seats:
+            del rooms[room_id]
+    elif event == 'rebind':
+        rebind_seat(room, data['old'], data['new'])
+    elif event == 'start':
+        game = build_game(room_id, room)
+        game.start_game(data['seed'])
+        game.timer = time.time()
+        room.game = game
+    elif event == 'action' and game:
+        success, _ = game.process_action(data['sid'], data['action'], data.get('amount'))
+        if success and advance_game(game)[0]:
+            game.timer = time.time()
+    elif event == 'time_bank' and game:
+        for player in game.players:
+            if player.id == data['sid']:
+                player.time_bank = 0
+
+# 启动时从最新快照和其后的日志恢复房间，进行中的牌局重新开始当前玩家的计时
+def restore_rooms():
+    state, records = hand_log.recover()
+    for room_id, data in state.items():
+        seats = [Seat.from_dict(player) for player in data['players']]
+        room = new_room(seats[0], data['settings'])
+        room.seats = seats
+        if data['game']:
+            room.game = PokerGame.from_state(data['game'])
+        rooms[room_id] = room
+    for room_id, event, data in records:
+        replay_event(room_id, event, data)
+
+    for room_id, room in rooms.items():
+        sync_room(room_id)
+        game = room.game
+        if game and game.timer is not None:
+            game.timer = time.time() + game.decision_time
+            player = game.players[game.current_player_index]
+            decision_timers.arm(room_id, game.decision_time, handle_turn_timeout, room_id, player.id)
+            ensure_timer_task()
+    # 恢复后立即生成快照，之后的记录写入新的日志段
+    hand_log.checkpoint(rooms_snapshot())
+    return len(state), len(records)
+
+if hand_log.enabled:
+    start = time.perf_counter()
+    snapshot_rooms, replayed = restore_rooms()
+    log_event(logger, 'recovered', rooms=len(rooms), snapshot_rooms=snapshot_rooms, log_records=replayed,
+              seconds=round(time.perf_counter() - start, 2))
 
 if __name__ == '__main__':
     socketio.run(app, host='0.0.0.0', debug=True, allow_unsafe_werkzeug=True) 
\ No newline at end of file
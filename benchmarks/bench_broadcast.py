@@ -0,0 +1,84 @@
+import json
+import time
+
+import broadcast
+from benchmarks.bench_delta import public_state, table
+from broadcast import RoomBroadcaster
+from cards import to_wire
+from delta import TableState
+
+# 广播编码基准测试: 10人牌桌的快照请求和私有手牌帧，每次重新编码与按版本缓存的对比
+# 运行: python -m benchmarks.bench_broadcast
+
+
+# 只做Socket.IO打包时的JSON编码，不实际发送
+class EncodeOnly:
+    def __init__(self, dumps):
+        self.dumps = dumps
+        self.bytes = 0
+
+    def emit(self, event, data, to=None, skip_sid=None):
+        self.bytes += len(self.dumps([event, data]))
+
+
+def bench_snapshots(requests, versions):
+    game = table()
+    state = TableState()
+    state.publish(*public_state(game))
+
+    plain = EncodeOnly(json.dumps)
+    start = time.perf_counter()
+    for i in range(requests):
+        if i % (requests // versions) == 0:
+            game.pot += 10
+            state.publish(*public_state(game))
+        plain.emit('table_state', state.snapshot(), to='sid')
+    plain_time = time.perf_counter() - start
+
+    socket = EncodeOnly(broadcast.dumps)
+    broadcaster = RoomBroadcaster(socket)
+    start = time.perf_counter()
+    for i in range(requests):
+        if i % (requests // versions) == 0:
+            game.pot += 10
+            state.publish(*public_state(game))
+        broadcaster.emit('table_state', 'bench', state.version, state.snapshot, to='sid')
+    cached_time = time.perf_counter() - start
+
+    print(f'快照请求 {requests} 次 / {versions} 个版本:')
+    print(f'  每次编码: {plain_time / requests * 1e6:.1f} 微秒/次')
+    print(f'  按版本缓存: {cached_time / requests * 1e6:.1f} 微秒/次, 命中率 {broadcaster.stats()["hit_rate"]:.1%}')
+
+
+def bench_private_cards(deals):
+    game = table()
+    hands = [(p.id, p.cards) for p in game.players]
+
+    plain = EncodeOnly(json.dumps)
+    start = time.perf_counter()
+    for _ in range(deals):
+        for sid, cards in hands:
+            plain.emit('your_cards', {'cards': to_wire(cards)}, to=sid)
+    plain_time = time.perf_counter() - start
+
+    socket = EncodeOnly(broadcast.dumps)
+    broadcaster = RoomBroadcaster(socket)
+    start = time.perf_counter()
+    for _ in range(deals):
+        broadcaster.emit_private_cards('your_cards', hands)
+    cached_time = time.perf_counter() - start
+
+    assert [json.loads(socket.dumps(['your_cards', broadcast.cards_payload(c)]))[1] for _, c in hands] == \
+        [{'cards': to_wire(c)} for _, c in hands]
+    print(f'发牌 {deals} 次 (10名玩家):')
+    print(f'  每次编码: {plain_time / deals * 1e6:.1f} 微秒/次')
+    print(f'  预编码拼接: {cached_time / deals * 1e6:.1f} 微秒/次')
+
+
+def main():
+    bench_snapshots(50_000, 500)
+    bench_private_cards(20_000)
+
+
+if __name__ == '__main__':
+    main()
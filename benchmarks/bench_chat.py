@@ -0,0 +1,57 @@
+import random
+import time
+
+from chat import ChatHistory, RateLimiter, WordFilter
+
+# 聊天处理基准测试: 1万个敏感词时Aho–Corasick自动机与逐词查找的每条消息耗时（结果必须一致），
+# 以及令牌桶限速、最近消息缓冲的每条消息开销
+# 运行: python -m benchmarks.bench_chat
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz的一是不了人我在有他这中大来上国个到说们为子'
+
+
+def random_text(rng, low, high):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(low, high)))
+
+
+def timed(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items)
+
+
+def main(words=10_000, messages=5_000, seed=0):
+    rng = random.Random(seed)
+    banned = list({random_text(rng, 4, 8) for _ in range(words)})
+    start = time.perf_counter()
+    word_filter = WordFilter(banned)
+    build = time.perf_counter() - start
+
+    texts = [random_text(rng, 10, 200) for _ in range(messages)]
+    # 一部分消息夹带敏感词，大小写混合
+    for i in range(0, messages, 10):
+        word = rng.choice(banned)
+        cut = rng.randrange(len(texts[i]))
+        texts[i] = texts[i][:cut] + word.upper() + texts[i][cut:]
+
+    def naive(message):
+        return any(word in message.lower() for word in banned)
+
+    expected = [naive(t) for t in texts]
+    assert [word_filter.contains(t) for t in texts] == expected
+    print(f'{len(banned)} 个敏感词, 自动机构建 {build * 1e3:.0f} 毫秒, {sum(expected)} 条消息命中')
+    print(f'  逐词查找: {timed(naive, texts[:500]) * 1e6:.0f} 微秒/条')
+    print(f'  自动机: {timed(word_filter.contains, texts) * 1e6:.1f} 微秒/条')
+
+    limiter = RateLimiter(rate=1.0, burst=5)
+    sids = [f'sid{i}' for i in range(1000)]
+    print(f'  令牌桶限速: {timed(limiter.allow, [rng.choice(sids) for _ in range(100_000)]) * 1e6:.2f} 微秒/条')
+    history = ChatHistory(50)
+    entry = {'username': 'u', 'message': 'hi', 'timestamp': 0}
+    rooms = [str(rng.randrange(1000)) for _ in range(100_000)]
+    print(f'  最近消息缓冲: {timed(lambda room: history.append(room, entry), rooms) * 1e6:.2f} 微秒/条')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import json
+import random
+import time
+
+from app_simple import Player, PokerGame
+from cards import to_wire
+from delta import TableState
+
+# 状态广播基准测试: 10人牌桌每次操作的完整状态与差量的大小和编码耗时
+# 运行: python -m benchmarks.bench_delta
+
+
+def table(players=10):
+    game = PokerGame('bench', {'smallBlind': 10, 'bigBlind': 20, 'maxRounds': 1, 'maxPlayers': 10})
+    for i in range(players):
+        game.add_player(Player(f'sid-{i:02d}-abcdefghijklmnop', f'player{i}', 'avatar1', 1000))
+    game.start_game()
+    return game
+
+
+def full_state(game):
+    return {
+        'players': [p.to_dict() for p in game.players],
+        'pot': game.pot,
+        'currentBet': game.current_bet,
+        'round': game.round
+    }
+
+
+def public_state(game):
+    return {
+        'pot': game.pot,
+        'currentBet': game.current_bet,
+        'round': game.round,
+        'communityCards': to_wire(game.community_cards),
+        'currentPlayer': game.players[game.current_player_index].id
+    }, [p.to_dict() for p in game.players]
+
+
+def main(actions=20_000, seed=0):
+    rng = random.Random(seed)
+    game = table()
+    state = TableState()
+    state.publish(*public_state(game))
+
+    full_bytes = delta_bytes = 0
+    full_time = delta_time = 0.0
+    for _ in range(actions):
+        # 模拟一次下注: 一名玩家筹码和下注变化，底池变化，轮到下一个人
+        player = game.players[game.current_player_index]
+        amount = rng.choice((0, 10, 20, 40))
+        player.chips -= amount
+        player.bet += amount
+        game.pot += amount
+        game.current_player_index = (game.current_player_index + 1) % len(game.players)
+
+        start = time.perf_counter()
+        full_bytes += len(json.dumps(full_state(game)))
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        delta = state.publish(*public_state(game))
+        delta_bytes += len(json.dumps(delta))
+        delta_time += time.perf_counter() - start
+
+    print(f'完整状态: {full_bytes / actions:.0f} 字节/次, {full_time / actions * 1e6:.1f} 微秒/次')
+    print(f'状态差量: {delta_bytes / actions:.0f} 字节/次, {delta_time / actions * 1e6:.1f} 微秒/次')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import logging
+import time
+
+import app
+import app_simple
+from room import Seat
+
+# 断线处理基准测试: 房间数从10增加到5万，单次断线耗时应保持不变
+# 运行: python -m benchmarks.bench_disconnect
+
+ROOM_COUNTS = (10, 1_000, 10_000, 50_000)
+PLAYERS_PER_ROOM = 4
+
+
+def fill_app(count):
+    app.rooms.clear()
+    app.last_activity.clear()
+    app.player_sessions.clear()
+    now = time.time()
+    for r in range(count):
+        room_id = f'r{r}'
+        players = [{'id': f'{room_id}-{i}', 'username': f'u{i}', 'chips': 1000, 'isHost': i == 0}
+                   for i in range(PLAYERS_PER_ROOM)]
+        app.rooms[room_id] = {'players': players, 'host': players[0]['id'], 'status': 'waiting',
+                              'settings': {}}
+        app.last_activity[room_id] = now
+        for player in players:
+            app.player_sessions.add(player['id'], room_id, player)
+
+
+def fill_app_simple(count):
+    app_simple.rooms.clear()
+    app_simple.sessions.clear()
+    for r in range(count):
+        room_id = f'r{r}'
+        seats = [Seat(f'u{i}', 'avatar1', i == 0, f'{room_id}-{i}') for i in range(PLAYERS_PER_ROOM)]
+        room = app_simple.rooms[room_id] = app_simple.new_room(seats[0], {})
+        room.seats = seats
+        for seat in seats:
+            app_simple.sessions.add(seat.sid, room_id, seat)
+
+
+# 每个客户端先建房间再断线，只统计断线耗时
+def time_disconnects(module, clients):
+    connected = []
+    for i in range(clients):
+        client = module.socketio.test_client(module.app)
+        client.emit('create_room', {'username': f'bench{i}'})
+        connected.append(client)
+    start = time.perf_counter()
+    for client in connected:
+        client.disconnect()
+    return (time.perf_counter() - start) / clients
+
+
+def main(clients=200):
+    logging.disable(logging.INFO)
+    for name, module, fill in (('app', app, fill_app), ('app_simple', app_simple, fill_app_simple)):
+        # 预热
+        with contextlib.redirect_stdout(io.StringIO()):
+            time_disconnects(module, 20)
+        for count in ROOM_COUNTS:
+            fill(count)
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed = time_disconnects(module, clients)
+            print(f'{name:<10} {count:>6} 个房间: {elapsed * 1e6:.1f} 微秒/次断线')
+
+
+if __name__ == '__main__':
+    main()
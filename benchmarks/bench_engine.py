@@ -0,0 +1,440 @@
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import app_simple
+import wire
+from broadcast import EncodedPayload
+from cards import Deck, to_wire
+from delta import TableState
+from game import Player, PokerGame
+from hand_evaluator import showdown
+from leaderboard import Leaderboard
+
+# 牌局引擎微基准: 牌堆、发牌、一轮下注、轮次判断、找下一个行动玩家、摊牌结算、
+# 排行榜更新和状态编码各自的单次耗时，结果保存为JSON基线，之后每次运行与基线比较。
+#
+# 每个用例先校准每轮的调用次数（一轮至少 --min-time 秒），再测 --rounds 轮，
+# 报告每次调用的最小值和中位数；有准备步骤的用例（例如每手开局）只计被测函数本身的时间。
+# 同一台机器上不同时间的运行速度也会差几十个百分点，因此每轮测完用例紧接着测一轮固定的纯Python参照负载，
+# 用例耗时除以相邻参照负载耗时得到相对耗时，机器变慢时两者一起变慢。相对耗时的中位数比基线慢超过
+# --threshold（默认25%）时报告回归并以非0状态退出；--save 把本次结果保存为新的基线。
+# 运行: python -m benchmarks.bench_engine [--only showdown,leaderboard] [--save]
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'engine.json')
+SETTINGS = {'smallBlind': 10, 'bigBlind': 20, 'maxRounds': 1, 'maxPlayers': 10}
+PLAYERS = 6
+CHIPS = 1000
+LEADERBOARD_PLAYERS = 100_000
+
+
+def new_game(players=PLAYERS, seed=0):
+    game = PokerGame('bench', dict(SETTINGS))
+    for i in range(players):
+        game.add_player(Player(f'sid-{i:02d}-abcdefghijklmnop', f'player{i}', 'avatar1', CHIPS))
+    game.start_game(seed)
+    return game
+
+
+def new_hand(game, rng):
+    for player in game.players:
+        player.chips = CHIPS
+    game.start_game(rng.getrandbits(64))
+
+
+# 每人跟注或看牌，直到翻牌前这一轮结束
+def betting_round(game):
+    while game.round == 'pre-flop':
+        player = game.players[game.current_player_index]
+        game.process_action(player.id, 'check' if game.current_bet == player.bet else 'call')
+        game.get_next_player()
+
+
+def public_state(game):
+    return {
+        'status': 'playing',
+        'pot': game.pot,
+        'currentBet': game.current_bet,
+        'round': game.round,
+        'communityCards': to_wire(game.community_cards),
+        'currentPlayer': game.players[game.current_player_index].id
+    }, [p.to_dict() for p in game.players]
+
+
+def check_engine(hands=500, seed=0):
+    rng = random.Random(seed)
+    game = new_game()
+    for _ in range(hands):
+        new_hand(game, rng)
+        dealt = [c for p in game.players for c in p.cards]
+        assert len(set(dealt)) == 2 * PLAYERS and len(game.deck) == 52 - 2 * PLAYERS
+        betting_round(game)
+        assert game.round == 'flop' and len(game.community_cards) == 3
+        assert sum(p.chips for p in game.players) + game.pot == CHIPS * PLAYERS
+        game.community_cards.extend(game.deck.draw(2))
+        game.hand_over = True
+        game.determine_winner(with_equity=False)
+        assert game.pot == 0 and sum(p.chips for p in game.players) == CHIPS * PLAYERS
+        cards = dealt + game.community_cards
+        assert len(set(cards)) == len(cards)
+    print(f'引擎校验: {hands} 手随机牌局发牌不重复、翻牌前一轮下注后进入翻牌、结算后筹码守恒')
+
+
+# 随机操作打完整手牌，与按规则逐步推演的参照模型比较: 行动顺序是下一个能行动的座位，
+# 每轮在所有能行动的玩家都在最后一次加注后行动过才结束，结束时他们的下注额相同
+def check_turns(hands=2000, seed=0):
+    rng = random.Random(seed)
+    actions = 0
+    for _ in range(hands):
+        players = rng.randint(4, 9)
+        game = new_game(players, rng.getrandbits(64))
+        for player in game.players:
+            player.chips = rng.choice((CHIPS, CHIPS, 100, 40))
+        game.start_game(rng.getrandbits(64))
+        n = len(game.players)
+        street = game.round
+
+        def can_act(seat):
+            p = game.players[seat]
+            return not p.folded and not p.all_in
+
+        owed = {seat for seat in range(n) if can_act(seat)}
+        player = game.get_next_player()
+        while player is not None:
+            seat = game.current_player_index
+            assert seat in owed and can_act(seat)
+            options = game.get_available_actions(player)
+            roll = rng.random()
+            if roll < 0.15:
+                action, amount = 'fold', None
+            elif roll < 0.35 and 'raise' in options['actions']:
+                action = 'raise'
+                amount = rng.choice((options['callAmount'] + game.big_blind, options['maxRaise']))
+                amount = min(max(amount, game.big_blind), options['maxRaise'])
+            else:
+                action, amount = ('check' if 'check' in options['actions'] else 'call'), None
+            bet = game.current_bet
+            ok, error = game.process_action(player.id, action, amount)
+            assert ok, error
+            actions += 1
+            # 参照模型: 加注后其他能行动的人都欠一次行动，否则只划掉自己
+            if game.players[seat].bet > bet:
+                owed = set(range(n))
+            owed = {s for s in owed if s != seat and can_act(s)}
+            live = [s for s in range(n) if not game.players[s].folded]
+            acting = [s for s in range(n) if can_act(s)]
+            if len(live) == 1 or len(acting) == 1 and game.players[acting[0]].bet >= game.current_bet:
+                owed = set()
+            if owed:
+                assert game.round == street and not game.hand_over
+                expected = next(s for s in [(seat + i) % n for i in range(1, n + 1)] if can_act(s))
+                assert game.current_player_index == expected
+            elif len(acting) >= 2 and not game.hand_over:
+                # 本轮结束，进入下一轮，所有能行动的人重新欠一次行动
+                assert game.round != street and game.get_next_player() is not None
+                street = game.round
+                owed = set(acting)
+            else:
+                assert game.get_next_player() is None
+            player = game.get_next_player()
+        live = [p for p in game.players if not p.folded]
+        acting = [p for p in live if not p.all_in]
+        assert len(live) == 1 or game.hand_over or len(acting) <= 1
+        if not game.hand_over and len(acting) == 1 and len(live) > 1:
+            assert acting[0].bet >= max(p.bet for p in live)
+        total = sum(p.chips for p in game.players) + game.pot
+        game.determine_winner(with_equity=False)
+        assert sum(p.chips for p in game.players) == total
+    print(f'行动顺序校验: {hands} 手随机牌局（4-9人，含全下和弃牌）共 {actions} 次操作与参照模型一致')
+
+
+# 校准每轮调用次数后测 rounds 轮，返回每次调用的耗时（微秒）列表、每轮相对参照负载的耗时比和每轮调用次数；
+# 与 timeit 一样测量期间关闭垃圾回收，前面用例留下的大量对象不影响后面的用例
+def measure(func, setup=None, rounds=20, min_time=0.02):
+    gc.collect()
+    gc.disable()
+    try:
+        run_case = _batch(func, setup)
+        run_reference = _batch(reference, None)
+        number = _calibrate(run_case, min_time)
+        reference_number = _calibrate(run_reference, min_time)
+        times = []
+        ratios = []
+        for _ in range(rounds):
+            case_us = run_case(number) / number * 1e6
+            times.append(case_us)
+            ratios.append(case_us / (run_reference(reference_number) / reference_number * 1e6))
+        return times, ratios, number
+    finally:
+        gc.enable()
+
+
+# 返回 run_batch(number)：调用 number 次的总耗时（秒），不计准备步骤
+def _batch(func, setup):
+    clock = time.perf_counter
+
+    def run_batch(number):
+        if setup is None:
+            start = clock()
+            for _ in range(number):
+                func()
+            return clock() - start
+        total = 0.0
+        for _ in range(number):
+            args = setup()
+            start = clock()
+            func(*args)
+            total += clock() - start
+        return total
+    return run_batch
+
+
+def _calibrate(run_batch, min_time):
+    number = 1
+    while True:
+        elapsed = run_batch(number)
+        if elapsed >= min_time:
+            return number
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+
+
+# 参照负载: 与牌局引擎相近的列表、字典、排序和整数运算，不依赖本项目代码
+def reference():
+    values = [(i * 7919) % 1009 for i in range(300)]
+    counts = {}
+    for v in values:
+        counts[v & 63] = counts.get(v & 63, 0) + 1
+    return sorted(values)[len(values) // 2] + len(counts)
+
+
+# 用例: 名称 -> (说明, 构造函数)；构造函数返回 (被测函数, 准备函数或None)
+def deck_init():
+    return Deck, None
+
+
+def deck_draw():
+    deck = Deck(random.Random(0))
+
+    def deal():
+        deck.reset()
+        deck.draw(2 * PLAYERS + 5)
+    return deal, None
+
+
+def deal_initial_cards():
+    game = new_game()
+
+    def deal():
+        game.deck.reset()
+        game.deal_initial_cards()
+    return deal, None
+
+
+def process_action():
+    rng = random.Random(0)
+    game = new_game()
+
+    def setup():
+        new_hand(game, rng)
+        return (game,)
+    return betting_round, setup
+
+
+def check_round_complete():
+    game = new_game()
+    return game.check_round_complete, None
+
+
+def get_next_player():
+    game = new_game()
+    return game.get_next_player, None
+
+
+def showdown_eval():
+    rng = random.Random(0)
+    deck = Deck(rng)
+
+    def setup():
+        deck.reset()
+        return deck.draw(5), [deck.draw(2) for _ in range(PLAYERS)]
+    return showdown, setup
+
+
+def determine_winner():
+    rng = random.Random(0)
+    game = new_game()
+
+    def setup():
+        new_hand(game, rng)
+        betting_round(game)
+        game.community_cards.extend(game.deck.draw(2))
+        game.hand_over = True
+        return (False,)
+    return game.determine_winner, setup
+
+
+def leaderboard():
+    rng = random.Random(0)
+    board = Leaderboard()
+    for i in range(LEADERBOARD_PLAYERS):
+        board.update([(f'user{i}', 'avatar1', rng.randint(0, 5000))], settled=True)
+    app_simple.global_leaderboard = board
+    game = new_game()
+    names = [f'user{i}' for i in range(LEADERBOARD_PLAYERS)]
+
+    def setup():
+        for player in game.players:
+            player.username = rng.choice(names)
+            player.chips = rng.randint(0, 5000)
+        return game, True
+    return app_simple.update_leaderboards, setup
+
+
+def state_json():
+    game = new_game()
+    state = TableState()
+    state.publish(*public_state(game))
+    snapshot = state.snapshot()
+    return lambda: EncodedPayload(snapshot), None
+
+
+def state_msgpack():
+    game = new_game()
+    state = TableState()
+    state.publish(*public_state(game))
+    snapshot = state.snapshot()
+    return lambda: wire.pack(snapshot), None
+
+
+def state_delta():
+    rng = random.Random(0)
+    game = new_game()
+    state = TableState()
+    state.publish(*public_state(game))
+
+    def setup():
+        player = game.players[rng.randrange(PLAYERS)]
+        player.chips -= 10
+        player.bet += 10
+        game.pot += 10
+        return public_state(game)
+
+    def publish(fields, players):
+        EncodedPayload(state.publish(fields, players))
+    return publish, setup
+
+
+CASES = {
+    'deck_init': ('Deck() 构造', deck_init),
+    'deck_draw': (f'重置牌堆并发{2 * PLAYERS + 5}张牌', deck_draw),
+    'deal_initial_cards': (f'{PLAYERS}人发底牌', deal_initial_cards),
+    'process_action': (f'{PLAYERS}人翻牌前一轮下注 (process_action + get_next_player)', process_action),
+    'check_round_complete': ('判断下注轮是否结束', check_round_complete),
+    'get_next_player': ('找下一个行动玩家', get_next_player),
+    'showdown': (f'{PLAYERS}人摊牌评估', showdown_eval),
+    'determine_winner': (f'{PLAYERS}人摊牌结算（含边池）', determine_winner),
+    'leaderboard': (f'{LEADERBOARD_PLAYERS // 1000}k名玩家排行榜上结算{PLAYERS}人', leaderboard),
+    'state_json': (f'{PLAYERS}人牌桌完整状态编码JSON', state_json),
+    'state_msgpack': (f'{PLAYERS}人牌桌完整状态编码MessagePack', state_msgpack),
+    'state_delta': ('状态差量计算并编码JSON', state_delta)
+}
+
+
+def run_cases(names, rounds, min_time):
+    results = {}
+    for name in names:
+        label, build = CASES[name]
+        func, setup = build()
+        times, ratios, number = measure(func, setup, rounds, min_time)
+        results[name] = {
+            'min_us': round(min(times), 3),
+            'median_us': round(statistics.median(times), 3),
+            'stdev_us': round(statistics.stdev(times), 3) if len(times) > 1 else 0.0,
+            'relative': float(f'{statistics.median(ratios):.4g}'),
+            'calls_per_round': number
+        }
+        print(f'{name:<22} {results[name]["median_us"]:>10.2f} 微秒 (最小 {results[name]["min_us"]:.2f}, '
+              f'参照负载的 {results[name]["relative"]:.4f} 倍)  {label}')
+    return results
+
+
+# 按相对参照负载的耗时与基线比较，返回 {用例名: 回归说明}
+def compare(results, baseline, threshold):
+    problems = {}
+    for name, result in results.items():
+        base = baseline.get('cases', {}).get(name)
+        if base is None or 'relative' not in base:
+            continue
+        ratio = result['relative'] / base['relative']
+        if ratio > 1 + threshold:
+            problems[name] = (f'{name}: 参照负载的 {result["relative"]:.4f} 倍，基线为 {base["relative"]:.4f} 倍，'
+                              f'慢 {ratio - 1:.0%}（本次中位数 {result["median_us"]:.2f} 微秒）')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='牌局引擎微基准')
+    parser.add_argument('--only', help='逗号分隔的用例名，默认全部: ' + ','.join(CASES))
+    parser.add_argument('--rounds', type=int, default=20, help='每个用例测量的轮数')
+    parser.add_argument('--min-time', type=float, default=0.02, help='每轮的最短秒数')
+    parser.add_argument('--threshold', type=float, default=0.25, help='相对耗时比基线慢多少算回归')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='把本次结果保存为基线（--only 时只更新这些用例）')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f'未知用例: {",".join(unknown)}')
+    logging.disable(logging.INFO)
+    check_engine()
+    check_turns()
+    results = run_cases(names, args.rounds, args.min_time)
+    reference_us = round(statistics.median(measure(reference, None, args.rounds, args.min_time)[0]), 3)
+    print(f'{"reference":<22} {reference_us:>10.2f} 微秒  参照负载')
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if args.save:
+        cases = dict(baseline.get('cases', {})) if args.only else {}
+        cases.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'python': platform.python_version(),
+                       'reference_us': reference_us, 'cases': cases}, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f'已保存基线: {args.baseline}')
+        return
+    if not baseline:
+        print('没有基线，使用 --save 保存本次结果')
+        return
+    if baseline.get('reference_us'):
+        print(f'本机当前速度: 参照负载耗时为基线的 {reference_us / baseline["reference_us"]:.0%}')
+    problems = compare(results, baseline, args.threshold)
+    # 机器被其他进程占用的时段可能覆盖整个用例，疑似回归的用例重测两次，取最快的结果
+    for _ in range(2):
+        if not problems:
+            break
+        print(f'重测疑似回归的用例: {",".join(problems)}')
+        for name, result in run_cases(list(problems), args.rounds, args.min_time).items():
+            if result['relative'] < results[name]['relative']:
+                results[name] = result
+        problems = compare(results, baseline, args.threshold)
+    for problem in problems.values():
+        print(f'回归: {problem}')
+    if problems:
+        sys.exit(1)
+    print('与基线相比没有回归')
+
+
+if __name__ == '__main__':
+    main()
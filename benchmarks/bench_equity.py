@@ -0,0 +1,37 @@
+import time
+
+import numpy as np
+
+from equity import equity
+
+# 全下胜率计算基准测试
+# 运行: python -m benchmarks.bench_equity
+
+
+def deal(players, board_size, seed=0):
+    cards = np.random.default_rng(seed).permutation(52).tolist()
+    holes = [cards[2 * i:2 * i + 2] for i in range(players)]
+    board = cards[2 * players:2 * players + board_size]
+    return holes, board
+
+
+def bench(players, board_size, repeat=5):
+    holes, board = deal(players, board_size)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, exact, boards = equity(holes, board)
+        best = min(best, time.perf_counter() - start)
+    return best, exact, boards
+
+
+def main():
+    for players in (2, 6, 10):
+        for board_size, street in ((0, '翻牌前'), (3, '翻牌'), (4, '转牌')):
+            elapsed, exact, boards = bench(players, board_size)
+            mode = '穷举' if exact else '蒙特卡洛'
+            print(f'{players}人 {street}: {elapsed * 1000:.2f} 毫秒 ({mode}, {boards} 个牌面)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import time
+
+import numpy as np
+
+from hand_evaluator import evaluate, evaluate_batch, showdown
+
+# 手牌评估器基准测试
+# 运行: python -m benchmarks.bench_evaluator
+
+
+def random_hands(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.argsort(rng.random((n, 52)), axis=1)[:, :7].astype(np.int8)
+
+
+def bench_batch(n=2_000_000, repeat=3):
+    hands = random_hands(n)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        evaluate_batch(hands)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def bench_single(n=200_000):
+    hands = random_hands(n).tolist()
+    start = time.perf_counter()
+    for hand in hands:
+        evaluate(hand)
+    return n / (time.perf_counter() - start)
+
+
+def bench_showdown(n=20_000, players=10):
+    hands = random_hands(n)
+    start = time.perf_counter()
+    for row in hands.tolist():
+        board = row[:5]
+        showdown(board, [row[5:]] * players)
+    return (time.perf_counter() - start) / n
+
+
+def main():
+    print(f'批量评估: {bench_batch():,.0f} 手/秒')
+    print(f'单手评估: {bench_single():,.0f} 手/秒')
+    print(f'10人摊牌: {bench_showdown() * 1e6:.1f} 微秒/次')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from history import BLIND, CALL, CHECK, FOLD, PFR, RAISE, VPIP, HandHistory
+
+# 手牌历史基准测试: 数百万手的按列存储上计算全部玩家统计的耗时，以及流式导出的吞吐量
+# 另用少量随机手牌与逐行计算的结果对照，校验向量化统计的正确性
+# 运行: python -m benchmarks.bench_history
+
+
+def generate(history, hands, seats=6, players=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    for i in range(players):
+        history.player_id(f'player{i}')
+    big_blind = 20
+    # 每手: 小盲、大盲、每个座位一次翻牌前决定、每个座位一次翻牌后决定
+    preflop = rng.choice([FOLD, CALL, RAISE], p=[0.6, 0.3, 0.1], size=(hands, seats))
+    postflop = rng.choice([CHECK, CALL, RAISE], p=[0.5, 0.3, 0.2], size=(hands, seats))
+    per_hand = 2 + 2 * seats
+    hand = np.repeat(np.arange(hands, dtype=np.uint32), per_hand)
+    seat = np.tile(np.r_[1, 2, np.arange(seats), np.arange(seats)], hands)
+    street = np.tile(np.r_[0, 0, np.zeros(seats), np.ones(seats)], hands)
+    action = np.column_stack([np.full((hands, 2), BLIND), preflop, postflop]).ravel()
+    amount = np.where(action == BLIND, big_blind, np.where(action == FOLD, 0, big_blind * 2))
+    history.actions.extend([hand, seat, street, action, amount])
+
+    player = rng.integers(players, size=hands * seats)
+    invested = rng.integers(0, 200, size=(hands, seats))
+    pot = invested.sum(axis=1)
+    won = np.zeros((hands, seats), dtype=np.int64)
+    won[np.arange(hands), rng.integers(seats, size=hands)] = pot
+    flags = np.select([preflop == RAISE, preflop == CALL], [VPIP | PFR, VPIP], 0)
+    history.results.extend([player, np.tile(np.arange(seats), hands), invested.ravel(), won.ravel(),
+                            flags.ravel(), (postflop == RAISE).ravel(), (postflop == CALL).ravel()])
+    history.hands.extend([np.arange(hands, dtype=np.float64), np.arange(hands) * seats,
+                          np.full(hands, seats), np.full(hands, big_blind), pot])
+
+
+def naive_stats(hands):
+    stats = {}
+    for big_blind, seats, actions in hands:
+        for seat, (username, invested, won) in enumerate(seats):
+            s = stats.setdefault(username, {'hands': 0, 'vpip': 0, 'pfr': 0, 'raises': 0, 'calls': 0,
+                                            'wins': 0, 'bb': 0.0, 'net': 0})
+            mine = [(street, action) for a_seat, street, action, _ in actions if a_seat == seat]
+            s['hands'] += 1
+            s['vpip'] += any(street == 0 and action in (CALL, RAISE) for street, action in mine)
+            s['pfr'] += any(street == 0 and action == RAISE for street, action in mine)
+            s['raises'] += sum(street > 0 and action == RAISE for street, action in mine)
+            s['calls'] += sum(street > 0 and action == CALL for street, action in mine)
+            s['wins'] += won > invested
+            s['bb'] += (won - invested) / big_blind
+            s['net'] += won - invested
+    return stats
+
+
+def check_stats(count=2000, seed=0):
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix='history-check-')
+    try:
+        history = HandHistory(directory, flush_hands=7)
+        hands = []
+        for _ in range(count):
+            n = rng.randint(2, 9)
+            names = rng.sample([f'u{i}' for i in range(30)], n)
+            seats = [(name, rng.randint(0, 300), 0) for name in names]
+            winner = rng.randrange(n)
+            seats[winner] = (seats[winner][0], seats[winner][1], sum(s[1] for s in seats))
+            actions = [(rng.randrange(n), rng.randint(0, 3), rng.randrange(5), rng.randint(0, 100))
+                       for _ in range(rng.randint(0, 20))]
+            actions.sort(key=lambda a: a[1])
+            big_blind = rng.choice((2, 10, 20))
+            hands.append((big_blind, seats, actions))
+            history.record_hand(time.time(), big_blind, sum(s[1] for s in seats), seats, actions)
+
+        # 重新打开后统计不变，导出的行数与结果行数一致
+        expected = {s['username']: s for s in history.player_stats()}
+        reopened = HandHistory(directory)
+        assert {s['username']: s for s in reopened.player_stats()} == expected
+        assert sum(1 for _ in reopened.export()) == sum(len(seats) for _, seats, _ in hands)
+        assert all(row['username'] == 'u0' for row in reopened.export('u0'))
+
+        for username, s in naive_stats(hands).items():
+            got = expected[username]
+            n = s['hands']
+            assert got['hands'] == n
+            assert got['vpip'] == round(s['vpip'] / n, 4)
+            assert got['pfr'] == round(s['pfr'] / n, 4)
+            assert got['af'] == (round(s['raises'] / s['calls'], 2) if s['calls'] else None)
+            assert got['win_rate'] == round(s['wins'] / n, 4)
+            assert abs(got['bb_per_100'] - s['bb'] / n * 100) < 0.01
+            assert got['net'] == s['net']
+    finally:
+        shutil.rmtree(directory)
+    print(f'统计校验: {count} 手随机牌局与逐行计算一致')
+
+
+def main(hands=2_000_000):
+    check_stats()
+    directory = tempfile.mkdtemp(prefix='history-')
+    try:
+        history = HandHistory(directory)
+        start = time.perf_counter()
+        generate(history, hands)
+        history.flush()
+        print(f'生成 {hands} 手 ({history.results.committed} 行结果, {history.actions.committed} 行操作): '
+              f'{time.perf_counter() - start:.2f} 秒')
+
+        history = HandHistory(directory)
+        for label in ('首次(冷映射)', '再次'):
+            start = time.perf_counter()
+            stats = history.player_stats()
+            print(f'全部 {len(stats)} 名玩家统计 {label}: {time.perf_counter() - start:.3f} 秒')
+
+        start = time.perf_counter()
+        rows = sum(1 for _ in history.export('player0'))
+        print(f'按玩家导出 {rows} 行: {time.perf_counter() - start:.3f} 秒')
+
+        start = time.perf_counter()
+        rows = 0
+        for _ in history.export():
+            rows += 1
+            if rows == 1_000_000:
+                break
+        print(f'流式导出前 {rows} 行: {time.perf_counter() - start:.2f} 秒')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
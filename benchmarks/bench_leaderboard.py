@@ -0,0 +1,74 @@
+import logging
+import random
+import time
+
+import app_simple
+from leaderboard import Leaderboard, RankIndex
+
+# 排行榜基准测试: 10万名玩家时每手结算的增量更新、查名次、取前K名的耗时，
+# 与每次请求重新排序的做法对比；另测排行榜接口版本未变时304响应的耗时
+# 运行: python -m benchmarks.bench_leaderboard
+
+
+def check_index(steps=20_000, seed=0):
+    rng = random.Random(seed)
+    index = RankIndex(seed)
+    scores = {}
+    for step in range(steps):
+        member = f'p{rng.randrange(500)}'
+        if rng.random() < 0.2:
+            index.remove(member)
+            scores.pop(member, None)
+        else:
+            index.update(member, rng.randrange(100))
+            scores[member] = index.score(member)
+        if step % 1000 == 0:
+            order = sorted(scores, key=lambda m: (-scores[m], m))
+            assert [m for m, _ in index.by_rank(0, len(order) + 1)] == order
+            assert all(index.rank(m) == i + 1 for i, m in enumerate(order))
+            start = rng.randrange(len(order) + 1)
+            assert [m for m, _ in index.by_rank(start, 10)] == order[start:start + 10]
+    print(f'排名校验: {steps} 次随机更新后与排序结果一致')
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(players=100_000, seed=0):
+    check_index()
+    rng = random.Random(seed)
+    board = Leaderboard()
+    names = [f'player{i}' for i in range(players)]
+    for name in names:
+        board.update([(name, 'avatar1', rng.randint(0, 5000))])
+
+    def settle():
+        board.update([(rng.choice(names), 'avatar1', rng.randint(0, 5000)) for _ in range(6)], settled=True)
+
+    print(f'{players} 名玩家:')
+    print(f'  每手结算更新6人: {timed(settle, 10_000) * 1e6:.1f} 微秒')
+    print(f'  查单个玩家名次: {timed(lambda: board.best.rank(rng.choice(names)), 10_000) * 1e6:.1f} 微秒')
+    print(f'  取前100名: {timed(lambda: board.top(100), 1_000) * 1e6:.1f} 微秒')
+    print(f'  第5万名起取100名: {timed(lambda: board.top(100, 50_000), 1_000) * 1e6:.1f} 微秒')
+
+    scores = {name: board.best.score(name) for name in names}
+    resort = timed(lambda: sorted(scores.items(), key=lambda item: item[1], reverse=True)[:100], 10)
+    print(f'  对照: 每次请求重新排序取前100名: {resort * 1e6:.1f} 微秒')
+
+    logging.disable(logging.INFO)
+    app_simple.global_leaderboard = board
+    client = app_simple.app.test_client()
+    response = client.get('/api/leaderboard?limit=100')
+    etag = response.headers['ETag']
+    full = timed(lambda: client.get('/api/leaderboard?limit=100'), 200)
+    cached = timed(lambda: client.get('/api/leaderboard?limit=100', headers={'If-None-Match': etag}), 200)
+    assert client.get('/api/leaderboard?limit=100', headers={'If-None-Match': etag}).status_code == 304
+    print(f'  接口前100名: 200响应 {full * 1e6:.0f} 微秒, 版本未变的304响应 {cached * 1e6:.0f} 微秒')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+import eventlet
+
+eventlet.monkey_patch()
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import deque
+
+from eventlet.event import Event
+
+# Socket.IO负载测试: 在本机启动真实的 app_simple 服务，用成百上千个模拟客户端
+# （python-socketio 客户端，在本进程里以协程运行）建房、加入、开局、行动、聊天和发表情，
+# 报告不同并发下服务端每秒处理的事件数、端到端延迟 p50/p99/p99.9 和每个房间占用的内存。
+#
+# 延迟: 行动从发出 player_action 到收到下一个 player_turn/game_over；
+#       聊天和表情从发出到收到服务端广播回来的自己那条消息。
+# 表情在客户端里是插入聊天框的单个表情字符，因此按只含一个表情的聊天消息发送。
+# 每个并发级别启动一个新的服务进程，内存为该进程RSS的增量除以房间数（含每个房间6个连接，只支持Linux）。
+# eventlet的WSGI服务默认最多同时处理1024个连接，超过时新连接一直等不到握手，
+# 这里启动服务时放宽到1万；用gunicorn部署时对应 --worker-connections。
+#
+# 结果与 benchmarks/baselines/load.json 比较，吞吐量下降超过20%、p99延迟或每房间内存
+# 增加超过50%时报告回归并以非0状态退出；--save 把本次结果保存为新的基线。
+# 需要: pip install "python-socketio[client]"
+# 运行: python -m benchmarks.bench_load [--clients 60,300,1200] [--duration 20] [--save]
+
+PORT = 5200
+PLAYERS_PER_TABLE = 6
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'load.json')
+EMOJIS = ['😀', '😎', '🤔', '😂', '👍', '👎', '🎲', '🎯', '🎰', '💰', '💸', '🤑']
+THINK_TIME = (0.3, 1.5)   # 轮到自己后的思考时间（秒）
+CHAT_INTERVAL = 20.0      # 每个客户端平均每20秒说一句话
+EMOJI_SHARE = 0.3         # 其中三成是表情
+NEXT_HAND_DELAY = 1.0     # 一手结束后房主等待多久开始下一手
+
+
+class Stats:
+    def __init__(self):
+        self.recording = False
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+        self.latency = {'action': [], 'chat': []}
+
+    def observe(self, kind, seconds):
+        if self.recording:
+            self.latency[kind].append(seconds)
+
+
+class Bot:
+    def __init__(self, stats, name, rng):
+        import socketio
+        self.stats = stats
+        self.name = name
+        self.rng = rng
+        self.host = False
+        self.room_id = None
+        self.joined = Event()
+        self.pending_action = None
+        self.chats = deque()
+        self.running = True
+        self.client = socketio.Client(reconnection=False)
+        self.client.on('*', self.on_event)
+
+    def connect(self, url):
+        self.client.connect(url, transports=['websocket'])
+        self.sid = self.client.get_sid()
+
+    def emit(self, event, data):
+        if self.stats.recording:
+            self.stats.sent += 1
+        self.client.emit(event, data)
+
+    def on_event(self, event, data=None):
+        stats = self.stats
+        if stats.recording:
+            stats.received += 1
+        now = time.perf_counter()
+        # 服务端把一个节拍内的聊天合成一帧
+        if event == 'room_frame':
+            for name, payload in data['events']:
+                self.handle(name, payload, now)
+        else:
+            self.handle(event, data, now)
+
+    def handle(self, event, data, now):
+        stats = self.stats
+        if event in ('room_created', 'room_joined'):
+            self.room_id = data['room_id']
+            self.joined.send()
+        elif event == 'player_turn':
+            self.action_done(now)
+            if data['playerId'] == self.sid:
+                eventlet.spawn_after(self.rng.uniform(*THINK_TIME), self.act, data['availableActions'])
+        elif event == 'game_over':
+            self.action_done(now)
+            if self.host:
+                eventlet.spawn_after(NEXT_HAND_DELAY, self.start)
+        elif event == 'chat_message':
+            if data['username'] == self.name and self.chats:
+                stats.observe('chat', now - self.chats.popleft())
+        elif event in ('error', 'error_message'):
+            if stats.recording:
+                stats.errors += 1
+            self.action_done(now)
+            # 上一手还在结算时稍后重试开局
+            if self.host and event == 'error':
+                eventlet.spawn_after(NEXT_HAND_DELAY, self.start)
+
+    def action_done(self, now):
+        if self.pending_action is not None:
+            self.stats.observe('action', now - self.pending_action)
+            self.pending_action = None
+
+    def act(self, options):
+        if not self.running:
+            return
+        actions = options['actions']
+        roll = self.rng.random()
+        if roll < 0.1 and 'raise' in actions:
+            # 加注额是本次投入的筹码，要超过跟注额；筹码不够时全下
+            data = {'action': 'raise', 'amount': min(options['maxRaise'], options['callAmount'] + 40)}
+        elif roll < 0.2 and 'fold' in actions:
+            data = {'action': 'fold'}
+        else:
+            data = {'action': 'check' if 'check' in actions else 'call'}
+        self.pending_action = time.perf_counter()
+        self.emit('player_action', data)
+
+    def start(self):
+        if self.running:
+            self.emit('start_game', {'room_id': self.room_id})
+
+    def chat(self):
+        while self.running:
+            eventlet.sleep(self.rng.expovariate(1 / CHAT_INTERVAL))
+            if not self.running:
+                return
+            if self.rng.random() < EMOJI_SHARE:
+                message = self.rng.choice(EMOJIS)
+            else:
+                message = f'{self.name} 说 {self.rng.randrange(1000)}'
+            self.chats.append(time.perf_counter())
+            self.emit('chat_message', {'message': message})
+
+    def close(self):
+        self.running = False
+        try:
+            self.client.disconnect()
+        except Exception:
+            pass
+
+
+def start_server(port):
+    # 单进程内存模式
+    env = {k: v for k, v in os.environ.items() if k not in ('WORKERS', 'ROOM_STORE', 'MESSAGE_QUEUE', 'HAND_LOG_DIR')}
+    env.update(LOG_LEVEL='WARNING', HISTORY_DIR=tempfile.mkdtemp(prefix='bench-load-'))
+    code = ('import eventlet; eventlet.monkey_patch(); from app_simple import app, socketio; '
+            f'socketio.run(app, host="127.0.0.1", port={port}, log_output=False, max_size=10000)')
+    process = subprocess.Popen([sys.executable, '-c', code], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + '/health', timeout=1)
+            return url, process
+        except OSError:
+            eventlet.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'服务没有启动: {url}')
+
+
+def rss_kb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def build_table(url, stats, table, rng):
+    host = Bot(stats, f'h{table}', random.Random(rng.random()))
+    host.host = True
+    host.connect(url)
+    host.emit('create_room', {'username': host.name})
+    host.joined.wait()
+    bots = [host]
+    for i in range(PLAYERS_PER_TABLE - 1):
+        bot = Bot(stats, f'p{table}-{i}', random.Random(rng.random()))
+        bot.connect(url)
+        bot.emit('join_room', {'username': bot.name, 'room_id': host.room_id})
+        bot.joined.wait()
+        bots.append(bot)
+    return bots
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_level(clients, duration, warmup, seed, port):
+    rng = random.Random(seed)
+    tables = max(clients // PLAYERS_PER_TABLE, 1)
+    url, server = start_server(port)
+    try:
+        base_rss = rss_kb(server.pid)
+        stats = Stats()
+        pool = eventlet.GreenPool(50)
+        bots = [bot for table in pool.imap(lambda t: build_table(url, stats, t, rng), range(tables))
+                for bot in table]
+        for bot in bots:
+            if bot.host:
+                bot.start()
+            eventlet.spawn(bot.chat)
+        eventlet.sleep(warmup)
+        stats.recording = True
+        start = time.perf_counter()
+        eventlet.sleep(duration)
+        elapsed = time.perf_counter() - start
+        stats.recording = False
+        room_rss = (rss_kb(server.pid) - base_rss) / tables
+        for bot in bots:
+            bot.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = stats.latency['action'] + stats.latency['chat']
+    return {
+        'clients': len(bots),
+        'rooms': tables,
+        'events_per_second': round(stats.sent / elapsed, 1),
+        'messages_per_second': round(stats.received / elapsed, 1),
+        'errors': stats.errors,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'p999_ms': round(percentile(latencies, 0.999) * 1000, 2),
+        'action_p99_ms': round(percentile(stats.latency['action'], 0.99) * 1000, 2),
+        'chat_p99_ms': round(percentile(stats.latency['chat'], 0.99) * 1000, 2),
+        'rss_per_room_kb': round(room_rss, 1)
+    }
+
+
+# 与基线比较，返回回归说明列表
+def compare(results, baseline):
+    problems = []
+    for clients, result in results.items():
+        base = baseline.get('levels', {}).get(clients)
+        if base is None:
+            continue
+        if result['events_per_second'] < base['events_per_second'] * 0.8:
+            problems.append(f'{clients} 个客户端: 吞吐量 {result["events_per_second"]} < 基线 {base["events_per_second"]}')
+        # 延迟在几毫秒以内时波动很大，留出5毫秒余量
+        if result['p99_ms'] > base['p99_ms'] * 1.5 + 5:
+            problems.append(f'{clients} 个客户端: p99延迟 {result["p99_ms"]} 毫秒 > 基线 {base["p99_ms"]} 毫秒')
+        if result['rss_per_room_kb'] > base['rss_per_room_kb'] * 1.5 + 16:
+            problems.append(f'{clients} 个客户端: 每房间内存 {result["rss_per_room_kb"]} KB > 基线 {base["rss_per_room_kb"]} KB')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Socket.IO负载测试')
+    parser.add_argument('--clients', default='60,300,1200', help='逗号分隔的并发客户端数')
+    parser.add_argument('--duration', type=float, default=20, help='每个并发级别的测量秒数')
+    parser.add_argument('--warmup', type=float, default=10, help='开始测量前的预热秒数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='把本次结果保存为基线')
+    args = parser.parse_args()
+
+    results = {}
+    for i, clients in enumerate(int(c) for c in args.clients.split(',')):
+        result = run_level(clients, args.duration, args.warmup, args.seed, PORT + i)
+        results[str(clients)] = result
+        print(f'{result["clients"]} 个客户端 / {result["rooms"]} 个房间: '
+              f'{result["events_per_second"]:.0f} 事件/秒, 收到 {result["messages_per_second"]:.0f} 条/秒, '
+              f'延迟 p50 {result["p50_ms"]:.1f} / p99 {result["p99_ms"]:.1f} / p99.9 {result["p999_ms"]:.1f} 毫秒, '
+              f'(行动 p99 {result["action_p99_ms"]:.1f} / 聊天 p99 {result["chat_p99_ms"]:.1f}), '
+              f'每房间 {result["rss_per_room_kb"]:.0f} KB, 错误 {result["errors"]}')
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'duration': args.duration, 'levels': results},
+                      f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f'已保存基线: {args.baseline}')
+        return
+    if not os.path.exists(args.baseline):
+        print('没有基线，使用 --save 保存本次结果')
+        return
+    with open(args.baseline) as f:
+        problems = compare(results, json.load(f))
+    for problem in problems:
+        print(f'回归: {problem}')
+    if problems:
+        sys.exit(1)
+    print('与基线相比没有回归')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import logs
+from logs import Sampler, log_event
+
+# 日志基准测试: 一个典型消息处理函数在不同日志方式下的耗时（p50/p99），
+# 对比关闭日志、逐条 print、同步写文件的标准日志处理器和队列+后台批量写出的结构化日志；
+# 同时检查队列写出的每一行都是合法的JSON且带有房间和sid
+# 运行: python -m benchmarks.bench_logging
+
+logger = logging.getLogger('bench')
+
+
+def handler_body(i, rooms):
+    # 模拟一次处理: 查会话、改房间状态、组装要发送的数据
+    room = rooms[i % len(rooms)]
+    room['version'] += 1
+    return {'room_id': room['id'], 'version': room['version'], 'players': room['players']}
+
+
+def measure(name, log, calls=50_000):
+    rooms = [{'id': str(10000 + r), 'version': 0, 'players': [f'u{p}' for p in range(6)]} for r in range(100)]
+    samples = []
+    for i in range(calls):
+        start = time.perf_counter()
+        handler_body(i, rooms)
+        log(i)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return f'  {name:14s} p50 {samples[calls // 2] * 1e6:6.2f} 微秒, p99 {samples[calls * 99 // 100] * 1e6:6.2f} 微秒'
+
+
+def with_handler(handler, level=logging.INFO):
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def main(calls=50_000):
+    out = tempfile.NamedTemporaryFile('w', suffix='.log', delete=False)
+    print(f'每次处理写一条日志, 共 {calls} 次（日志写到 {out.name}）:')
+
+    with_handler(logging.NullHandler(), logging.WARNING)
+    print(measure('关闭日志', lambda i: log_event(logger, 'player_action', room='10001', sid=f's{i}'), calls))
+
+    stdout = sys.stdout
+    sys.stdout = out
+    try:
+        line = measure('print', lambda i: print(f'Player s{i} action in room 10001', flush=True), calls)
+    finally:
+        sys.stdout = stdout
+    print(line)
+
+    stream = logging.StreamHandler(out)
+    with_handler(stream)
+    print(measure('同步日志处理器', lambda i: logger.info(f'Player s{i} action in room 10001'), calls))
+
+    queue = logs.setup(stream=out, maxlen=calls, sample='')
+    print(measure('队列+JSON', lambda i: log_event(logger, 'player_action', room='10001', sid=f's{i}'), calls))
+    start = time.perf_counter()
+    written = queue.drain()
+    print(f'  后台批量写出 {written} 条: {(time.perf_counter() - start) / written * 1e6:.2f} 微秒/条（不在处理函数里）')
+
+    logs.sampler = Sampler({'player_action': 0.01})
+    print(measure('队列+1%采样', lambda i: log_event(logger, 'player_action', room='10001', sid=f's{i}'), calls))
+    queue.drain()
+    logs.sampler = Sampler()
+
+    check = io.StringIO()
+    queue.stream = check
+    for i in range(1000):
+        log_event(logger, 'player_action', room='10001', sid=f's{i}', amount=i)
+    assert queue.drain() == 1000
+    rows = [json.loads(line) for line in check.getvalue().splitlines()]
+    assert all(r['event'] == 'player_action' and r['room'] == '10001' and r['sid'] == f's{i}'
+               for i, r in enumerate(rows))
+    out.close()
+    os.unlink(out.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import random
+import time
+
+from metrics import Histogram, Metrics
+
+# 运行指标基准测试: 事件处理函数包装后每次调用多出的耗时、记录一次耗时分布的耗时、
+# 输出 /metrics 文本的耗时；同时检查分桶估计的分位数与精确排序结果的相对误差在桶宽以内
+# 运行: python -m benchmarks.bench_metrics
+
+
+def check_quantiles(rng, samples=200_000):
+    histogram = Histogram(1e6)
+    values = [rng.lognormvariate(-8, 1.5) for _ in range(samples)]
+    for value in values:
+        histogram.record(value)
+    values.sort()
+    worst = 0.0
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = values[min(int(q * samples), samples - 1)]
+        if exact >= 32e-6:  # 32微秒以下每微秒一个桶
+            worst = max(worst, abs(histogram.quantile(q) - exact) / exact)
+    assert worst < 0.07, worst
+    print(f'分位数校验: {samples} 个耗时样本, p50-p99.9 最大相对误差 {worst:.2%}')
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls
+
+
+def main(calls=500_000, seed=0):
+    rng = random.Random(seed)
+    check_quantiles(rng)
+
+    def handler(data):
+        return data
+
+    metrics = Metrics()
+    wrapped = metrics.timed('player_action', handler)
+    bare = per_call(handler, calls)
+    timed = per_call(wrapped, calls)
+    print(f'事件处理函数: 不包装 {bare * 1e9:.0f} 纳秒/次, 包装后 {timed * 1e9:.0f} 纳秒/次, '
+          f'多出 {(timed - bare) * 1e9:.0f} 纳秒')
+    histogram = Histogram(1e6)
+    print(f'记录一次耗时: {per_call(lambda i: histogram.record(i * 1e-7), calls) * 1e9:.0f} 纳秒')
+
+    for name in [f'event{i}' for i in range(20)]:
+        stats = metrics.event(name)
+        for _ in range(1000):
+            stats.latency.record(rng.expovariate(2000))
+    metrics.gauge('poker_active_rooms', 'Rooms on this worker', lambda: 100)
+    start = time.perf_counter()
+    text = metrics.render()
+    print(f'20 个事件的 /metrics 文本: {len(text)} 字节, 生成 {(time.perf_counter() - start) * 1e3:.2f} 毫秒')
+
+
+if __name__ == '__main__':
+    main()
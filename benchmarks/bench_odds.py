@@ -0,0 +1,79 @@
+import random
+import time
+
+from equity import equity_vs_random
+from odds import OddsService, PreflopTable, canonical, postflop_equity
+
+# 胜率查询基准测试: 翻牌前查表、翻牌后缓存命中与未命中（现算）的耗时；
+# 同时检查花色同构的牌面归一化到同一个键，以及表中的胜率与重新模拟的结果一致
+# 运行: python -m benchmarks.bench_odds
+
+
+def permute_suits(cards, perm):
+    return [c & ~3 | perm[c & 3] for c in cards]
+
+
+def check_canonical(rng, trials=2_000):
+    for _ in range(trials):
+        cards = rng.sample(range(52), 2 + rng.choice((3, 4, 5)))
+        perm = rng.sample(range(4), 4)
+        hole, board = permute_suits(cards[:2], perm)[::-1], permute_suits(cards[2:], perm)
+        rng.shuffle(board)  # 顺序不同也是同一个局面
+        key = canonical(cards[:2], cards[2:])
+        assert canonical(hole, board) == key and canonical(*key) == key
+    print(f'同构校验: {trials} 个随机置换花色的牌面归一化结果一致')
+
+
+def check_table(table, rng, hands=12, iterations=20_000):
+    worst = 0.0
+    for _ in range(hands):
+        hole = rng.sample(range(52), 2)
+        opponents = rng.randint(1, 9)
+        fresh = equity_vs_random(hole, (), opponents, iterations, rng.getrandbits(32))[-1]
+        worst = max(worst, abs(fresh - table.equity(hole, opponents)))
+    assert worst < 0.015, worst
+    print(f'胜率表校验: {hands} 手随机起手牌与重新模拟 {iterations} 次的最大差 {worst:.4f}')
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(seed=0):
+    rng = random.Random(seed)
+    table = PreflopTable()
+    check_canonical(rng)
+    check_table(table, rng)
+
+    service = OddsService(table)
+    hole = rng.sample(range(52), 2)
+    print(f'翻牌前查表: {timed(lambda: service.lookup(hole, (), 5), 100_000) * 1e6:.2f} 微秒')
+
+    spots = []
+    for _ in range(200):
+        cards = rng.sample(range(52), 5)
+        spots.append((cards[:2], cards[2:], rng.randint(1, 5)))
+    start = time.perf_counter()
+    for spot in spots:
+        assert service.lookup(*spot)['source'] == 'computed'
+    miss = (time.perf_counter() - start) / len(spots)
+    hit = timed(lambda: service.lookup(*rng.choice(spots)), 100_000)
+    assert service.lookup(*spots[0])['source'] == 'cache'
+    print(f'翻牌后: 未命中现算 {miss * 1e3:.2f} 毫秒, 同一局面再次查询 {hit * 1e6:.2f} 微秒')
+
+    # 同构的新牌面（换花色）也命中缓存，只多一次归一化
+    variants = []
+    for cards, board, opponents in spots:
+        perm = rng.sample(range(4), 4)
+        variants.append((permute_suits(cards, perm), permute_suits(board, perm), opponents))
+    start = time.perf_counter()
+    assert all(service.lookup(*spot)['source'] == 'cache' for spot in variants)
+    print(f'翻牌后: 换花色的同构牌面首次查询 {(time.perf_counter() - start) / len(variants) * 1e6:.1f} 微秒')
+    print(f'缓存: {service.stats()}')
+
+
+if __name__ == '__main__':
+    main()
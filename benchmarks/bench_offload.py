@@ -0,0 +1,95 @@
+import random
+import time
+
+import eventlet
+
+from equity import equity
+from game import Player, PokerGame
+from hand_evaluator import showdown
+from offload import LoopMonitor, WorkerPool
+
+# 计算卸载基准测试: 多张牌桌同时摊牌（含提前全下的胜率计算）时事件循环的卡顿时间，
+# 对比在事件循环里直接计算与交给工作进程批量计算；同时检查两种方式的结果一致
+# 运行: python -m benchmarks.bench_offload
+
+
+def deal(rng, players):
+    cards = rng.sample(range(52), 2 * players + 5)
+    holes = [cards[2 * i:2 * i + 2] for i in range(players)]
+    return holes, cards[2 * players:]
+
+
+def hand_jobs(rng):
+    holes, board = deal(rng, rng.randint(2, 6))
+    # 三分之一是翻牌前全下：胜率 + 一次摊牌
+    if rng.random() < 1 / 3:
+        return [(showdown, (board, holes)), (equity, (holes, []))]
+    return [(showdown, (board, holes))]
+
+
+def measure(pool, tables=20, hands=10, seed=0):
+    monitor = LoopMonitor(interval=0.005)
+    watcher = eventlet.spawn(monitor.run, eventlet.sleep)
+    eventlet.sleep(0.05)
+    monitor.reset()
+    results = []
+
+    def table(t):
+        rng = random.Random(seed * 1000 + t)
+        for _ in range(hands):
+            results.append((t, pool.run(hand_jobs(rng))[0]))
+            eventlet.sleep(rng.random() * 0.01)
+
+    start = time.perf_counter()
+    threads = [eventlet.spawn(table, t) for t in range(tables)]
+    for thread in threads:
+        thread.wait()
+    elapsed = time.perf_counter() - start
+    monitor.stop()
+    watcher.wait()
+    return elapsed, monitor.stats(), sorted(results, key=lambda r: r[0])
+
+
+# 四人翻牌前全下，返回结算后的筹码和公共牌
+def all_in_hand(run, seed):
+    game = PokerGame('check', {'smallBlind': 10, 'bigBlind': 20, 'initialChips': 1000, 'maxRounds': 1, 'maxPlayers': 10})
+    for i in range(4):
+        game.add_player(Player(f's{i}', f's{i}', None, 1000))
+    game.start_game(seed=seed)
+    player = game.players[game.current_player_index]
+    while player:
+        game.process_action(player.id, 'raise', player.chips)
+        player = game.get_next_player()
+    game.determine_winner(run=run)
+    return [p.chips for p in game.players], game.community_cards
+
+
+def main(tables=20, hands=10):
+    inline = WorkerPool(processes=0)
+    elapsed, stats, expected = measure(inline, tables, hands)
+    print(f'{tables} 张牌桌各摊牌 {hands} 次:')
+    print(f'  事件循环内计算: {elapsed:.2f} 秒, 卡顿 平均 {stats["mean_ms"]:.1f} / '
+          f'p99 {stats["p99_ms"]:.1f} / 最长 {stats["max_ms"]:.1f} 毫秒')
+
+    pool = WorkerPool(processes=2)
+    pool.start()
+    pool.run([(sum, ([1, 2],))])  # 等工作进程启动完成
+    elapsed, stats, results = measure(pool, tables, hands)
+    assert [r for _, r in results] == [r for _, r in expected]
+    pool_stats = pool.stats()
+    print(f'  工作进程计算: {elapsed:.2f} 秒, 卡顿 平均 {stats["mean_ms"]:.1f} / '
+          f'p99 {stats["p99_ms"]:.1f} / 最长 {stats["max_ms"]:.1f} 毫秒, '
+          f'平均每批 {pool_stats["jobs_per_batch"]} 个任务')
+
+    # 工作进程在结算中途退出时，本手用已经发出的公共牌在事件循环里重算，结果与直接计算相同
+    for worker in list(pool._idle.queue):
+        worker.process.kill()
+        worker.process.wait()
+    for seed in range(pool.processes):
+        assert all_in_hand(pool.run, seed) == all_in_hand(None, seed)
+    assert pool.stats()['restarts'] == pool.processes
+    print(f'  工作进程退出 {pool.processes} 次: 摊牌在事件循环里重算，结算结果不变')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import json
+import random
+import shutil
+import tempfile
+import time
+
+import app_simple
+from handlog import HandLog
+
+# 崩溃恢复基准测试: 1万个进行中的牌桌写入手牌日志，模拟重启后从快照和日志尾部恢复
+# 同时统计每次记录的追加耗时和组提交的写盘耗时，并校验恢复后的状态与崩溃前一致
+# 运行: python -m benchmarks.bench_recovery
+
+
+def play(room_id, events, rng):
+    game = app_simple.rooms[room_id].game
+    if not game:
+        return
+    if game.timer is None:
+        # 本手已结束，房主开始下一手
+        events.append((room_id, 'start', {'seed': rng.getrandbits(64)}))
+        return
+    player = game.players[game.current_player_index]
+    actions = game.get_available_actions(player)['actions']
+    action = 'check' if 'check' in actions else rng.choice(('call', 'call', 'fold'))
+    events.append((room_id, 'action', {'sid': player.id, 'action': action}))
+
+
+def comparable():
+    state = app_simple.rooms_snapshot()
+    for room in state.values():
+        if room['game']:
+            room['game']['timer'] = room['game']['timer'] is not None
+    return json.dumps(state, sort_keys=True)
+
+
+def main(rooms=10_000, actions_per_room=12, seed=0):
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix='handlog-')
+    hand_log = app_simple.hand_log = HandLog(directory, checkpoint_records=10 ** 9)
+    settings = {'smallBlind': 10, 'bigBlind': 20, 'initialChips': 1000, 'maxRounds': 1,
+                'minPlayers': 4, 'maxPlayers': 10}
+
+    append_time = 0.0
+    appended = 0
+
+    def apply(events):
+        nonlocal append_time, appended
+        for room_id, event, data in events:
+            app_simple.replay_event(room_id, event, data)
+            start = time.perf_counter()
+            hand_log.append(room_id, event, data)
+            append_time += time.perf_counter() - start
+            appended += 1
+
+    try:
+        for i in range(rooms):
+            room_id = str(100000 + i)
+            players = [{'username': f'p{i}-{s}', 'avatar': 'avatar1', 'isHost': s == 0, 'sid': f'sid-{i}-{s}'}
+                       for s in range(4)]
+            apply([(room_id, 'create', {'host': players[0], 'settings': settings})] +
+                  [(room_id, 'join', {'player': p}) for p in players[1:]] +
+                  [(room_id, 'start', {'seed': rng.getrandbits(64)})])
+        hand_log.flush()
+
+        # 前一半操作之后生成快照，后一半只在日志里
+        for step in range(actions_per_room):
+            if step == actions_per_room // 2:
+                start = time.perf_counter()
+                hand_log.checkpoint(app_simple.rooms_snapshot())
+                checkpoint_time = time.perf_counter() - start
+            events = []
+            for room_id in list(app_simple.rooms):
+                play(room_id, events, rng)
+            apply(events)
+            hand_log.flush()
+
+        before = comparable()
+        app_simple.rooms.clear()
+        start = time.perf_counter()
+        _, replayed = app_simple.restore_rooms()
+        restore_time = time.perf_counter() - start
+        assert comparable() == before, '恢复后的状态与崩溃前不一致'
+
+        stats = hand_log.stats()
+        print(f'追加记录: {appended} 条, {append_time / appended * 1e6:.2f} 微秒/条')
+        print(f'组提交: {stats["flushes"]} 次, 平均 {stats["records_per_flush"]:.0f} 条/次, '
+              f'最长 {stats["max_flush_ms"]:.1f} 毫秒')
+        print(f'生成快照: {checkpoint_time:.2f} 秒')
+        print(f'恢复 {len(app_simple.rooms)} 个房间 (重放 {replayed} 条日志): {restore_time:.2f} 秒')
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
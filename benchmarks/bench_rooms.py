@@ -0,0 +1,86 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# 空闲房间内存基准测试: 10万个只有房主在等人的房间，原来的嵌套字典房间与 room.Room 的常驻内存对比
+#
+# 每种表示在单独的子进程里创建房间（与建房时一样发布一次等待中的状态），
+# 用创建前后进程RSS的差除以房间数（只支持Linux），同时报告 memory_stats 的抽样估算值。
+# 运行: python -m benchmarks.bench_rooms [--rooms 100000]
+
+SETTINGS = {'smallBlind': 10, 'bigBlind': 20, 'initialChips': 1000, 'maxRounds': 1, 'minPlayers': 4,
+            'maxPlayers': 10}
+
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+# 改为 room.Room 之前的房间: 玩家和设置是字典，每个房间建房时就创建排行榜
+def legacy_room(room_id):
+    from delta import TableState
+    from leaderboard import Leaderboard
+    host = {'username': f'user{room_id}', 'avatar': 'avatar1', 'isHost': True, 'sid': f'{room_id}-abcdefghijklmnop'}
+    room = {'players': [host], 'state': TableState(), 'settings': dict(SETTINGS), 'leaderboard': Leaderboard()}
+    room['state'].publish({'status': 'waiting'}, [{
+        'id': p['sid'], 'username': p['username'], 'avatar': p['avatar'], 'isHost': p['isHost']
+    } for p in room['players']])
+    return room
+
+
+def slotted_room(room_id):
+    from room import Room, Seat, Settings
+    room = Room(Seat(f'user{room_id}', 'avatar1', True, f'{room_id}-abcdefghijklmnop'), Settings.of(SETTINGS))
+    room.state.publish({'status': 'waiting'}, [{
+        'id': seat.sid, 'username': seat.username, 'avatar': seat.avatar, 'isHost': seat.is_host
+    } for seat in room.seats])
+    return room
+
+
+# 子进程: 创建房间并输出 "每房间RSS字节 抽样估算字节 秒数"
+def measure(kind, count):
+    import room as room_module  # 先导入依赖，模块本身的内存不计入
+    build = legacy_room if kind == 'legacy' else slotted_room
+    build(-1)
+    before = rss_kb()
+    start = time.perf_counter()
+    rooms = {str(100000 + i): build(100000 + i) for i in range(count)}
+    elapsed = time.perf_counter() - start
+    per_room = (rss_kb() - before) * 1024 / count
+    if kind == 'legacy':
+        # 字典房间没有 __slots__ 对象，直接抽样计算
+        estimate = sum(room_module.deep_size(room, set()) for room in list(rooms.values())[:200]) / min(200, count)
+    else:
+        estimate = room_module.memory_stats(rooms)['bytes_per_room']
+    print(f'{per_room:.0f} {estimate:.0f} {elapsed:.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='空闲房间内存基准测试')
+    parser.add_argument('--rooms', type=int, default=100_000)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        measure(args.child, args.rooms)
+        return
+
+    results = {}
+    for kind, label in (('legacy', '嵌套字典房间'), ('slotted', '__slots__ 房间')):
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_rooms', '--child', kind,
+                                 '--rooms', str(args.rooms)], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        per_room, estimate, elapsed = output.stdout.split()
+        results[kind] = float(per_room)
+        print(f'{label:<14} {args.rooms} 个空闲房间: 常驻内存 {float(per_room) * args.rooms / 2 ** 20:.0f} MB, '
+              f'每房间 {float(per_room):.0f} 字节 (memory_stats 估算 {estimate} 字节), 创建耗时 {elapsed} 秒')
+    print(f'每房间内存减少 {1 - results["slotted"] / results["legacy"]:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+# 多进程扩展负载测试: 1/2/4 个工作进程下所有牌桌每秒处理的玩家操作数
+#
+# 每个工作进程是一个独立的 app_simple 进程，房间目录和Socket.IO消息队列使用同一个
+# Redis兼容服务（默认在本进程内启动 fakeredis 作为替身，设置 BENCH_REDIS 使用真实Redis）。
+# 负载进程为每张牌桌连接4个客户端：房主连接任意工作进程创建房间，其他玩家连接随机的
+# 工作进程，收到 room_redirect 后重连到房间所属的进程。
+# 需要: pip install "python-socketio[client]" fakeredis
+# 运行: python -m benchmarks.bench_scaling
+
+BASE_PORT = 5100
+PLAYERS_PER_TABLE = 4
+
+
+def start_redis():
+    url = os.environ.get('BENCH_REDIS')
+    if url:
+        return url, None
+    from fakeredis import TcpFakeServer
+    server = TcpFakeServer(('127.0.0.1', 6399), server_type='redis')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return 'redis://127.0.0.1:6399/0', server
+
+
+def start_workers(count, redis_url):
+    workers = {f'w{i}': f'http://127.0.0.1:{BASE_PORT + i}' for i in range(count)}
+    spec = ','.join(f'{worker_id}={url}' for worker_id, url in workers.items())
+    processes = []
+    for i, worker_id in enumerate(workers):
+        env = dict(os.environ, WORKER_ID=worker_id, WORKERS=spec,
+                   ROOM_STORE=redis_url, MESSAGE_QUEUE=redis_url)
+        code = ('import eventlet; eventlet.monkey_patch(); from app_simple import app, socketio; '
+                f'socketio.run(app, host="127.0.0.1", port={BASE_PORT + i}, log_output=False)')
+        processes.append(subprocess.Popen([sys.executable, '-c', code], env=env,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+    for url in workers.values():
+        wait_ready(url)
+    return list(workers.values()), processes
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(url + '/health', timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Worker did not start: {url}')
+
+
+class Bot:
+    def __init__(self, urls, counter, name):
+        import socketio
+        self.urls = urls
+        self.counter = counter
+        self.name = name
+        self.joined = threading.Event()
+        self.room_id = None
+        self.client = socketio.Client()
+        self.client.on('room_created', self.on_room)
+        self.client.on('room_joined', self.on_room)
+        self.client.on('room_redirect', self.on_redirect)
+        self.client.on('player_turn', self.on_turn)
+        self.client.on('game_over', self.on_game_over)
+        self.host = False
+
+    def connect(self, url):
+        self.client.connect(url, transports=['websocket'])
+
+    def on_room(self, data):
+        self.room_id = data['room_id']
+        self.joined.set()
+
+    def on_redirect(self, data):
+        self.client.disconnect()
+        self.client = self._reconnect(data['url'])
+        self.client.emit('join_room', data['join'])
+
+    def _reconnect(self, url):
+        old = self.client
+        import socketio
+        client = socketio.Client()
+        for event, handler in old.handlers['/'].items():
+            client.on(event, handler)
+        client.connect(url, transports=['websocket'])
+        return client
+
+    def on_turn(self, data):
+        if data['playerId'] != self.client.get_sid():
+            return
+        actions = data['availableActions']['actions']
+        action = 'check' if 'check' in actions else 'call'
+        self.client.emit('player_action', {'action': action})
+        self.counter[0] += 1
+
+    def on_game_over(self, data):
+        if self.host:
+            self.client.emit('start_game', {'room_id': self.room_id})
+
+
+def run_load(urls, tables, duration, seed, result):
+    rng = random.Random(seed)
+    counter = [0]
+    bots = []
+    for t in range(tables):
+        host = Bot(urls, counter, f'h{seed}-{t}')
+        host.host = True
+        host.connect(urls[t % len(urls)])
+        host.client.emit('create_room', {'username': host.name})
+        host.joined.wait(10)
+        table = [host]
+        for i in range(PLAYERS_PER_TABLE - 1):
+            bot = Bot(urls, counter, f'p{seed}-{t}-{i}')
+            bot.connect(rng.choice(urls))
+            bot.client.emit('join_room', {'username': bot.name, 'room_id': host.room_id})
+            bot.joined.wait(10)
+            table.append(bot)
+        bots.append(table)
+
+    start = time.time()
+    for table in bots:
+        table[0].client.emit('start_game', {'room_id': table[0].room_id})
+    time.sleep(duration)
+    result.put(counter[0] / (time.time() - start))
+    for table in bots:
+        for bot in table:
+            bot.client.disconnect()
+
+
+def measure(workers, redis_url, server, load_processes=2, tables=5, duration=10):
+    if server is not None:
+        import redis
+        redis.Redis.from_url(redis_url).flushall()
+    urls, processes = start_workers(workers, redis_url)
+    try:
+        ctx = multiprocessing.get_context('spawn')
+        result = ctx.Queue()
+        loads = [ctx.Process(target=run_load, args=(urls, tables, duration, seed, result))
+                 for seed in range(load_processes)]
+        for load in loads:
+            load.start()
+        total = sum(result.get() for _ in loads)
+        for load in loads:
+            load.join()
+        return total
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    redis_url, server = start_redis()
+    print(f'CPU核数: {os.cpu_count()}')
+    baseline = None
+    for workers in (1, 2, 4):
+        rate = measure(workers, redis_url, server)
+        baseline = baseline or rate
+        print(f'{workers} 个工作进程: {rate:.0f} 操作/秒 ({rate / baseline:.2f}x)')
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import random
+import time
+
+from settlement import award_pots, build_pots, seat_order
+
+# 底池结算基准测试，附带随机化的筹码守恒检查
+# 运行: python -m benchmarks.bench_settlement
+
+
+def random_hand(rng, players=10):
+    contributions = [rng.choice((0, 10, 20, 50, 100, rng.randint(1, 2000))) for _ in range(players)]
+    folded = [rng.random() < 0.3 for _ in range(players)]
+    # 至少保留一名未弃牌且有投入的玩家
+    live = rng.randrange(players)
+    folded[live] = False
+    contributions[live] = max(contributions[live], 1)
+    # 牌力取值范围很小，制造大量平局
+    values = [rng.randint(0, 5) for _ in range(players)]
+    return contributions, folded, values
+
+
+def check_conservation(hands=100_000, seed=0):
+    rng = random.Random(seed)
+    for _ in range(hands):
+        players = rng.randint(2, 10)
+        contributions, folded, values = random_hand(rng, players)
+        pots = build_pots(contributions, folded)
+        assert sum(amount for amount, _ in pots) == sum(contributions)
+        for _, eligible in pots:
+            assert eligible and not any(folded[s] for s in eligible)
+
+        order = seat_order(players, rng.randrange(players))
+        payouts, winners_by_pot = award_pots(pots, values, order)
+        assert sum(payouts) == sum(contributions)
+        assert all(payouts[s] == 0 for s in range(players) if folded[s])
+        # 没有人能赢得超过每位对手投入中与自己相当的部分；
+        # 只有弃牌者达到的最高层级归入投入最多的未弃牌玩家所在的池
+        top_live = max(c for c, f in zip(contributions, folded) if not f)
+        for seat in range(players):
+            level = contributions[seat] if contributions[seat] < top_live else float('inf')
+            cap = sum(min(c, level) for c in contributions)
+            assert payouts[seat] <= cap
+        # 同样的输入必须得到同样的零头分配
+        assert award_pots(pots, values, order) == (payouts, winners_by_pot)
+    return hands
+
+
+def bench(hands=20_000, seed=1):
+    rng = random.Random(seed)
+    samples = [random_hand(rng) for _ in range(hands)]
+    order = seat_order(10, 1)
+    start = time.perf_counter()
+    for contributions, folded, values in samples:
+        award_pots(build_pots(contributions, folded), values, order)
+    return (time.perf_counter() - start) / hands
+
+
+def main():
+    print(f'筹码守恒检查通过: {check_conservation():,} 手随机底池')
+    print(f'10人底池结算: {bench() * 1e6:.1f} 微秒/次')
+
+
+if __name__ == '__main__':
+    main()
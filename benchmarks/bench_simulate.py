@@ -0,0 +1,37 @@
+import os
+import time
+
+from simulate import bb_per_100, simulate, simulate_parallel
+
+# 离线模拟吞吐量基准测试: 单进程每核每秒手数，以及进程池跨全部核心的总吞吐量
+# 同时检查筹码守恒（没有结算前后不一致的手）和结果与进程数无关
+# 运行: python -m benchmarks.bench_simulate
+
+STRATEGIES = ['passive', 'loose', 'tight', 'aggressive', 'passive', 'tight']
+
+
+def main(hands=20_000, seed=0):
+    start = time.perf_counter()
+    single = simulate(hands, STRATEGIES, seed)
+    per_core = hands / (time.perf_counter() - start)
+    assert single['unbalanced'] == 0 and single['aborted'] == 0
+    print(f'单进程 {len(STRATEGIES)} 人桌: {per_core:.0f} 手/秒/核')
+
+    processes = os.cpu_count()
+    total = hands * processes
+    start = time.perf_counter()
+    results = simulate_parallel(total, STRATEGIES, seed, processes=processes, shard_hands=5_000)
+    rate = total / (time.perf_counter() - start)
+    assert results['unbalanced'] == 0 and results['net'].sum() == 0
+    serial = simulate_parallel(total, STRATEGIES, seed, processes=1, shard_hands=5_000)
+    assert all((results[key] == serial[key]).all() if hasattr(results[key], 'all') else results[key] == serial[key]
+               for key in results)
+    print(f'{processes} 个进程: {rate:.0f} 手/秒, 1亿手约需 {1e8 / rate / 3600:.1f} 小时')
+
+    mean, margin = bb_per_100(results)
+    for name, m, e in zip(STRATEGIES, mean, margin):
+        print(f'  {name:10s} {m:+8.1f} ± {e:.1f} 大盲/百手')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import json
+import random
+import time
+
+from ticker import RoomTicker
+
+# 房间节拍广播基准测试: 每个房间10人、每人每秒狂点若干次表情时，
+# 逐条立即广播与按50毫秒节拍合帧广播的房间广播次数、发出的数据包数和编码耗时；
+# 同时检查每个房间按顺序收到的消息完全相同
+# 运行: python -m benchmarks.bench_ticker
+
+
+class Room:
+    def __init__(self, members):
+        self.members = members
+        self.fanouts = 0
+        self.packets = 0
+        self.received = []
+
+    def emit(self, event, data):
+        json.dumps([event, data])  # 每次房间广播编码一次，再发给每个成员
+        self.fanouts += 1
+        self.packets += self.members
+        if event == 'room_frame':
+            self.received.extend((e, d) for e, d in data['events'])
+        else:
+            self.received.append((event, data))
+
+
+def traffic(rng, rooms, seconds, rate):
+    # (时间, 房间, 事件, 数据)，按时间排序
+    events = []
+    for room_id in range(rooms):
+        for _ in range(int(seconds * rate * rng.uniform(0.5, 1.5))):
+            data = {'username': f'u{rng.randrange(10)}', 'emoji': rng.choice('😀😎🤔😂👍')}
+            events.append((rng.uniform(0, seconds), room_id, 'emoji_animation', data))
+    return sorted(events, key=lambda e: e[0])
+
+
+def main(rooms=200, members=10, seconds=10.0, rate=100, interval=0.05, seed=0):
+    rng = random.Random(seed)
+    events = traffic(rng, rooms, seconds, rate)
+
+    direct = [Room(members) for _ in range(rooms)]
+    start = time.perf_counter()
+    for _, room_id, event, data in events:
+        direct[room_id].emit(event, data)
+    direct_time = time.perf_counter() - start
+
+    ticked = [Room(members) for _ in range(rooms)]
+    clock = [0.0]
+    ticker = RoomTicker(lambda event, data, room_id: ticked[room_id].emit(event, data),
+                        interval, window=seconds, clock=lambda: clock[0])
+    start = time.perf_counter()
+    i = 0
+    while clock[0] < seconds + interval:
+        clock[0] += interval
+        while i < len(events) and events[i][0] < clock[0]:
+            ticker.queue(events[i][1], events[i][2], events[i][3])
+            i += 1
+        ticker.flush()
+    ticked_time = time.perf_counter() - start
+    assert all(a.received == b.received for a, b in zip(direct, ticked))
+
+    # 进出房间的状态变化: 一个节拍内多次 touch 只发布一次，已删除的房间不发布
+    published = []
+    states = RoomTicker(lambda *args: None, interval, publish=published.append)
+    for room_id in (1, 2, 1, 1):
+        states.touch(room_id)
+    states.forget(2)
+    states.flush()
+    assert published == [1] and states.stats()['state_publishes_saved'] == 3
+
+    stats = ticker.stats()
+    print(f'{rooms} 个房间 x {members} 人, 每个房间每秒约 {rate} 个表情, 共 {len(events)} 条消息:')
+    for name, result, elapsed in (('逐条广播', direct, direct_time), (f'{interval * 1000:.0f}毫秒节拍', ticked, ticked_time)):
+        fanouts = sum(r.fanouts for r in result)
+        packets = sum(r.packets for r in result)
+        print(f'  {name}: 房间广播 {fanouts / seconds:.0f} 次/秒, 数据包 {packets / seconds:.0f} 个/秒, '
+              f'编码发送 {elapsed * 1e3:.0f} 毫秒')
+    print(f'  节省房间广播 {stats["fanouts_saved_per_second"]:.0f} 次/秒')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import random
+import time
+
+from timers import TimingWheel
+
+# 决策计时器压力测试: 10万个同时活跃的计时器
+# 运行: python -m benchmarks.bench_timers
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def per_op(fn, keys):
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def main(timers=100_000, seed=0):
+    rng = random.Random(seed)
+    clock = FakeClock()
+    wheel = TimingWheel(tick=0.1, clock=clock)
+    fired = []
+    keys = list(range(timers))
+
+    arm_us = per_op(lambda k: wheel.arm(k, rng.uniform(1, 60), fired.append, k), keys)
+    # 每次玩家操作都会重新计时
+    rearm_us = per_op(lambda k: wheel.arm(k, 60, fired.append, k), keys)
+    cancel_us = per_op(wheel.cancel, keys[::10])
+    extend_us = per_op(lambda k: wheel.extend(k, 30), keys[1::10])
+    active = len(wheel)
+
+    tick_times = []
+    while len(wheel):
+        clock.now += wheel.tick
+        start = time.perf_counter()
+        wheel.advance()
+        tick_times.append(time.perf_counter() - start)
+
+    assert len(fired) == active == len(set(fired))
+
+    # 空闲2分钟（没有推进）后设置的60秒计时器不能在下一个tick就触发
+    clock.now += 120
+    wheel.arm('idle', 60, fired.append, 'idle')
+    clock.now += wheel.tick
+    wheel.advance()
+    assert 'idle' not in fired and 59.8 <= wheel.remaining('idle') <= 60
+    clock.now += 60
+    wheel.advance()
+    assert fired[-1] == 'idle'
+    print(f'活跃计时器: {active:,}')
+    print(f'设置: {arm_us:.2f} 微秒  重设: {rearm_us:.2f} 微秒  取消: {cancel_us:.2f} 微秒  延长: {extend_us:.2f} 微秒')
+    print(f'每tick推进: 平均 {sum(tick_times) / len(tick_times) * 1e6:.1f} 微秒, '
+          f'最大 {max(tick_times) * 1e3:.2f} 毫秒, 共触发 {len(fired):,} 个')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import json
+import time
+
+import wire
+from benchmarks.bench_delta import public_state, table
+from delta import TableState
+
+# 传输格式基准测试: 10人牌桌完整状态的JSON与MessagePack帧大小和编码耗时
+# 运行: python -m benchmarks.bench_wire
+
+
+def main(rounds=20_000):
+    game = table()
+    # 翻牌后的牌桌，带公共牌
+    game.community_cards = [game.deck.draw() for _ in range(3)]
+    state = TableState()
+    state.publish(*public_state(game))
+    snapshot = state.snapshot()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        text = json.dumps(snapshot, separators=(',', ':'))
+    json_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        frame = wire.pack(snapshot)
+    msgpack_time = time.perf_counter() - start
+
+    size = len(text.encode())
+    print(f'JSON:        {size} 字节, {json_time / rounds * 1e6:.1f} 微秒/次')
+    print(f'MessagePack: {len(frame)} 字节 ({len(frame) / size:.0%}), {msgpack_time / rounds * 1e6:.1f} 微秒/次')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import json
+import time
+
+import wire
+from cards import WIRE_CARDS
+
+# 房间广播层: 每个状态版本只编码一次JSON
+#
+# SocketIO(json=broadcast) 使用本模块的 dumps/loads。发送 EncodedPayload 时
+# 直接拼接已编码的文本，不再重复序列化；其他数据照常交给标准json模块。
+# 选择了 msgpack 的客户端（见 wire.py）收到同一数据的二进制帧，同样每个版本只编码一次。
+
+SEPARATORS = (',', ':')
+
+
+class EncodedPayload:
+    __slots__ = ('text',)
+
+    def __init__(self, data=None, text=None):
+        self.text = text if text is not None else json.dumps(data, separators=SEPARATORS)
+
+    def __len__(self):
+        return len(self.text)
+
+
+def dumps(obj, **kwargs):
+    if type(obj) is list and any(type(item) is EncodedPayload for item in obj):
+        return '[' + ','.join(
+            item.text if type(item) is EncodedPayload else json.dumps(item, **kwargs)
+            for item in obj
+        ) + ']'
+    return json.dumps(obj, **kwargs)
+
+
+loads = json.loads
+
+# 52张牌的JSON文本，私有手牌帧直接拼接
+CARD_JSON = tuple(json.dumps(card, separators=SEPARATORS) for card in WIRE_CARDS)
+
+
+def cards_payload(cards):
+    return EncodedPayload(text='{"cards":[' + ','.join(CARD_JSON[c] for c in cards) + ']}')
+
+
+def encode(fmt, data):
+    if fmt == wire.MSGPACK:
+        return wire.pack(data)
+    return EncodedPayload(data)
+
+
+class RoomBroadcaster:
+    # members(room_id) 返回房间内所有sid，用于找出需要二进制帧的客户端
+    def __init__(self, socketio, members=None):
+        self.socketio = socketio
+        self.members = members
+        self._cache = {}  # room_id -> {(event, fmt): (version, payload)}
+        self._binary = set()  # 选择了 msgpack 的sid
+        self.hits = 0
+        self.misses = 0
+        self.bytes_encoded = 0
+        self.started_at = time.time()
+
+    def set_format(self, sid, fmt):
+        if fmt == wire.MSGPACK:
+            self._binary.add(sid)
+        else:
+            self._binary.discard(sid)
+
+    def format_of(self, sid):
+        return wire.MSGPACK if sid in self._binary else wire.JSON
+
+    def drop_sid(self, sid):
+        self._binary.discard(sid)
+
+    # 取某个版本的已编码数据，版本变化时才重新编码
+    def encoded(self, room_id, event, version, build, fmt=wire.JSON):
+        events = self._cache.setdefault(room_id, {})
+        entry = events.get((event, fmt))
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        payload = encode(fmt, build() if callable(build) else build)
+        self.misses += 1
+        self.bytes_encoded += len(payload)
+        events[(event, fmt)] = (version, payload)
+        return payload
+
+    # 房间内选择了二进制格式的sid
+    def _binary_members(self, room_id, skip_sid=None):
+        if not self._binary or self.members is None:
+            return []
+        return [sid for sid in self.members(room_id) if sid in self._binary and sid != skip_sid]
+
+    # to 为单个sid时只发给该客户端，否则广播到房间
+    def emit(self, event, room_id, version, build, to=None, skip_sid=None):
+        if to is not None and to != room_id:
+            payload = self.encoded(room_id, event, version, build, self.format_of(to))
+            self.socketio.emit(event, payload, to=to)
+            return
+
+        binary = self._binary_members(room_id, skip_sid)
+        if binary:
+            if callable(build):
+                build = build()
+            frame = self.encoded(room_id, event, version, build, wire.MSGPACK)
+            for sid in binary:
+                self.socketio.emit(event, frame, to=sid)
+            if skip_sid is not None:
+                binary.append(skip_sid)
+            skip_sid = binary
+        payload = self.encoded(room_id, event, version, build)
+        self.socketio.emit(event, payload, to=room_id, skip_sid=skip_sid)
+
+    # 不带版本号的一次性房间事件，每种格式只编码一次
+    def emit_room(self, event, room_id, data):
+        binary = self._binary_members(room_id)
+        skip_sid = None
+        if binary:
+            frame = wire.pack(data)
+            self.bytes_encoded += len(frame)
+            for sid in binary:
+                self.socketio.emit(event, frame, to=sid)
+            skip_sid = binary
+        payload = EncodedPayload(data)
+        self.bytes_encoded += len(payload)
+        self.socketio.emit(event, payload, to=room_id, skip_sid=skip_sid)
+
+    # 一次构建所有玩家的私有手牌帧，再逐个发送
+    def emit_private_cards(self, event, hands):
+        frames = []
+        for sid, cards in hands:
+            if sid in self._binary:
+                frames.append((sid, wire.pack({'cards': [WIRE_CARDS[c] for c in cards]})))
+            else:
+                frames.append((sid, cards_payload(cards)))
+        for sid, payload in frames:
+            self.bytes_encoded += len(payload)
+            self.socketio.emit(event, payload, to=sid)
+
+    def forget(self, room_id):
+        self._cache.pop(room_id, None)
+
+    def stats(self):
+        requests = self.hits + self.misses
+        elapsed = max(time.time() - self.started_at, 1e-9)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / requests, 4) if requests else 0.0,
+            'bytes_encoded': self.bytes_encoded,
+            'bytes_per_second': round(self.bytes_encoded / elapsed, 1),
+            'cached_rooms': len(self._cache),
+            'binary_clients': len(self._binary)
+        }
@@ -0,0 +1,98 @@
+import random
+from array import array
+
+# 整数牌编码，评估器、牌堆和序列化共用
+#
+# code = rank * 4 + suit，取值0-51
+#   rank: 0-12 对应 2-A (value = rank + 2)
+#   suit: 0-3 对应 SUITS
+
+SUITS = ('hearts', 'diamonds', 'clubs', 'spades')
+SUIT_SYMBOLS = ('♥', '♦', '♣', '♠')
+RANK_NAMES = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+
+
+def encode_card(rank, suit):
+    return rank * 4 + suit
+
+
+def card_rank(card):
+    return card >> 2
+
+
+def card_suit(card):
+    return card & 3
+
+
+def card_value(card):
+    return (card >> 2) + 2
+
+
+def card_name(card):
+    return RANK_NAMES[card >> 2] + SUIT_SYMBOLS[card & 3]
+
+
+# 位掩码: 第code位表示该牌
+def cards_mask(cards):
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+
+def mask_cards(mask):
+    return [c for c in range(52) if mask >> c & 1]
+
+
+# 发给客户端的牌，只读，52张预先生成后共享
+class WireCard(dict):
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('牌的序列化形式不可修改')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _readonly
+
+
+WIRE_CARDS = tuple(WireCard(suit=SUITS[c & 3], value=(c >> 2) + 2) for c in range(52))
+
+
+def to_wire(cards):
+    return [WIRE_CARDS[c] for c in cards]
+
+
+# 数组实现的牌堆: 每次只对要发的牌做一步Fisher-Yates，
+# 未发出的牌始终在 cards[:size] 中，reset() 不重新分配内存
+class Deck:
+    __slots__ = ('cards', 'size', '_random')
+
+    def __init__(self, rng=None):
+        self.cards = array('b', range(52))
+        self.size = 52
+        self._random = (rng or random).random
+
+    def __len__(self):
+        return self.size
+
+    def reset(self):
+        self.size = 52
+
+    def _draw_one(self):
+        cards = self.cards
+        size = self.size - 1
+        j = int(self._random() * (size + 1))
+        card = cards[j]
+        cards[j] = cards[size]
+        cards[size] = card
+        self.size = size
+        return card
+
+    def draw(self, count=1):
+        if count == 1:
+            return self._draw_one() if self.size else None
+        return [self._draw_one() for _ in range(min(count, self.size))]
+
+    # 从快照恢复牌的顺序和剩余张数
+    def load(self, cards, size):
+        self.cards = array('b', cards)
+        self.size = size
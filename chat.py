@@ -0,0 +1,121 @@
+import os
+import time
+from collections import deque
+
+# 聊天处理: 按连接限速、敏感词过滤、每个房间最近消息的环形缓冲
+#
+# 限速用令牌桶: 每个sid每秒补充 rate 个令牌，最多攒 burst 个，每条消息消耗一个。
+# 敏感词用Aho–Corasick自动机，一次扫描消息即可判断是否包含词表中任意一个词，
+# 耗时与词表大小无关。词表从 CHAT_BANNED_WORDS 指向的文件读取（每行一个词）。
+
+DEFAULT_BANNED_WORDS = ('脏话1', '脏话2')
+
+
+class RateLimiter:
+    def __init__(self, rate=1.0, burst=5, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._buckets = {}  # sid -> [令牌数, 上次补充时间]
+        self.rejected = 0
+
+    def allow(self, sid):
+        now = self._clock()
+        bucket = self._buckets.get(sid)
+        if bucket is None:
+            bucket = self._buckets[sid] = [self.burst, now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] < 1:
+            self.rejected += 1
+            return False
+        bucket[0] -= 1
+        return True
+
+    def forget(self, sid):
+        self._buckets.pop(sid, None)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class WordFilter:
+    def __init__(self, words):
+        # 状态0为根；_goto[s] 为字符 -> 下一个状态，_match[s] 表示到达状态s时已匹配到某个词
+        self._goto = [{}]
+        self._match = [False]
+        self.size = 0
+        for word in words:
+            word = word.strip().casefold()
+            if not word:
+                continue
+            self.size += 1
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = self._goto[state][ch] = len(self._goto)
+                    self._goto.append({})
+                    self._match.append(False)
+                state = nxt
+            self._match[state] = True
+        self._build()
+
+    # 按层构造失配指针，并把失配状态的转移合并进每个状态（根的转移除外，扫描时单独回退到根），
+    # 扫描时每个字符只查一次字典，不需要沿失配链回退
+    def _build(self):
+        goto, match = self._goto, self._match
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                if state:
+                    fail[nxt] = goto[fail[state]].get(ch) or goto[0].get(ch, 0)
+                    match[nxt] = match[nxt] or match[fail[nxt]]
+            # 失配状态层数更浅，它的转移已经合并完整
+            if fail[state]:
+                for ch, nxt in goto[fail[state]].items():
+                    goto[state].setdefault(ch, nxt)
+
+    def contains(self, text):
+        goto, match = self._goto, self._match
+        root = goto[0]
+        state = 0
+        for ch in text.casefold():
+            state = goto[state].get(ch) or root.get(ch, 0)
+            if match[state]:
+                return True
+        return False
+
+
+def load_words(path=None):
+    path = path or os.environ.get('CHAT_BANNED_WORDS')
+    if not path:
+        return DEFAULT_BANNED_WORDS
+    with open(path, encoding='utf-8') as f:
+        return [line for line in f.read().splitlines() if line.strip()]
+
+
+# 每个房间最近 size 条消息，新加入的玩家收到这些消息
+class ChatHistory:
+    def __init__(self, size=50):
+        self.size = size
+        self._rooms = {}
+
+    def append(self, room_id, message):
+        buffer = self._rooms.get(room_id)
+        if buffer is None:
+            buffer = self._rooms[room_id] = deque(maxlen=self.size)
+        buffer.append(message)
+
+    def recent(self, room_id):
+        return list(self._rooms.get(room_id, ()))
+
+    def forget(self, room_id):
+        self._rooms.pop(room_id, None)
+
+    def __len__(self):
+        return len(self._rooms)
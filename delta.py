@@ -0,0 +1,68 @@
+# 带版本号的房间公共状态，广播时只发送变化的字段
+#
+# 状态由普通字段(fields)和按座位顺序排列的玩家列表组成，玩家用 key 字段标识。
+# 每次发布与上一次发布的状态比较:
+#   {'version': n, 'fields': {变化的字段}, 'players': {玩家id: {变化的字段}},
+#    'order': [玩家id...]  # 仅在座位顺序或成员变化时出现}
+# 客户端收到的版本号不连续时发送 request_snapshot 获取完整状态。
+
+
+class TableState:
+    __slots__ = ('key', 'version', '_fields', '_players', '_order')
+
+    def __init__(self, key='id'):
+        self.key = key
+        self.version = 0
+        self._fields = {}
+        self._players = {}
+        self._order = []
+
+    # 发布新状态，返回差量；没有变化时返回None
+    def publish(self, fields, players):
+        key = self.key
+        changed_fields = {k: v for k, v in fields.items() if self._fields.get(k, _MISSING) != v}
+        removed_fields = [k for k in self._fields if k not in fields]
+        for k in removed_fields:
+            changed_fields[k] = None
+
+        order = []
+        changed_players = {}
+        current = {}
+        for player in players:
+            pid = player[key]
+            order.append(pid)
+            previous = self._players.get(pid)
+            if previous is None:
+                changed_players[pid] = dict(player)
+            else:
+                diff = {k: v for k, v in player.items() if previous.get(k, _MISSING) != v}
+                if diff:
+                    changed_players[pid] = diff
+            current[pid] = dict(player)
+
+        order_changed = order != self._order
+        if not changed_fields and not changed_players and not order_changed:
+            return None
+
+        self.version += 1
+        self._fields = dict(fields)
+        self._players = current
+        self._order = order
+        delta = {'version': self.version}
+        if changed_fields:
+            delta['fields'] = changed_fields
+        if changed_players:
+            delta['players'] = changed_players
+        if order_changed:
+            delta['order'] = order
+        return delta
+
+    def snapshot(self):
+        return {
+            'version': self.version,
+            'fields': dict(self._fields),
+            'players': [self._players[pid] for pid in self._order]
+        }
+
+
+_MISSING = object()
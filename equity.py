@@ -0,0 +1,102 @@
+import itertools
+from math import comb
+
+import numpy as np
+
+from hand_evaluator import evaluate_batch
+
+# 全下胜率计算
+#
+# 剩余公共牌组合数不超过 EXACT_LIMIT 时穷举（翻牌后/转牌后），
+# 否则用NumPy批量蒙特卡洛抽样（翻牌前）。所有公共牌一次性组成
+# (牌面数 * 玩家数, 7) 的数组交给 evaluate_batch 评估。
+
+EXACT_LIMIT = 50000
+DEFAULT_ITERATIONS = 10000
+
+
+def _remaining_cards(holes, board, dead):
+    used = set(board) | set(dead)
+    for hole in holes:
+        used.update(hole)
+    return np.array([c for c in range(52) if c not in used], dtype=np.int8)
+
+
+# 对每一行做 picks 步的部分Fisher-Yates洗牌，即从 n 张牌中无放回均匀抽样，返回(iterations, picks)下标
+def _sample(n, picks, iterations, rng):
+    order = np.tile(np.arange(n, dtype=np.int8), (iterations, 1))
+    rows = np.arange(iterations)
+    for j in range(picks):
+        chosen = rng.integers(j, n, size=iterations)
+        swapped = order[rows, chosen]
+        order[rows, chosen] = order[:, j]
+        order[:, j] = swapped
+    return order[:, :picks]
+
+
+# 生成需要评估的公共牌组合，返回(牌面数, 5)数组和是否为穷举
+def _boards(holes, board, dead, iterations, rng):
+    missing = 5 - len(board)
+    remaining = _remaining_cards(holes, board, dead)
+    if missing == 0:
+        return np.array([board], dtype=np.int8), True
+
+    if comb(len(remaining), missing) <= EXACT_LIMIT:
+        runouts = np.array(list(itertools.combinations(range(len(remaining)), missing)), dtype=np.intp)
+        exact = True
+    else:
+        runouts = _sample(len(remaining), missing, iterations, rng)
+        exact = False
+
+    boards = np.empty((len(runouts), 5), dtype=np.int8)
+    boards[:, :len(board)] = board
+    boards[:, len(board):] = remaining[runouts]
+    return boards, exact
+
+
+# 计算每位玩家的胜率(平局按人数平分)，返回(胜率数组, 是否为穷举, 牌面数)
+def equity(holes, board=(), dead=(), iterations=DEFAULT_ITERATIONS, seed=None):
+    rng = np.random.default_rng(seed)
+    board = list(board)
+    boards, exact = _boards(holes, board, dead, iterations, rng)
+    n_boards, n_players = len(boards), len(holes)
+
+    hands = np.empty((n_boards, n_players, 7), dtype=np.int8)
+    hands[:, :, :5] = boards[:, None, :]
+    hands[:, :, 5:] = np.array(holes, dtype=np.int8)[None, :, :]
+    values = evaluate_batch(hands.reshape(-1, 7)).reshape(n_boards, n_players)
+
+    winners = values == values.max(axis=1, keepdims=True)
+    shares = winners / winners.sum(axis=1, keepdims=True)
+    return shares.mean(axis=0), exact, n_boards
+
+
+# 一手牌对随机手牌的胜率（蒙特卡洛）：返回长度为 opponents 的数组，第k-1项是对k个对手的胜率
+# 每次抽样同时发出公共牌和所有对手的手牌，对k个对手的结果取前k个对手
+def equity_vs_random(hole, board=(), opponents=1, iterations=DEFAULT_ITERATIONS, seed=None):
+    rng = np.random.default_rng(seed)
+    board = list(board)
+    missing = 5 - len(board)
+    remaining = _remaining_cards([hole], board, ())
+    drawn = remaining[_sample(len(remaining), missing + 2 * opponents, iterations, rng)]
+
+    boards = np.empty((iterations, 5), dtype=np.int8)
+    boards[:, :len(board)] = board
+    boards[:, len(board):] = drawn[:, :missing]
+    hands = np.empty((iterations, opponents + 1, 7), dtype=np.int8)
+    hands[:, :, :5] = boards[:, None, :]
+    hands[:, 0, 5:] = hole
+    hands[:, 1:, 5:] = drawn[:, missing:].reshape(iterations, opponents, 2)
+    values = evaluate_batch(hands.reshape(-1, 7)).reshape(iterations, opponents + 1)
+
+    hero = values[:, :1]
+    best = np.maximum.accumulate(values[:, 1:], axis=1)
+    ties = np.cumsum(values[:, 1:] == hero, axis=1)
+    shares = np.where(hero > best, 1.0, np.where(hero == best, 1.0 / (ties + 1), 0.0))
+    return shares.mean(axis=0)
+
+
+# 把底池按发牌轮数平分，零头给前面的轮次
+def split_pot(pot, runs):
+    share, remainder = divmod(pot, runs)
+    return [share + (1 if i < remainder else 0) for i in range(runs)]
@@ -0,0 +1,461 @@
+import random
+
+from cards import Deck
+from equity import equity, split_pot
+from hand_evaluator import showdown
+from history import BLIND, CALL, CHECK, FOLD, RAISE, STREETS
+from settlement import award_pots, build_pots, seat_order
+
+# 牌局引擎: 玩家和一张牌桌的下注、发牌、结算，不依赖Socket.IO，服务端和离线模拟共用
+#
+# 下注状态按座位号索引: seat_of 把玩家id映射到座位，active_mask/all_in_mask 是还能行动的座位
+# 和已全下的座位的位掩码，to_act 是本轮还欠一次行动的人数（有人加注时重置为其他所有能行动的人）。
+# 找下一个行动者、判断本轮是否结束都只是几次位运算；to_act 为0时本轮结束，
+# 所有人的下注额相同但还有人没行动过（例如翻牌前大盲注的选择权）时本轮不会提前结束。
+
+
+def popcount(mask):
+    return bin(mask).count('1')
+
+
+# 座位 seat 之后（顺时针）第一个在 mask 中的座位，没有时绕回最小的座位
+def next_seat(mask, seat):
+    after = mask >> (seat + 1) << (seat + 1)
+    after = after or mask
+    return (after & -after).bit_length() - 1
+
+
+class Player:
+    __slots__ = ('id', 'username', 'avatar', 'chips', 'cards', 'bet', 'total_bet', 'time_bank',
+                 'folded', 'all_in', 'is_host')
+
+    def __init__(self, id, username, avatar, chips):
+        self.id = id
+        self.username = username
+        self.avatar = avatar
+        self.chips = chips
+        self.cards = []
+        self.bet = 0
+        self.total_bet = 0  # 本手跨所有下注轮的总投入，用于计算边池
+        self.time_bank = 0  # 超出决策时间后可额外使用的秒数
+        self.folded = False
+        self.all_in = False
+        self.is_host = False
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'avatar': self.avatar,
+            'chips': self.chips,
+            'bet': self.bet,
+            'folded': self.folded,
+            'all_in': self.all_in,
+            'is_host': self.is_host
+        }
+
+
+class PokerGame:
+    def __init__(self, room_id, settings):
+        self.room_id = room_id
+        self.settings = settings
+        self.players = []
+        self.seat_of = {}  # 玩家id -> 座位号
+        self.deck = None
+        self.seed = None  # 本手洗牌用的随机种子，写入手牌日志
+        self.rng = random.Random()
+        self.community_cards = []
+        self.actions = []  # 本手的操作 (座位, 下注轮, 操作, 金额)，本手结束时写入手牌历史
+        self.current_player_index = 0
+        self.active_mask = 0  # 未弃牌且未全下的座位
+        self.all_in_mask = 0  # 已全下的座位
+        self.to_act = 0  # 本轮还欠行动的人数，为0时本轮下注结束
+        self.last_aggressor = None  # 本轮最后一个加注的座位，翻牌前为大盲注
+        self.pot = 0
+        self.current_bet = 0
+        self.small_blind = settings['smallBlind']
+        self.big_blind = settings['bigBlind']
+        self.round = 'pre-flop'  # pre-flop, flop, turn, river
+        self.hand_over = False  # 河牌下注结束，等待摊牌
+        self.settling = False  # 正在摊牌结算（评估可能在工作进程中进行）
+        self.timer = None  # 当前行动玩家的决策截止时间（时间戳）
+        self.decision_time = settings.get('decisionTime', 60)
+        self.time_bank = settings.get('timeBank', 30)
+        self.showdown_results = []
+        self.runouts = []
+        self.side_pots = []
+        self.all_in_equity = []
+        self.all_in_rounds = 0
+        self.max_all_in_rounds = settings['maxRounds']
+
+    def add_player(self, player):
+        if len(self.players) < self.settings['maxPlayers']:
+            if not self.players:  # 第一个玩家是房主
+                player.is_host = True
+            player.time_bank = self.time_bank
+            self.seat_of[player.id] = len(self.players)
+            self.players.append(player)
+            return True
+        return False
+
+    # 只在两手之间调用；后面的座位号依次前移，下一手发牌时重建位掩码
+    def remove_player(self, player_id):
+        seat = self.seat_of.pop(player_id, None)
+        if seat is None:
+            return
+        del self.players[seat]
+        for player in self.players[seat:]:
+            self.seat_of[player.id] -= 1
+        if self.players and not any(p.is_host for p in self.players):
+            self.players[0].is_host = True  # 设置新房主
+
+    def player_by_id(self, player_id):
+        seat = self.seat_of.get(player_id)
+        return None if seat is None else self.players[seat]
+
+    # 座位换到新的玩家id（重新连接）
+    def rebind(self, old_id, new_id):
+        seat = self.seat_of.pop(old_id, None)
+        if seat is not None:
+            self.seat_of[new_id] = seat
+            self.players[seat].id = new_id
+
+    def start_game(self, seed=None):
+        if len(self.players) < 4:
+            return False, "至少需要4名玩家才能开始游戏"
+
+        # 每手用新的种子洗牌，恢复时用同一个种子重放出相同的牌
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng.seed(self.seed)
+        # 牌堆在整局游戏中复用，每手只重置
+        if self.deck is None:
+            self.deck = Deck(self.rng)
+        else:
+            self.deck.reset()
+        self.deal_initial_cards()
+        self.setup_blinds()
+        return True, None
+
+    def deal_initial_cards(self):
+        for player in self.players:
+            player.cards = self.deck.draw(2)
+            player.folded = False
+            player.all_in = False
+            player.bet = 0
+            player.total_bet = 0
+
+        self.community_cards = []
+        self.actions = []
+        self.pot = 0
+        self.current_bet = self.big_blind
+        self.round = 'pre-flop'
+        self.hand_over = False
+        self.active_mask = (1 << len(self.players)) - 1
+        self.all_in_mask = 0
+        self.to_act = 0
+        self.last_aggressor = None
+
+    def post_chips(self, seat, amount):
+        # 投入筹码，不足时全下
+        player = self.players[seat]
+        if amount >= player.chips:
+            amount = player.chips
+            player.all_in = True
+            self.active_mask &= ~(1 << seat)
+            self.all_in_mask |= 1 << seat
+        player.chips -= amount
+        player.bet += amount
+        player.total_bet += amount
+        self.pot += amount
+        return amount
+
+    def setup_blinds(self):
+        # 小盲注
+        seat = 1 % len(self.players)
+        self.actions.append((seat, 0, BLIND, self.post_chips(seat, self.small_blind)))
+
+        # 大盲注
+        seat = 2 % len(self.players)
+        self.actions.append((seat, 0, BLIND, self.post_chips(seat, self.big_blind)))
+        self.last_aggressor = seat
+
+        # 起始玩家是大盲注后面第一个能行动的玩家，盲注不算行动，所有人都欠一次行动
+        self.open_round(seat)
+
+    # 开始一轮下注: 从 seat 之后的座位开始，每个能行动的玩家欠一次行动
+    def open_round(self, seat):
+        self.to_act = popcount(self.active_mask)
+        if self.to_act:
+            self.current_player_index = next_seat(self.active_mask, seat)
+            self.close_if_uncontested()
+
+    # 只剩一个能行动的玩家且已跟到最高下注额时，没有人可以再和他下注
+    def close_if_uncontested(self):
+        mask = self.active_mask
+        if mask & (mask - 1) == 0:
+            if not mask or self.players[mask.bit_length() - 1].bet >= self.current_bet:
+                self.to_act = 0
+
+    # process_action 之后调用: 返回下一位行动的玩家，本手不再有人需要行动时返回None
+    def get_next_player(self):
+        if self.hand_over or not self.to_act:
+            return None
+        return self.players[self.current_player_index]
+
+    def get_available_actions(self, player):
+        actions = ['fold']
+        
+        # 如果当前下注等于玩家已下注，可以看牌
+        if self.current_bet == player.bet:
+            actions.append('check')
+        else:
+            actions.append('call')
+        
+        # 如果玩家还有筹码可以加注
+        if player.chips > 0:
+            actions.append('raise')
+
+        return {
+            'actions': actions,
+            'callAmount': self.current_bet - player.bet if 'call' in actions else 0,
+            'minRaise': self.big_blind,
+            'maxRaise': player.chips
+        }
+
+    def process_action(self, player_id, action, amount=None):
+        seat = self.seat_of.get(player_id)
+        if seat is None or seat != self.current_player_index:
+            return False, "不是你的回合"
+        if self.hand_over or not self.to_act:
+            return False, "本手已结束"
+        player = self.players[seat]
+
+        posted = 0
+        if action == 'fold':
+            player.folded = True
+            self.active_mask &= ~(1 << seat)
+            self.to_act -= 1
+            code = FOLD
+        elif action == 'check':
+            if self.current_bet != player.bet:
+                return False, "当前无法看牌"
+            self.to_act -= 1
+            code = CHECK
+        elif action == 'call':
+            posted = self.post_chips(seat, self.current_bet - player.bet)
+            self.to_act -= 1
+            code = CALL
+        elif action == 'raise':
+            if not amount or amount < self.big_blind:
+                return False, "加注金额无效"
+            if amount > player.chips:
+                return False, "筹码不足"
+            # 没有全下时加注后的下注额必须超过当前最高下注额
+            if amount < player.chips and player.bet + amount <= self.current_bet:
+                return False, "加注金额无效"
+            posted = self.post_chips(seat, amount)
+            if player.bet > self.current_bet:
+                # 加注后其他所有能行动的玩家重新欠一次行动
+                self.current_bet = player.bet
+                self.last_aggressor = seat
+                self.to_act = popcount(self.active_mask & ~(1 << seat))
+            else:
+                self.to_act -= 1
+            code = RAISE
+        else:
+            return False, "无效的操作"
+        self.actions.append((seat, STREETS.index(self.round), code, posted))
+
+        in_hand = self.active_mask | self.all_in_mask
+        if in_hand & (in_hand - 1) == 0:
+            # 其他人都弃牌了
+            self.to_act = 0
+        elif self.to_act:
+            self.close_if_uncontested()
+        if self.to_act:
+            self.current_player_index = next_seat(self.active_mask, seat)
+        elif self.active_mask & (self.active_mask - 1):
+            # 本轮结束且还有至少两人能继续下注；否则剩下的公共牌在摊牌时发出
+            self.next_round()
+
+        return True, None
+
+    def check_round_complete(self):
+        return not self.to_act
+
+    def next_round(self):
+        # 重置玩家下注
+        for player in self.players:
+            player.bet = 0
+        self.current_bet = 0
+
+        if self.round == 'pre-flop':
+            self.round = 'flop'
+            self.community_cards.extend(self.deck.draw(3))
+        elif self.round == 'flop':
+            self.round = 'turn'
+            self.community_cards.append(self.deck.draw())
+        elif self.round == 'turn':
+            self.round = 'river'
+            self.community_cards.append(self.deck.draw())
+        else:
+            # 河牌下注结束，由调用方摊牌结算
+            self.hand_over = True
+            return
+
+        # 翻牌后从庄家（0号座位）左手第一个能行动的玩家开始
+        self.last_aggressor = None
+        self.open_round(0)
+
+    # with_equity 为False时跳过提前全下的胜率计算（只用于展示，离线模拟不需要）；
+    # run(jobs) 执行 [(函数, 参数)] 并返回结果列表，可以把牌型评估交给工作进程
+    def determine_winner(self, with_equity=True, run=None):
+        active_players = [p for p in self.players if not p.folded]
+        if len(active_players) == 1:
+            winner = active_players[0]
+            winnings = self.pot
+            winner.chips += winnings
+            self.pot = 0
+            self.showdown_results = []
+            self.runouts = []
+            self.side_pots = []
+            self.all_in_equity = []
+            return [{
+                'player': winner,
+                'hand': '其他玩家都弃牌',
+                'winnings': winnings
+            }]
+
+        holes = [p.cards for p in active_players]
+        missing = 5 - len(self.community_cards)
+        runs = 1
+        if missing:
+            # 提前全下：按房间设置发多轮公共牌
+            runs = max(1, min(self.max_all_in_rounds, len(self.deck) // missing))
+        boards = [self.community_cards + [self.deck.draw() for _ in range(missing)] for _ in range(runs)]
+
+        # 所有轮次的摊牌和全下胜率一次性计算
+        jobs = [(showdown, (board_cards, holes)) for board_cards in boards]
+        if missing and with_equity:
+            jobs.append((equity, (holes, self.community_cards)))
+        evaluated = None
+        if run:
+            try:
+                evaluated = run(jobs)
+            except Exception:
+                # 工作进程中途退出等: 公共牌已经发出，在这里用同样的牌重算，
+                # 本手照常结算，重启后重放日志的结果也与此相同
+                evaluated = None
+        if evaluated is None:
+            evaluated = [func(*args) for func, args in jobs]
+        self.all_in_equity = []
+        if missing and with_equity:
+            shares, exact, _ = evaluated.pop()
+            self.all_in_equity = [{
+                'player': p,
+                'equity': float(e),
+                'exact': exact
+            } for p, e in zip(active_players, shares)]
+
+        # 按本手总投入构建主池和边池；多轮发牌时每个池按轮数平分
+        contributions = [p.total_bet for p in self.players]
+        folded = [p.folded for p in self.players]
+        active_seats = [i for i, p in enumerate(self.players) if not p.folded]
+        pots = build_pots(contributions, folded)
+        pot_shares = [split_pot(amount, runs) for amount, _ in pots]
+        self.side_pots = [{
+            'amount': amount,
+            'players': [self.players[s] for s in eligible]
+        } for amount, eligible in pots]
+        # 零头从小盲位（庄家左手）开始按座位顺序派发
+        order = seat_order(len(self.players), 1 % len(self.players))
+
+        payouts = {}
+        self.runouts = []
+        values = [0] * len(self.players)
+        for index, (board_cards, results) in enumerate(zip(boards, evaluated)):
+            ranked = [{
+                'player': p,
+                'hand': r['hand'],
+                'category': r['category'],
+                'place': r['place']
+            } for p, r in zip(active_players, results)]
+            self.runouts.append({'community_cards': board_cards, 'results': ranked})
+
+            for seat, r in zip(active_seats, results):
+                values[seat] = r['value']
+            run_pots = [(shares[index], eligible) for shares, (_, eligible) in zip(pot_shares, pots)]
+            amounts, _ = award_pots(run_pots, values, order)
+            hands = dict(zip(active_seats, ranked))
+            for seat, winnings in enumerate(amounts):
+                if not winnings:
+                    continue
+                player = self.players[seat]
+                player.chips += winnings
+                if player.id in payouts:
+                    payouts[player.id]['winnings'] += winnings
+                else:
+                    payouts[player.id] = {
+                        'player': player,
+                        'hand': hands[seat]['hand'],
+                        'category': hands[seat]['category'],
+                        'winnings': winnings
+                    }
+
+        self.community_cards = self.runouts[0]['community_cards']
+        self.showdown_results = self.runouts[0]['results']
+        self.all_in_rounds = runs
+        self.pot = 0
+        return list(payouts.values())
+
+    # 快照用的可序列化状态；摊牌结果、排行榜等展示数据不保存
+    def to_state(self):
+        return {
+            'room_id': self.room_id,
+            'settings': self.settings,
+            'players': [{key: getattr(p, key) for key in Player.__slots__} for p in self.players],
+            'seed': self.seed,
+            'deck': [list(self.deck.cards), self.deck.size] if self.deck else None,
+            'community_cards': self.community_cards,
+            'actions': self.actions,
+            'current_player_index': self.current_player_index,
+            'to_act': self.to_act,
+            'last_aggressor': self.last_aggressor,
+            'pot': self.pot,
+            'current_bet': self.current_bet,
+            'round': self.round,
+            'hand_over': self.hand_over,
+            'timer': self.timer,
+            'all_in_rounds': self.all_in_rounds
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        game = cls(state['room_id'], state['settings'])
+        for seat, data in enumerate(state['players']):
+            player = Player(data['id'], data['username'], data['avatar'], data['chips'])
+            for key, value in data.items():
+                setattr(player, key, value)
+            game.seat_of[player.id] = seat
+            game.players.append(player)
+            if player.all_in:
+                game.all_in_mask |= 1 << seat
+            elif not player.folded:
+                game.active_mask |= 1 << seat
+        for key in ('community_cards', 'current_player_index', 'pot', 'current_bet', 'round', 'timer', 'all_in_rounds'):
+            setattr(game, key, state[key])
+        game.hand_over = state.get('hand_over', False)
+        # 旧快照没有 to_act 时按本轮所有能行动的人都还没行动恢复
+        game.to_act = state.get('to_act', 0 if game.hand_over else popcount(game.active_mask))
+        game.last_aggressor = state.get('last_aggressor')
+        game.actions = [tuple(action) for action in state['actions']]
+        if state['deck'] is not None:
+            # 每发一张牌消耗一个随机数，重新消耗一遍后续发牌与快照前一致
+            cards, size = state['deck']
+            game.seed = state['seed']
+            game.rng.seed(game.seed)
+            for _ in range(52 - size):
+                game.rng.random()
+            game.deck = Deck(game.rng)
+            game.deck.load(cards, size)
+        return game
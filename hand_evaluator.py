@@ -0,0 +1,193 @@
+import itertools
+
+import numpy as np
+
+# 德州扑克7张牌评估器（查表实现）
+#
+# 牌使用 cards.py 中的整数编码: code = rank * 4 + suit
+#
+# 牌力值越大越好: (牌型 << 20) | 五张比较牌的点数(每张4位)
+# 非同花部分用点数多重集的组合数排名做完美哈希(C(19,7)=50388项)，
+# 同花部分用13位点数掩码直接查表(8192项)。两张表都在导入时生成一次。
+
+HIGH_CARD = 0
+ONE_PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+
+HAND_NAMES = ['高牌', '一对', '两对', '三条', '顺子', '同花', '葫芦', '四条', '同花顺']
+
+CATEGORY_SHIFT = 20
+
+
+def hand_category(value):
+    return value >> CATEGORY_SHIFT
+
+
+def hand_name(value):
+    category = value >> CATEGORY_SHIFT
+    # 最大的同花顺即皇家同花顺
+    if category == STRAIGHT_FLUSH and (value >> 16) & 0xF == 12:
+        return '皇家同花顺'
+    return HAND_NAMES[category]
+
+
+def _make_value(category, ranks):
+    value = category
+    for i in range(5):
+        value = (value << 4) | (ranks[i] if i < len(ranks) else 0)
+    return value
+
+
+# 从13位掩码中找最大的顺子，返回顶张点数，没有则返回-1
+def _straight_top(mask):
+    for top in range(12, 3, -1):
+        window = 0x1F << (top - 4)
+        if mask & window == window:
+            return top
+    # A-2-3-4-5
+    if mask & 0x100F == 0x100F:
+        return 3
+    return -1
+
+
+def _flush_value(mask):
+    top = _straight_top(mask)
+    if top >= 0:
+        return _make_value(STRAIGHT_FLUSH, [top])
+    ranks = [r for r in range(12, -1, -1) if mask >> r & 1]
+    return _make_value(FLUSH, ranks[:5])
+
+
+def _counts_value(counts):
+    by_count = {4: [], 3: [], 2: [], 1: []}
+    mask = 0
+    for r in range(12, -1, -1):
+        if counts[r]:
+            by_count[counts[r]].append(r)
+            mask |= 1 << r
+
+    def kickers(exclude, n):
+        return [r for r in range(12, -1, -1) if counts[r] and r not in exclude][:n]
+
+    if by_count[4]:
+        quad = by_count[4][0]
+        return _make_value(FOUR_OF_A_KIND, [quad] + kickers((quad,), 1))
+    if by_count[3]:
+        trips = by_count[3][0]
+        pairs = by_count[3][1:] + by_count[2]
+        if pairs:
+            return _make_value(FULL_HOUSE, [trips, max(pairs)])
+    top = _straight_top(mask)
+    if top >= 0:
+        return _make_value(STRAIGHT, [top])
+    if by_count[3]:
+        trips = by_count[3][0]
+        return _make_value(THREE_OF_A_KIND, [trips] + kickers((trips,), 2))
+    if len(by_count[2]) >= 2:
+        high, low = by_count[2][:2]
+        return _make_value(TWO_PAIR, [high, low] + kickers((high, low), 1))
+    if by_count[2]:
+        pair = by_count[2][0]
+        return _make_value(ONE_PAIR, [pair] + kickers((pair,), 3))
+    return _make_value(HIGH_CARD, kickers((), 5))
+
+
+# 多重集组合数排名: 排好序的点数 r0<=...<=r6 映射为 sum(C(r_i + i, i + 1))
+def _build_position_table():
+    table = np.zeros((7, 13), dtype=np.int32)
+    for i in range(7):
+        for r in range(13):
+            table[i, r] = _binom(r + i, i + 1)
+    return table
+
+
+def _binom(n, k):
+    if k > n:
+        return 0
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+def _build_tables():
+    rank_table = np.zeros(_binom(19, 7), dtype=np.int32)
+    position = _POSITION.tolist()
+    for ranks in itertools.combinations_with_replacement(range(13), 7):
+        counts = [0] * 13
+        for r in ranks:
+            counts[r] += 1
+        if max(counts) > 4:
+            continue
+        index = sum(position[i][r] for i, r in enumerate(ranks))
+        rank_table[index] = _counts_value(counts)
+
+    flush_table = np.zeros(1 << 13, dtype=np.int32)
+    for mask in range(1 << 13):
+        if bin(mask).count('1') >= 5:
+            flush_table[mask] = _flush_value(mask)
+    return rank_table, flush_table
+
+
+_POSITION = _build_position_table()
+RANK_TABLE, FLUSH_TABLE = _build_tables()
+
+# 单手评估走纯Python列表，避免NumPy标量开销
+_POSITION_LIST = _POSITION.tolist()
+_RANK_LIST = RANK_TABLE.tolist()
+_FLUSH_LIST = FLUSH_TABLE.tolist()
+# 批量评估时按位置展开的偏移
+_POSITION_FLAT = _POSITION.ravel()
+_POSITION_OFFSETS = (np.arange(7, dtype=np.int32) * 13)[None, :]
+_SUIT_SHIFTS = (np.arange(4, dtype=np.int64) * 13)[None, :]
+
+
+# 评估一手7张牌(整数编码)，返回牌力值
+def evaluate(cards):
+    ranks = sorted(c >> 2 for c in cards)
+    p = _POSITION_LIST
+    value = _RANK_LIST[p[0][ranks[0]] + p[1][ranks[1]] + p[2][ranks[2]] + p[3][ranks[3]]
+                       + p[4][ranks[4]] + p[5][ranks[5]] + p[6][ranks[6]]]
+    masks = [0, 0, 0, 0]
+    for c in cards:
+        masks[c & 3] |= 1 << (c >> 2)
+    for mask in masks:
+        flush = _FLUSH_LIST[mask]
+        if flush > value:
+            value = flush
+    return value
+
+
+# 批量评估: hands为(N, 7)整数数组，返回(N,)的int32牌力值
+def evaluate_batch(hands):
+    hands = np.asarray(hands)
+    ranks = np.sort(hands, axis=1) >> 2
+    values = RANK_TABLE[_POSITION_FLAT[ranks + _POSITION_OFFSETS].sum(axis=1)]
+
+    # 把每张牌放到52位掩码中: 每种花色占13位
+    card_bits = np.left_shift(1, (hands >> 2).astype(np.int64) + (hands & 3).astype(np.int64) * 13)
+    suit_masks = (card_bits.sum(axis=1)[:, None] >> _SUIT_SHIFTS) & 0x1FFF
+    flush = FLUSH_TABLE[suit_masks].max(axis=1)
+    return np.maximum(values, flush)
+
+
+# 摊牌: 一次评估所有玩家，返回每人的牌力值、牌型和名次(1为最佳，平局同名次)
+def showdown(board, holes):
+    hands = np.empty((len(holes), 7), dtype=np.int16)
+    hands[:, :5] = board
+    hands[:, 5:] = holes
+    values = evaluate_batch(hands).tolist()
+    ordered = sorted(set(values), reverse=True)
+    place = {v: i + 1 for i, v in enumerate(ordered)}
+    return [{
+        'value': v,
+        'category': v >> CATEGORY_SHIFT,
+        'hand': hand_name(v),
+        'place': place[v]
+    } for v in values]
@@ -0,0 +1,163 @@
+import json
+import os
+import re
+import time
+
+# 手牌日志: 房间事件的预写日志，用于进程重启后恢复所有牌桌
+#
+# 所有房间的事件按顺序追加到同一个日志段 hands-<n>.log，每行一条
+# {"r": 房间号, "e": 事件, "d": 数据}。append() 只把记录放进内存缓冲区，
+# 后台写入协程每隔 interval 秒把缓冲区一次写入并 fsync（组提交）。
+# 写满 checkpoint_records 条记录后生成快照 snapshot-<n+1>.json 并切换到新的日志段，
+# 旧的日志段和快照随后删除。恢复时读取最新的快照，再按顺序重放其后的日志段。
+
+SEGMENT_RE = re.compile(r'^hands-(\d+)\.log$')
+SNAPSHOT_RE = re.compile(r'^snapshot-(\d+)\.json$')
+
+
+class HandLog:
+    # directory 为None时不记录；executor 用于把磁盘写入放到线程池（如 eventlet.tpool.execute）
+    def __init__(self, directory, interval=0.05, checkpoint_records=50000, executor=None):
+        self.directory = directory
+        self.interval = interval
+        self.checkpoint_records = checkpoint_records
+        self._execute = executor or (lambda func, *args: func(*args))
+        self._buffer = []
+        self._file = None
+        self._running = False
+        self.segment = 0
+        self.since_checkpoint = 0
+        self.appended = 0
+        self.flushes = 0
+        self.synced = 0
+        self.checkpoints = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.segment = max(self._indexes(SEGMENT_RE) + self._indexes(SNAPSHOT_RE), default=0)
+
+    @property
+    def enabled(self):
+        return self.directory is not None
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def _indexes(self, pattern):
+        return sorted(int(m.group(1)) for m in map(pattern.match, os.listdir(self.directory)) if m)
+
+    def _path(self, name, index):
+        return os.path.join(self.directory, f'{name}-{index}.{"log" if name == "hands" else "json"}')
+
+    def append(self, room_id, event, data):
+        if self.directory is None:
+            return
+        self._buffer.append(json.dumps({'r': room_id, 'e': event, 'd': data}, separators=(',', ':')))
+        self.appended += 1
+        self.since_checkpoint += 1
+
+    def _write(self, segment, lines, close=False):
+        if self._file is None or self._file[0] != segment:
+            self._file = (segment, open(self._path('hands', segment), 'a', encoding='utf-8'))
+        handle = self._file[1]
+        if lines:
+            handle.write('\n'.join(lines) + '\n')
+            handle.flush()
+            os.fsync(handle.fileno())
+        if close:
+            handle.close()
+            self._file = None
+
+    # 把缓冲区写入当前日志段并fsync，返回写入的记录数
+    def flush(self):
+        if self.directory is None or not self._buffer:
+            return 0
+        start = time.perf_counter()
+        lines = self._buffer
+        self._buffer = []
+        self._execute(self._write, self.segment, lines)
+        duration = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.synced += len(lines)
+        self.last_flush_ms = duration
+        self.max_flush_ms = max(self.max_flush_ms, duration)
+        return len(lines)
+
+    # 生成快照并切换日志段；state 必须是切换时刻所有房间的完整状态
+    def checkpoint(self, state):
+        if self.directory is None:
+            return
+        # 快照和缓冲区在同一时刻截断，此后的追加写入新的日志段
+        lines = self._buffer
+        self._buffer = []
+        old = self.segment
+        self.segment = old + 1
+        self.since_checkpoint = 0
+        # 在当前协程里序列化，写盘期间房间状态可能继续变化
+        text = json.dumps(state, separators=(',', ':'))
+        self._execute(self._write, old, lines, True)
+        self._execute(self._write_snapshot, self.segment, text)
+        for pattern, name in ((SEGMENT_RE, 'hands'), (SNAPSHOT_RE, 'snapshot')):
+            for index in self._indexes(pattern):
+                if index < self.segment:
+                    os.remove(self._path(name, index))
+        self.checkpoints += 1
+
+    def _write_snapshot(self, index, text):
+        path = self._path('snapshot', index)
+        with open(path + '.tmp', 'w', encoding='utf-8') as handle:
+            handle.write(text)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(path + '.tmp', path)
+
+    # 读取最新快照和其后的日志记录，返回 (快照状态, [(房间号, 事件, 数据)...])
+    def recover(self):
+        if self.directory is None:
+            return {}, []
+        snapshots = self._indexes(SNAPSHOT_RE)
+        base = snapshots[-1] if snapshots else 0
+        state = {}
+        if snapshots:
+            with open(self._path('snapshot', base), encoding='utf-8') as handle:
+                state = json.load(handle)
+        records = []
+        for index in self._indexes(SEGMENT_RE):
+            if index < base:
+                continue
+            with open(self._path('hands', index), encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 崩溃时最后一行可能只写了一半
+                        break
+                    records.append((record['r'], record['e'], record['d']))
+        return state, records
+
+    # 后台写入循环；snapshot() 返回所有房间的状态，用于定期生成快照
+    def run(self, sleep, snapshot=None):
+        self._running = True
+        while self._running:
+            sleep(self.interval)
+            self.flush()
+            if snapshot is not None and self.since_checkpoint >= self.checkpoint_records:
+                self.checkpoint(snapshot())
+
+    def stop(self):
+        self._running = False
+
+    def stats(self):
+        return {
+            'enabled': self.directory is not None,
+            'segment': self.segment,
+            'pending': len(self._buffer),
+            'appended': self.appended,
+            'synced': self.synced,
+            'flushes': self.flushes,
+            'records_per_flush': round(self.synced / self.flushes, 1) if self.flushes else 0.0,
+            'checkpoints': self.checkpoints,
+            'last_flush_ms': round(self.last_flush_ms, 3),
+            'max_flush_ms': round(self.max_flush_ms, 3)
+        }
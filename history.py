@@ -0,0 +1,258 @@
+import os
+
+import numpy as np
+
+# 手牌历史: 按列存储、内存映射读取的已完成手牌记录
+#
+# 三张表，每一列一个定长二进制文件（<表>.<列>.bin），追加写入，查询时用 np.memmap 映射:
+#   hands   每手一行: 时间、本手第一行结果的位置、座位数、大盲、底池
+#   results 每手每个座位一行: 玩家编号、座位、投入、赢得，以及写入时从操作汇总出的
+#           翻牌前标志 (VPIP/PFR) 和翻牌后加注、跟注次数，统计查询只需扫描这张表
+#   actions 每个操作一行: 手牌编号、座位、下注轮、操作、金额
+# 写入顺序是 actions -> results -> hands，hands 的行数就是已提交的手数；
+# 打开时截掉崩溃留下的未提交尾部。玩家名保存在 players.txt，行号即玩家编号。
+
+STREETS = ('pre-flop', 'flop', 'turn', 'river')
+ACTIONS = ('blind', 'fold', 'check', 'call', 'raise')
+BLIND, FOLD, CHECK, CALL, RAISE = range(len(ACTIONS))
+VPIP, PFR = 1, 2
+
+HAND_COLUMNS = (('time', 'f8'), ('first_result', 'i8'), ('seats', 'u1'), ('big_blind', 'i4'), ('pot', 'i4'))
+RESULT_COLUMNS = (('player', 'u4'), ('seat', 'u1'), ('invested', 'i4'), ('won', 'i4'),
+                  ('flags', 'u1'), ('raises', 'u1'), ('calls', 'u1'))
+ACTION_COLUMNS = (('hand', 'u4'), ('seat', 'u1'), ('street', 'u1'), ('action', 'u1'), ('amount', 'i4'))
+
+
+class ColumnTable:
+    def __init__(self, directory, name, columns):
+        self.columns = [(column, np.dtype(dtype)) for column, dtype in columns]
+        self._paths = {column: os.path.join(directory, f'{name}.{column}.bin') for column, _ in columns}
+        self._pending = {column: [] for column, _ in columns}
+        self._maps = {}
+        for path in self._paths.values():
+            open(path, 'ab').close()
+        self.truncate(min(self._file_rows(column) for column, _ in self.columns))
+
+    def _file_rows(self, column):
+        dtype = dict(self.columns)[column]
+        return os.path.getsize(self._paths[column]) // dtype.itemsize
+
+    # 写盘按列的顺序进行，最后一列写完的行才算提交；其他线程读取时不会看到只写了一部分列的行
+    @property
+    def committed(self):
+        return self._file_rows(self.columns[-1][0])
+
+    def __len__(self):
+        return self.committed + len(self._pending[self.columns[0][0]])
+
+    def append(self, row):
+        for (column, _), value in zip(self.columns, row):
+            self._pending[column].append(value)
+
+    def flush(self):
+        for column, dtype in self.columns:
+            values = self._pending[column]
+            if values:
+                with open(self._paths[column], 'ab') as handle:
+                    handle.write(np.asarray(values, dtype=dtype).tobytes())
+                self._pending[column] = []
+
+    # 批量追加整列数据（导入或生成测试数据用），arrays 与 columns 一一对应
+    def extend(self, arrays):
+        self.flush()
+        for (column, dtype), values in zip(self.columns, arrays):
+            with open(self._paths[column], 'ab') as handle:
+                handle.write(np.asarray(values, dtype=dtype).tobytes())
+
+    def truncate(self, rows):
+        for column, dtype in self.columns:
+            os.truncate(self._paths[column], rows * dtype.itemsize)
+        self._maps.clear()
+
+    # 已提交数据的只读视图，文件变长后重新映射
+    def column(self, column, rows=None):
+        dtype = dict(self.columns)[column]
+        size = self._file_rows(column)
+        cached = self._maps.get(column)
+        if cached is None or len(cached) != size:
+            cached = np.memmap(self._paths[column], dtype=dtype, mode='r') if size else np.empty(0, dtype)
+            self._maps[column] = cached
+        return cached if rows is None else cached[:rows]
+
+
+class HandHistory:
+    # 每积累 flush_hands 手写一次盘；查询和导出前会先写盘
+    def __init__(self, directory, flush_hands=32):
+        os.makedirs(directory, exist_ok=True)
+        self.flush_hands = flush_hands
+        self.hands = ColumnTable(directory, 'hands', HAND_COLUMNS)
+        self.results = ColumnTable(directory, 'results', RESULT_COLUMNS)
+        self.actions = ColumnTable(directory, 'actions', ACTION_COLUMNS)
+        self._players_path = os.path.join(directory, 'players.txt')
+        self.players = []
+        self._player_ids = {}
+        if os.path.exists(self._players_path):
+            with open(self._players_path, encoding='utf-8') as handle:
+                for line in handle:
+                    self._add_player(line.rstrip('\n'))
+        self._new_players = []
+        self._repair()
+
+    def _add_player(self, username):
+        player_id = self._player_ids[username] = len(self.players)
+        self.players.append(username)
+        return player_id
+
+    def player_id(self, username):
+        player_id = self._player_ids.get(username)
+        if player_id is None:
+            player_id = self._add_player(username)
+            self._new_players.append(username)
+        return player_id
+
+    # 截掉最后一次写盘时没有提交的结果和操作
+    def _repair(self):
+        hands = self.hands.committed
+        if hands:
+            last = self.hands.column('first_result', hands)[-1] + self.hands.column('seats', hands)[-1]
+        else:
+            last = 0
+        if self.results.committed > last:
+            self.results.truncate(int(last))
+        hand = self.actions.column('hand')
+        keep = int(np.searchsorted(hand, hands)) if len(hand) else 0
+        if self.actions.committed > keep:
+            self.actions.truncate(keep)
+
+    def __len__(self):
+        return len(self.hands)
+
+    # seats: [(用户名, 本手投入, 本手赢得)] 按座位顺序；actions: [(座位, 下注轮, 操作, 金额)]
+    def record_hand(self, time, big_blind, pot, seats, actions):
+        hand = len(self.hands)
+        first_result = len(self.results)
+        flags = [0] * len(seats)
+        raises = [0] * len(seats)
+        calls = [0] * len(seats)
+        for seat, street, action, amount in actions:
+            self.actions.append((hand, seat, street, action, amount))
+            if street == 0:
+                if action == CALL:
+                    flags[seat] |= VPIP
+                elif action == RAISE:
+                    flags[seat] |= VPIP | PFR
+            elif action == CALL:
+                calls[seat] += 1
+            elif action == RAISE:
+                raises[seat] += 1
+        for seat, (username, invested, won) in enumerate(seats):
+            self.results.append((self.player_id(username), seat, invested, won,
+                                 flags[seat], min(raises[seat], 255), min(calls[seat], 255)))
+        self.hands.append((time, first_result, len(seats), big_blind, pot))
+        if len(self.hands) - self.hands.committed >= self.flush_hands:
+            self.flush()
+        return hand
+
+    def flush(self):
+        if self._new_players:
+            with open(self._players_path, 'a', encoding='utf-8') as handle:
+                handle.write(''.join(f'{username}\n' for username in self._new_players))
+            self._new_players = []
+        self.actions.flush()
+        self.results.flush()
+        self.hands.flush()
+
+    # 已提交的手数和这些手的结果行数。结果表先于手牌表写盘，两张表分别读行数时中间可能又写了一批，
+    # 这里只读一次手牌表的行数，结果行数由最后一手的位置算出
+    def _snapshot(self):
+        hands = self.hands.committed
+        if not hands:
+            return 0, 0
+        last = hands - 1
+        return hands, int(self.hands.column('first_result', hands)[last] + self.hands.column('seats', hands)[last])
+
+    # 每个玩家的统计: 手数、VPIP、PFR、AF、胜率、每百手赢得大盲数、净筹码
+    # flush 为False时只读已写盘的数据，可以放到线程里执行
+    def player_stats(self, usernames=None, flush=True):
+        if flush:
+            self.flush()
+        hands, rows = self._snapshot()
+        n_players = len(self.players)
+        player = self.results.column('player', rows).astype(np.intp)
+        net = self.results.column('won', rows).astype(np.int64)
+        net -= self.results.column('invested', rows)
+        seats = self.hands.column('seats', hands)
+        big_blind = np.repeat(np.maximum(self.hands.column('big_blind', hands), 1), seats)
+
+        # 翻牌前标志和是否赢筹码合成 0-7 的编码，一次 bincount 得到每个玩家每种组合的手数
+        won = 4
+        code = self.results.column('flags', rows) | ((net > 0).view(np.uint8) * np.uint8(won))
+        counts = np.bincount(player * 8 + code, minlength=n_players * 8).reshape(n_players, 8)
+        bits = np.arange(8)
+        played = counts.sum(axis=1)
+        vpip = counts[:, (bits & VPIP) > 0].sum(axis=1)
+        pfr = counts[:, (bits & PFR) > 0].sum(axis=1)
+        wins = counts[:, (bits & won) > 0].sum(axis=1)
+        chips = np.bincount(player, weights=net, minlength=n_players)
+        big_blinds = np.bincount(player, weights=net / big_blind, minlength=n_players)
+        aggressive = np.bincount(player, weights=self.results.column('raises', rows), minlength=n_players)
+        calls = np.bincount(player, weights=self.results.column('calls', rows), minlength=n_players)
+
+        if usernames is None:
+            ids = np.arange(n_players)
+        else:
+            ids = np.array([self._player_ids[u] for u in usernames if u in self._player_ids], dtype=np.intp)
+        n = played[ids]
+        # 没有手数的玩家各项比例为0，手数照实报告
+        hands_played = np.maximum(n, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            af = np.round(aggressive[ids] / calls[ids], 2)
+        columns = zip(
+            ids.tolist(), n.tolist(),
+            np.round(vpip[ids] / hands_played, 4).tolist(),
+            np.round(pfr[ids] / hands_played, 4).tolist(),
+            np.where(calls[ids] > 0, af, np.nan).tolist(),
+            np.round(wins[ids] / hands_played, 4).tolist(),
+            np.round(big_blinds[ids] / hands_played * 100, 2).tolist(),
+            np.round(chips[ids]).astype(np.int64).tolist())
+        return [{
+            'username': self.players[i],
+            'hands': hands_i,
+            'vpip': vpip_i,
+            'pfr': pfr_i,
+            'af': None if af_i != af_i else af_i,
+            'win_rate': win_rate_i,
+            'bb_per_100': bb_i,
+            'net': net_i
+        } for i, hands_i, vpip_i, pfr_i, af_i, win_rate_i, bb_i, net_i in columns]
+
+    # 逐行导出每手每个座位的结果，按块读取内存映射，不一次性载入
+    def export(self, username=None, chunk=65536):
+        self.flush()
+        hands, rows = self._snapshot()
+        first_result = self.hands.column('first_result', hands)
+        seats = self.hands.column('seats', hands)
+        times = self.hands.column('time', hands)
+        only = self._player_ids.get(username) if username is not None else None
+        if username is not None and only is None:
+            return
+        for start in range(0, rows, chunk):
+            stop = min(start + chunk, rows)
+            player = np.asarray(self.results.column('player', rows)[start:stop])
+            seat = np.asarray(self.results.column('seat', rows)[start:stop])
+            invested = np.asarray(self.results.column('invested', rows)[start:stop])
+            won = np.asarray(self.results.column('won', rows)[start:stop])
+            hand = np.searchsorted(first_result, np.arange(start, stop), side='right') - 1
+            selected = np.nonzero(player == only)[0] if only is not None else range(stop - start)
+            for i in selected:
+                h = int(hand[i])
+                yield {
+                    'hand': h,
+                    'time': float(times[h]),
+                    'seats': int(seats[h]),
+                    'username': self.players[player[i]],
+                    'seat': int(seat[i]),
+                    'invested': int(invested[i]),
+                    'won': int(won[i]),
+                    'net': int(won[i]) - int(invested[i])
+                }
@@ -0,0 +1,184 @@
+import random
+
+# 排行榜: 按分数有序的索引，每手结算时增量更新，读取时不再排序
+#
+# RankIndex 是带跨度的跳表（与Redis有序集合相同的结构）：每层链接记录跨过的节点数，
+# 更新、删除、查名次、按名次定位都是 O(log n)，取前K名是 O(log n + K)。
+# 同分按成员名排序，保证名次确定。
+
+MAX_LEVEL = 32
+P = 0.25
+
+
+class _Node:
+    __slots__ = ('order', 'member', 'score', 'next', 'width')
+
+    def __init__(self, order, member, score, level):
+        self.order = order
+        self.member = member
+        self.score = score
+        self.next = [None] * level
+        self.width = [1] * level
+
+
+class RankIndex:
+    def __init__(self, seed=None):
+        self._head = _Node(None, None, None, MAX_LEVEL)
+        self._levels = 1  # 当前用到的层数，只在这些层上查找
+        self._length = 0
+        self._scores = {}
+        self._rng = random.Random(seed)
+        self.version = 0
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, member):
+        return member in self._scores
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def _level(self):
+        level = 1
+        while level < MAX_LEVEL and self._rng.random() < P:
+            level += 1
+        return level
+
+    # 每层最后一个排在 order 之前的节点，以及从表头走到它的步数
+    def _chain(self, order):
+        chain = [self._head] * MAX_LEVEL
+        steps = [0] * MAX_LEVEL
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and node.next[level].order < order:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def _insert(self, member, score):
+        order = (-score, member)
+        chain, steps = self._chain(order)
+        node = _Node(order, member, score, self._level())
+        # 新增的层从表头直接指向表尾，跨度为全部节点数
+        for level in range(self._levels, len(node.next)):
+            self._head.width[level] = self._length
+        self._levels = max(self._levels, len(node.next))
+        skipped = 0
+        for level in range(len(node.next)):
+            prev = chain[level]
+            node.next[level] = prev.next[level]
+            prev.next[level] = node
+            node.width[level] = prev.width[level] - skipped
+            prev.width[level] = skipped + 1
+            skipped += steps[level]
+        for level in range(len(node.next), self._levels):
+            chain[level].width[level] += 1
+        self._length += 1
+
+    def _delete(self, member, score):
+        chain, _ = self._chain((-score, member))
+        node = chain[0].next[0]
+        for level in range(self._levels):
+            prev = chain[level]
+            if level < len(node.next):
+                prev.width[level] += node.width[level] - 1
+                prev.next[level] = node.next[level]
+            else:
+                prev.width[level] -= 1
+        self._length -= 1
+        while self._levels > 1 and self._head.next[self._levels - 1] is None:
+            self._levels -= 1
+
+    # 设置分数，分数不变时返回False
+    def update(self, member, score):
+        old = self._scores.get(member)
+        if old == score:
+            return False
+        if old is not None:
+            self._delete(member, old)
+        self._insert(member, score)
+        self._scores[member] = score
+        self.version += 1
+        return True
+
+    def remove(self, member):
+        score = self._scores.pop(member, None)
+        if score is None:
+            return False
+        self._delete(member, score)
+        self.version += 1
+        return True
+
+    # 名次从1开始；不在榜上返回None
+    def rank(self, member):
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        order = (-score, member)
+        rank = 0
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and node.next[level].order <= order:
+                rank += node.width[level]
+                node = node.next[level]
+        return rank
+
+    # 按名次返回 [(成员, 分数)]，从第 start+1 名开始最多 count 个
+    def by_rank(self, start=0, count=10):
+        node = self._head
+        position = 0
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and position + node.width[level] <= start:
+                position += node.width[level]
+                node = node.next[level]
+        result = []
+        node = node.next[0]
+        while node is not None and len(result) < count:
+            result.append((node.member, node.score))
+            node = node.next[0]
+        return result
+
+
+class Leaderboard:
+    # chips: 当前筹码排名；best: 历史最高筹码排名；hands: 结算过的手数
+    def __init__(self):
+        self.chips = RankIndex()
+        self.best = RankIndex()
+        self.hands = {}
+        self.avatars = {}
+        self.version = 0
+
+    # players: [(用户名, 头像, 筹码)]；settled 为True时计入一手
+    def update(self, players, settled=False):
+        for username, avatar, chips in players:
+            self.avatars[username] = avatar
+            self.chips.update(username, chips)
+            best = self.best.score(username)
+            if best is None or chips > best:
+                self.best.update(username, chips)
+            if settled:
+                self.hands[username] = self.hands.get(username, 0) + 1
+        self.version += 1
+
+    def entry(self, username, rank=None):
+        return {
+            'rank': rank if rank is not None else self.best.rank(username),
+            'username': username,
+            'avatar': self.avatars.get(username),
+            'highest_chips': self.best.score(username),
+            'games_played': self.hands.get(username, 0)
+        }
+
+    def top(self, count=10, start=0):
+        return [self.entry(username, start + i + 1)
+                for i, (username, _) in enumerate(self.best.by_rank(start, count))]
+
+    def standings(self, count=10, start=0):
+        return [{
+            'rank': start + i + 1,
+            'username': username,
+            'avatar': self.avatars.get(username),
+            'chips': chips
+        } for i, (username, chips) in enumerate(self.chips.by_rank(start, count))]
@@ -0,0 +1,132 @@
+import atexit
+import json
+import logging
+import os
+import random
+import sys
+from collections import deque
+
+# 结构化日志: 处理函数里只把日志记录放进内存队列，由后台协程定期批量格式化成JSON行写出，
+# 写日志不会在处理消息时阻塞事件循环。
+#
+# log_event(logger, 事件名, room=..., sid=..., 其他字段) 写一条事件日志，
+# 级别不够或被采样丢弃时直接返回，不创建日志记录。
+#   LOG_LEVEL   日志级别，默认 INFO
+#   LOG_SAMPLE  按事件名采样，如 "chat_message=0.01,connect=0.1,*=1"，* 为其他事件的默认比例
+# 队列满（默认1万条）时丢弃最旧的记录并计数。
+
+DEFAULT_QUEUE_SIZE = 10_000
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': getattr(record, 'event', None)
+        }
+        message = record.getMessage()
+        if message != data['event']:
+            data['msg'] = message
+        data.update(getattr(record, 'fields', ()))
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class QueueHandler(logging.Handler):
+    def __init__(self, maxlen=DEFAULT_QUEUE_SIZE, stream=None):
+        super().__init__()
+        self.records = deque(maxlen=maxlen)
+        self.stream = stream
+        self.written = 0
+        self.dropped = 0
+
+    def emit(self, record):
+        if len(self.records) == self.records.maxlen:
+            self.dropped += 1
+        self.records.append(record)
+
+    # 格式化并写出队列里的全部记录，返回条数
+    def drain(self):
+        records = self.records
+        lines = []
+        while records:
+            lines.append(self.format(records.popleft()))
+        if lines:
+            stream = self.stream or sys.stderr
+            stream.write('\n'.join(lines) + '\n')
+            stream.flush()
+            self.written += len(lines)
+        return len(lines)
+
+    def run(self, sleep, interval=0.2):
+        while True:
+            sleep(interval)
+            self.drain()
+
+    def stats(self):
+        return {'queued': len(self.records), 'written': self.written, 'dropped': self.dropped}
+
+
+class Sampler:
+    def __init__(self, rates=None, default=1.0):
+        self.rates = dict(rates or {})
+        self.default = self.rates.pop('*', default)
+        self.dropped = 0
+
+    def keep(self, event):
+        rate = self.rates.get(event, self.default)
+        if rate >= 1 or random.random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+def parse_rates(spec):
+    rates = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            event, rate = item.split('=', 1)
+            rates[event.strip()] = float(rate)
+    return rates
+
+
+handler = None
+sampler = Sampler()
+
+
+# 把根日志器换成队列处理器；重复调用时沿用同一个处理器
+def setup(level=None, sample=None, stream=None, maxlen=DEFAULT_QUEUE_SIZE):
+    global handler, sampler
+    # JSON里不输出线程和进程信息，创建日志记录时不再收集
+    logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+    root = logging.getLogger()
+    if handler is None:
+        handler = QueueHandler(maxlen, stream)
+        handler.setFormatter(JsonFormatter())
+        atexit.register(handler.drain)
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(level or os.getenv('LOG_LEVEL', 'INFO').upper())
+    sampler = Sampler(parse_rates(os.getenv('LOG_SAMPLE') if sample is None else sample))
+    return handler
+
+
+# 直接构造日志记录，省去 logger.log 查找调用位置（遍历调用栈）的开销
+def log_event(logger, event, level=logging.INFO, exc_info=None, **fields):
+    if not logger.isEnabledFor(level) or not sampler.keep(event):
+        return
+    if exc_info is True:
+        exc_info = sys.exc_info()
+    record = logger.makeRecord(logger.name, level, '', 0, event, (), exc_info,
+                               extra={'event': event, 'fields': fields})
+    logger.handle(record)
+
+
+def stats():
+    data = handler.stats() if handler else {}
+    data['sampled_out'] = sampler.dropped
+    return data
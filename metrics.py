@@ -0,0 +1,216 @@
+import inspect
+import time
+from functools import wraps
+
+# 运行指标: 每个Socket.IO事件的调用数、出错数、耗时分布，广播的接收人数、发出的包数和字节数，
+# 以及应用注册的房间数、手数、事件循环卡顿等仪表值，以Prometheus文本格式输出（/metrics）。
+#
+# instrument(socketio) 要在定义 @socketio.on 处理函数之前调用：之后注册的处理函数都被计时。
+# 耗时分布用HDR式的对数-线性分桶: 每个2的幂区间再均分16个小桶，相对误差约6%，
+# 占用固定内存（400个计数），记录一次只是几次整数运算。
+
+SUB_BUCKETS = 16
+SUB_BITS = 4
+BUCKETS = 400
+LATENCY_BOUNDS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+FANOUT_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def bucket_index(value):
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return min(shift * SUB_BUCKETS + (value >> shift), BUCKETS - 1)
+
+
+# 桶内的最大值（整数单位）
+def bucket_upper(index):
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift, sub = divmod(index, SUB_BUCKETS)
+    shift -= 1
+    return ((sub + SUB_BUCKETS + 1) << shift) - 1
+
+
+class Histogram:
+    __slots__ = ('scale', 'counts', 'count', 'total', 'max')
+
+    # scale: 记录值乘以 scale 后取整计入桶，耗时用 1e6（微秒），人数用 1
+    def __init__(self, scale=1):
+        self.scale = scale
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    # bucket_index 展开在这里，省一次函数调用
+    def record(self, value):
+        v = int(value * self.scale)
+        if v >= 2 * SUB_BUCKETS:
+            shift = v.bit_length() - SUB_BITS - 1
+            v = min(shift * SUB_BUCKETS + (v >> shift), BUCKETS - 1)
+        self.counts[v] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                return min(bucket_upper(index) / self.scale, self.max)
+        return self.max
+
+    # 每个上界以内的累计次数（含上界所在的桶）
+    def cumulative(self, bounds):
+        result = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            last = bucket_index(int(bound * self.scale))
+            while index <= last:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+
+class EventStats:
+    __slots__ = ('calls', 'errors', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(1e6)
+
+
+class Metrics:
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.events = {}
+        self.fanout = Histogram()
+        self.packets = 0
+        self.bytes = 0
+        self._gauges = []  # (名称, 说明, 取值函数)，取值函数返回数值或 {标签值: 数值}
+
+    def event(self, name):
+        stats = self.events.get(name)
+        if stats is None:
+            stats = self.events[name] = EventStats()
+        return stats
+
+    # 包装一个事件处理函数，记录调用数、出错数和耗时
+    def timed(self, name, handler):
+        stats = self.event(name)
+        clock = self._clock
+        # connect/disconnect 处理函数可以不接收 auth/断线原因参数，python-socketio 先带参数调用、
+        # 出TypeError再不带参数重试；这里直接不带参数调用，重试不计为出错
+        drop_args = name in ('connect', 'disconnect') and not inspect.signature(handler).parameters
+
+        @wraps(handler)
+        def wrapper(*args):
+            start = clock()
+            try:
+                return handler() if drop_args else handler(*args)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.calls += 1
+                stats.latency.record(clock() - start)
+        return wrapper
+
+    def gauge(self, name, help, func):
+        self._gauges.append((name, help, func))
+
+    def instrument(self, socketio):
+        on = socketio.on
+
+        def instrumented_on(message, namespace=None):
+            register = on(message, namespace)
+
+            def decorator(handler):
+                register(self.timed(message, handler))
+                return handler
+            return decorator
+        socketio.on = instrumented_on
+        self._hook_server(socketio.server)
+        self.gauge('socketio_connected_clients', 'Connected Engine.IO clients',
+                   lambda: len(socketio.server.eio.sockets) if socketio.server else 0)
+
+    # 事件循环卡顿（offload.LoopMonitor 的最近采样）
+    def watch_loop(self, monitor):
+        self.gauge('eventlet_loop_lag_seconds', 'Event loop wake-up lag',
+                   lambda: {f'quantile="{q / 100}"': round(monitor.percentile(q), 6) for q in (50, 99, 100)})
+        self.gauge('eventlet_loop_stalls_over_100ms', 'Event loop stalls longer than 100 ms', lambda: monitor.stalls)
+
+    # 每个发给客户端的数据包计数和计字节；每次按房间查接收人时记录人数（含被跳过的发送者）
+    def _hook_server(self, server):
+        if server is None:
+            return
+        send = getattr(server, '_send_eio_packet', None)
+        if send is not None:
+            def counted_send(eio_sid, pkt):
+                self.packets += 1
+                self.bytes += len(pkt.data) if pkt.data is not None else 0
+                return send(eio_sid, pkt)
+            server._send_eio_packet = counted_send
+        manager = server.manager
+        participants = manager.get_participants
+
+        def counted_participants(namespace, room):
+            n = 0
+            for item in participants(namespace, room):
+                n += 1
+                yield item
+            self.fanout.record(n)
+        manager.get_participants = counted_participants
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help):
+            lines.append(f'# HELP {name} {help}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        events = sorted(self.events.items())
+        family('socketio_event_calls_total', 'counter', 'Socket.IO event handler calls')
+        lines.extend(f'socketio_event_calls_total{{event="{e}"}} {s.calls}' for e, s in events)
+        family('socketio_event_errors_total', 'counter', 'Socket.IO event handlers that raised')
+        lines.extend(f'socketio_event_errors_total{{event="{e}"}} {s.errors}' for e, s in events)
+        family('socketio_event_duration_seconds', 'histogram', 'Socket.IO event handler latency')
+        for e, s in events:
+            _histogram(lines, 'socketio_event_duration_seconds', f'event="{e}",', s.latency, LATENCY_BOUNDS)
+        family('socketio_event_duration_quantile_seconds', 'gauge', 'Socket.IO event handler latency quantiles')
+        for e, s in events:
+            for q in (0.5, 0.99, 0.999):
+                lines.append(f'socketio_event_duration_quantile_seconds{{event="{e}",quantile="{q}"}} '
+                             f'{s.latency.quantile(q):.6f}')
+        family('socketio_fanout_recipients', 'histogram', 'Recipients per emit')
+        _histogram(lines, 'socketio_fanout_recipients', '', self.fanout, FANOUT_BOUNDS)
+        family('socketio_emitted_packets_total', 'counter', 'Packets sent to clients')
+        lines.append(f'socketio_emitted_packets_total {self.packets}')
+        family('socketio_emitted_bytes_total', 'counter', 'Payload bytes sent to clients')
+        lines.append(f'socketio_emitted_bytes_total {self.bytes}')
+        for name, help, func in self._gauges:
+            family(name, 'gauge', help)
+            value = func()
+            if isinstance(value, dict):
+                lines.extend(f'{name}{{{label}}} {v}' for label, v in value.items())
+            else:
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram(lines, name, labels, histogram, bounds):
+    for bound, n in zip(bounds, histogram.cumulative(bounds)):
+        lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {n}')
+    lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {histogram.count}')
+    labels = f'{{{labels.rstrip(",")}}}' if labels else ''
+    lines.append(f'{name}_sum{labels} {histogram.total:.6f}')
+    lines.append(f'{name}_count{labels} {histogram.count}')
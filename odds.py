@@ -0,0 +1,171 @@
+import itertools
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from cards import RANK_NAMES, card_rank, card_suit
+from equity import equity_vs_random
+
+# 胜率查询: 翻牌前查预先计算的起手牌表，翻牌后查按花色同构归一化的LRU缓存
+#
+# 翻牌前表: 169种起手牌 x 1-9个随机对手的胜率，离线生成一次（python odds.py）随仓库发布。
+# 文件格式: 16字节头(魔数 PFEQ、版本、每格模拟次数、最多对手数) + 13x13x9 个 uint16 小端，
+# 值为胜率 x 65535。13x13格子按 [高牌][低牌] 存同花、[低牌][高牌] 存不同花、对角线存对子。
+# 翻牌后: 交换花色不改变胜率，手牌+公共牌先换成花色同构下的最小形式再作为缓存键。
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_equity.bin')
+MAGIC = b'PFEQ'
+HEADER = struct.Struct('<4sIII')
+MAX_OPPONENTS = 9
+TABLE_ITERATIONS = 100_000
+POSTFLOP_ITERATIONS = 5_000
+
+_SUIT_PERMUTATIONS = list(itertools.permutations(range(4)))
+
+
+# 起手牌在13x13格子中的位置
+def hand_cell(hole):
+    a, b = hole
+    high, low = sorted((card_rank(a), card_rank(b)), reverse=True)
+    if card_suit(a) == card_suit(b):
+        return high, low
+    return low, high
+
+
+def hand_class(hole):
+    row, col = hand_cell(hole)
+    if row == col:
+        return RANK_NAMES[row] * 2
+    if row > col:
+        return RANK_NAMES[row] + RANK_NAMES[col] + 's'
+    return RANK_NAMES[col] + RANK_NAMES[row] + 'o'
+
+
+# 每个格子的一手代表牌
+def _representative(row, col):
+    if row == col:
+        return [row * 4, row * 4 + 1]
+    if row > col:
+        return [row * 4, col * 4]
+    return [col * 4, row * 4 + 1]
+
+
+def build_preflop_table(path=TABLE_PATH, iterations=TABLE_ITERATIONS, seed=0):
+    table = np.empty((13, 13, MAX_OPPONENTS), dtype='<u2')
+    seeds = np.random.SeedSequence(seed).spawn(169)
+    for (row, col), s in zip(itertools.product(range(13), repeat=2), seeds):
+        shares = equity_vs_random(_representative(row, col), (), MAX_OPPONENTS, iterations, s)
+        table[row, col] = np.rint(shares * 65535)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 1, iterations, MAX_OPPONENTS))
+        f.write(table.tobytes())
+
+
+class PreflopTable:
+    def __init__(self, path=TABLE_PATH):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.iterations, self.max_opponents = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != 1:
+            raise ValueError(f'翻牌前胜率表格式不正确: {path}')
+        self._table = np.frombuffer(self._mmap, dtype='<u2', offset=HEADER.size).reshape(13, 13, self.max_opponents)
+
+    # 对 opponents 个随机对手的胜率
+    def equity(self, hole, opponents=1):
+        row, col = hand_cell(hole)
+        opponents = min(max(opponents, 1), self.max_opponents)
+        return int(self._table[row, col, opponents - 1]) / 65535
+
+    # 某个对手数下全部169种起手牌的胜率，键为 'AKs' 这样的名字
+    def chart(self, opponents=1):
+        return {hand_class(_representative(row, col)): self.equity(_representative(row, col), opponents)
+                for row in range(12, -1, -1) for col in range(12, -1, -1)}
+
+
+# 花色同构下的最小形式: 手牌和公共牌分别排序，取24种花色置换中最小的一种
+def canonical(hole, board):
+    best = None
+    for perm in _SUIT_PERMUTATIONS:
+        key = (tuple(sorted(c & ~3 | perm[c & 3] for c in hole)),
+               tuple(sorted(c & ~3 | perm[c & 3] for c in board)))
+        if best is None or key < best:
+            best = key
+    return best
+
+
+class LRUCache:
+    def __init__(self, maxsize=65536):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0}
+
+
+# 翻牌后胜率的计算任务（可交给工作进程），种子由键决定，同一局面的结果固定
+def postflop_equity(hole, board, opponents, iterations=POSTFLOP_ITERATIONS):
+    seed = [*hole, *board, opponents]
+    return float(equity_vs_random(hole, board, opponents, iterations, seed)[-1])
+
+
+# 胜率查询入口: 翻牌前查表，翻牌后查缓存，未命中时通过 run 计算（默认在当前协程里）
+class OddsService:
+    def __init__(self, table=None, maxsize=65536):
+        self.table = table
+        # 原始牌面 -> 同构形式，省去重复请求的归一化
+        self._keys = LRUCache(maxsize)
+        self.cache = LRUCache(maxsize)
+
+    def lookup(self, hole, board=(), opponents=1, run=None):
+        opponents = min(max(opponents, 1), MAX_OPPONENTS)
+        if not board:
+            if self.table is None:
+                self.table = PreflopTable()
+            return {'equity': self.table.equity(hole, opponents), 'class': hand_class(hole), 'source': 'table'}
+        raw = (tuple(hole), tuple(board))
+        key = self._keys.get(raw)
+        if key is None:
+            key = canonical(hole, board)
+            self._keys.put(raw, key)
+        value = self.cache.get((key, opponents))
+        if value is not None:
+            return {'equity': value, 'source': 'cache'}
+        job = (postflop_equity, (list(key[0]), list(key[1]), opponents))
+        value = run([job])[0] if run else job[0](*job[1])
+        self.cache.put((key, opponents), value)
+        return {'equity': value, 'source': 'computed'}
+
+    def stats(self):
+        return self.cache.stats()
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else TABLE_ITERATIONS
+    build_preflop_table(iterations=iterations)
+    print(f'已生成 {TABLE_PATH}')
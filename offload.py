@@ -0,0 +1,207 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+from multiprocessing.connection import Connection
+
+import eventlet
+from eventlet.event import Event
+from eventlet.hubs import trampoline
+from eventlet.queue import LightQueue, Queue
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 计算任务卸载: 把摊牌评估、全下胜率等CPU密集的计算交给子进程，不阻塞eventlet事件循环
+#
+# 调用方在协程里调用 run([(函数, 参数)...])，每个任务放入有界队列后等待结果。
+# 分批协程从队列里取任务，在 batch_window 秒内凑满 batch_size 个（来自不同牌桌的摊牌
+# 会合并在一起）后整批发给一个空闲的工作进程；等待结果时通过 trampoline 让出事件循环。
+# 函数和参数必须可以pickle（可导入模块里的模块级函数）。processes 为0时在当前协程里直接计算。
+# 工作进程是只导入本模块的独立解释器，不会重新执行服务端的主模块。
+
+
+def _worker(conn):
+    while True:
+        try:
+            jobs = conn.recv()
+        except EOFError:
+            return
+        results = []
+        for func, args in jobs:
+            try:
+                results.append((True, func(*args)))
+            except Exception as e:
+                results.append((False, e))
+        conn.send(results)
+
+
+# 工作进程入口: python -c "import offload; offload.serve(fd)"
+def serve(fd):
+    _worker(Connection(fd))
+
+
+class _Process:
+    def __init__(self):
+        parent, child = socket.socketpair()
+        parent_fd, child_fd = parent.detach(), child.detach()
+        # monkey_patch 后的socket是非阻塞的；等待可读由 trampoline 负责，读写本身用阻塞模式
+        os.set_blocking(parent_fd, True)
+        os.set_blocking(child_fd, True)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+        self.process = subprocess.Popen([sys.executable, '-c', f'import offload; offload.serve({child_fd})'],
+                                        pass_fds=(child_fd,), env=env)
+        os.close(child_fd)
+        self.conn = Connection(parent_fd)
+
+    def call(self, jobs):
+        self.conn.send(jobs)
+        trampoline(self.conn.fileno(), read=True)
+        return self.conn.recv()
+
+    def close(self):
+        self.conn.close()
+        try:
+            self.process.wait(1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class WorkerPool:
+    def __init__(self, processes=2, batch_size=32, batch_window=0.002, max_pending=1024):
+        self.processes = processes
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._pending = Queue(max_pending)
+        self._idle = LightQueue()
+        self._started = False
+        self.jobs = 0
+        self.batches = 0
+        self.errors = 0
+        self.restarts = 0
+        self.busy_time = 0.0
+
+    @property
+    def enabled(self):
+        return self.processes > 0
+
+    def start(self):
+        if self._started or not self.enabled:
+            return
+        self._started = True
+        for _ in range(self.processes):
+            self._idle.put(_Process())
+        eventlet.spawn(self._dispatch)
+
+    # 执行一组任务并按顺序返回结果；任务出错时抛出对应的异常
+    def run(self, jobs):
+        if not self.enabled:
+            return [func(*args) for func, args in jobs]
+        self.start()
+        events = []
+        for job in jobs:
+            event = Event()
+            self._pending.put((job, event))  # 队列满时在这里等待（背压）
+            events.append(event)
+        return [event.wait() for event in events]
+
+    def _dispatch(self):
+        while True:
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except eventlet.queue.Empty:
+                    break
+            worker = self._idle.get()
+            eventlet.spawn(self._send, worker, batch)
+
+    def _send(self, worker, batch):
+        start = time.perf_counter()
+        try:
+            results = worker.call([job for job, _ in batch])
+        except (EOFError, OSError) as e:
+            # 工作进程异常退出：本批任务报错，换一个新进程
+            worker.close()
+            worker = _Process()
+            self.restarts += 1
+            results = [(False, e)] * len(batch)
+        self._idle.put(worker)
+        self.busy_time += time.perf_counter() - start
+        self.batches += 1
+        self.jobs += len(batch)
+        for (_, event), (ok, value) in zip(batch, results):
+            if ok:
+                event.send(value)
+            else:
+                self.errors += 1
+                event.send_exception(value)
+
+    def stats(self):
+        return {
+            'processes': self.processes,
+            'pending': self._pending.qsize(),
+            'jobs': self.jobs,
+            'batches': self.batches,
+            'jobs_per_batch': round(self.jobs / self.batches, 2) if self.batches else 0.0,
+            'errors': self.errors,
+            'restarts': self.restarts,
+            'busy_seconds': round(self.busy_time, 3)
+        }
+
+
+class LoopMonitor:
+    # 事件循环卡顿监测: 每隔 interval 秒醒来一次，实际醒来时间比预期晚的部分就是卡顿时间
+    def __init__(self, interval=0.05, window=1200):
+        self.interval = interval
+        self._recent = deque(maxlen=window)
+        self._running = False
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0  # 超过100毫秒的卡顿次数
+
+    def record(self, lag):
+        self._recent.append(lag)
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag > 0.1:
+            self.stalls += 1
+
+    def run(self, sleep):
+        self._running = True
+        while self._running:
+            start = time.perf_counter()
+            sleep(self.interval)
+            self.record(max(time.perf_counter() - start - self.interval, 0.0))
+
+    def stop(self):
+        self._running = False
+
+    def reset(self):
+        self._recent.clear()
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    def percentile(self, q):
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def stats(self):
+        return {
+            'samples': self.samples,
+            'mean_ms': round(self.total_lag / self.samples * 1000, 3) if self.samples else 0.0,
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round(self.max_lag * 1000, 3),
+            'stalls_over_100ms': self.stalls
+        }
@@ -0,0 +1,78 @@
+import heapq
+import time
+
+# 不活跃房间清理: 按到期时间排序的小顶堆
+#
+# 房间创建时入堆一次；活动只更新 last_activity，不动堆。
+# 弹出到期的条目时再核对最新活动时间，仍活跃的按新的到期时间重新入堆。
+
+
+class RoomReaper:
+    def __init__(self, ttl, last_activity, on_expire, clock=time.time):
+        self.ttl = ttl
+        self.last_activity = last_activity
+        self.on_expire = on_expire
+        self._clock = clock
+        self._heap = []
+        self._scheduled = {}  # room_id -> 堆中有效条目的到期时间
+        self.runs = 0
+        self.reaped = 0
+        self.rescheduled = 0
+        self.last_duration = 0.0
+        self.max_duration = 0.0
+        self.total_duration = 0.0
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    def schedule(self, room_id):
+        deadline = self.last_activity.get(room_id, self._clock()) + self.ttl
+        self._scheduled[room_id] = deadline
+        heapq.heappush(self._heap, (deadline, room_id))
+
+    def discard(self, room_id):
+        # 堆中的条目留到弹出时丢弃
+        self._scheduled.pop(room_id, None)
+
+    # 只弹出已到期的条目，返回本次清理的房间数
+    def run_once(self, now=None):
+        start = time.perf_counter()
+        now = self._clock() if now is None else now
+        heap = self._heap
+        reaped = 0
+        while heap and heap[0][0] <= now:
+            deadline, room_id = heapq.heappop(heap)
+            if self._scheduled.get(room_id) != deadline:
+                continue
+            last = self.last_activity.get(room_id)
+            if last is not None and last + self.ttl > now:
+                self.rescheduled += 1
+                self.schedule(room_id)
+                continue
+            del self._scheduled[room_id]
+            self.on_expire(room_id)
+            reaped += 1
+
+        duration = time.perf_counter() - start
+        self.runs += 1
+        self.reaped += reaped
+        self.last_duration = duration
+        self.max_duration = max(self.max_duration, duration)
+        self.total_duration += duration
+        return reaped
+
+    def run(self, sleep, interval=60):
+        while True:
+            sleep(interval)
+            self.run_once()
+
+    def stats(self):
+        return {
+            'scheduled': len(self._scheduled),
+            'runs': self.runs,
+            'reaped': self.reaped,
+            'rescheduled': self.rescheduled,
+            'last_duration_ms': round(self.last_duration * 1000, 3),
+            'max_duration_ms': round(self.max_duration * 1000, 3),
+            'avg_duration_ms': round(self.total_duration / self.runs * 1000, 3) if self.runs else 0.0
+        }
@@ -0,0 +1,139 @@
+import random
+import sys
+
+from delta import TableState
+from leaderboard import Leaderboard
+
+# 房间状态: 固定字段的 __slots__ 对象，只在发送、写快照时转换成原来的字典格式
+#
+# 空闲房间（只有房主在等人）只保留座位、设置和广播状态；房间排行榜在第一次开局时才创建。
+# 相同的房间设置共用一个 Settings 对象。
+# memory_stats 抽样估算每个房间占用的字节数，和房间数上限一起在 /health 中报告。
+
+SETTINGS_CACHE_SIZE = 1024  # 共用的设置组合数上限，设置由客户端提交，不能无限增长
+
+
+class Settings:
+    # (属性, 字典中的键, 默认值)
+    FIELDS = (
+        ('small_blind', 'smallBlind', 10),
+        ('big_blind', 'bigBlind', 20),
+        ('initial_chips', 'initialChips', 1000),
+        ('max_rounds', 'maxRounds', 1),
+        ('min_players', 'minPlayers', 4),
+        ('max_players', 'maxPlayers', 10)
+    )
+    __slots__ = tuple(attr for attr, _, _ in FIELDS)
+    _cache = {}
+
+    def __init__(self, *values):
+        for (attr, _, _), value in zip(self.FIELDS, values):
+            setattr(self, attr, value)
+
+    # 从字典创建，相同的设置返回同一个对象；共用的对象不能修改
+    @classmethod
+    def of(cls, data):
+        values = tuple(data.get(key, default) for _, key, default in cls.FIELDS)
+        settings = cls._cache.get(values)
+        if settings is None:
+            settings = cls(*values)
+            if len(cls._cache) < SETTINGS_CACHE_SIZE:
+                cls._cache[values] = settings
+        return settings
+
+    def to_dict(self):
+        return {key: getattr(self, attr) for attr, key, _ in self.FIELDS}
+
+
+class Seat:
+    __slots__ = ('username', 'avatar', 'is_host', 'sid')
+
+    def __init__(self, username, avatar, is_host, sid):
+        self.username = username
+        self.avatar = avatar
+        self.is_host = is_host
+        self.sid = sid
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['username'], data.get('avatar', 'avatar1'), data.get('isHost', False), data['sid'])
+
+    def to_dict(self):
+        return {'username': self.username, 'avatar': self.avatar, 'isHost': self.is_host, 'sid': self.sid}
+
+
+class Room:
+    __slots__ = ('seats', 'settings', 'game', 'state', '_leaderboard')
+
+    def __init__(self, host, settings):
+        self.seats = [host]
+        self.settings = settings
+        self.game = None
+        self.state = TableState()
+        self._leaderboard = None
+
+    @property
+    def leaderboard(self):
+        if self._leaderboard is None:
+            self._leaderboard = Leaderboard()
+        return self._leaderboard
+
+    @property
+    def status(self):
+        return 'playing' if self.game else 'waiting'
+
+    def seat_of(self, username):
+        return next((seat for seat in self.seats if seat.username == username), None)
+
+    def players(self):
+        return [seat.to_dict() for seat in self.seats]
+
+    # 与原来的房间字典格式相同，手牌日志的快照可以互相读取
+    def snapshot(self):
+        return {
+            'players': self.players(),
+            'settings': self.settings.to_dict(),
+            'game': self.game.to_state() if self.game else None
+        }
+
+
+# 对象及其引用的所有对象占用的字节数；seen 中的对象不重复计算（共用的设置、短字符串等）
+def deep_size(obj, seen):
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or obj is None or type(obj) in (bool, type):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        kind = type(obj)
+        if kind is dict:
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif kind in (list, tuple, set, frozenset):
+            stack.extend(obj)
+        elif kind not in (str, bytes, int, float):
+            if hasattr(obj, '__dict__'):
+                stack.append(vars(obj))
+            for cls in kind.__mro__:
+                for attr in getattr(cls, '__slots__', ()):
+                    if attr != '__dict__':
+                        stack.append(getattr(obj, attr, None))
+    return total
+
+
+# 抽样估算房间占用的内存；共用的设置对象和类本身不计入单个房间
+def memory_stats(rooms, max_rooms=0, sample=200, rng=random):
+    count = len(rooms)
+    picked = rng.sample(list(rooms.values()), min(sample, count)) if count else []
+    shared = {id(settings) for settings in Settings._cache.values()}
+    sizes = [deep_size(room, set(shared)) for room in picked]
+    per_room = sum(sizes) / len(sizes) if sizes else 0
+    return {
+        'rooms': count,
+        'max_rooms': max_rooms or None,
+        'sampled': len(sizes),
+        'bytes_per_room': round(per_room),
+        'estimated_bytes': round(per_room * count)
+    }
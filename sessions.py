@@ -0,0 +1,64 @@
+# 会话索引: sid <-> 房间/玩家 的双向映射
+#
+# 断线、聊天、玩家操作都通过 sid 直接定位房间和玩家，不再遍历所有房间。
+# 创建/加入/离开/断线/清理房间时必须同步维护。
+
+
+class SessionIndex:
+    def __init__(self):
+        self._by_sid = {}   # sid -> (room_id, player)
+        self._by_room = {}  # room_id -> {sid: player}
+
+    def __len__(self):
+        return len(self._by_sid)
+
+    def __contains__(self, sid):
+        return sid in self._by_sid
+
+    def clear(self):
+        self._by_sid.clear()
+        self._by_room.clear()
+
+    # 同一个sid只能在一个房间里；调用方要先拒绝已经入座的sid（或先走离开流程），
+    # 这里只保证索引本身一致，不会替调用方把玩家从旧房间里移走
+    def add(self, sid, room_id, player):
+        self.remove(sid)
+        self._by_sid[sid] = (room_id, player)
+        self._by_room.setdefault(room_id, {})[sid] = player
+
+    # 移除会话，返回 (room_id, player)；不存在时返回 (None, None)
+    def remove(self, sid):
+        entry = self._by_sid.pop(sid, None)
+        if entry is None:
+            return None, None
+        room_id, player = entry
+        members = self._by_room.get(room_id)
+        if members is not None:
+            members.pop(sid, None)
+            if not members:
+                del self._by_room[room_id]
+        return entry
+
+    def lookup(self, sid):
+        return self._by_sid.get(sid, (None, None))
+
+    def room_of(self, sid):
+        entry = self._by_sid.get(sid)
+        return entry[0] if entry else None
+
+    def player_of(self, sid):
+        entry = self._by_sid.get(sid)
+        return entry[1] if entry else None
+
+    def sids(self, room_id):
+        return list(self._by_room.get(room_id, ()))
+
+    def room_size(self, room_id):
+        return len(self._by_room.get(room_id, ()))
+
+    # 房间被删除时移除其所有会话，返回被移除的sid
+    def drop_room(self, room_id):
+        members = self._by_room.pop(room_id, {})
+        for sid in members:
+            self._by_sid.pop(sid, None)
+        return list(members)
@@ -0,0 +1,53 @@
+# 底池结算: 按每位玩家本手的总投入构建主池/边池并派奖
+#
+# 所有参数都按座位下标对齐:
+#   contributions[i]  座位i本手投入的筹码（跨所有下注轮）
+#   folded[i]         座位i是否已弃牌（弃牌者的筹码留在池中但不能赢）
+#   values[i]         座位i的牌力值，越大越好
+
+
+# 对投入额排序一次，按层级切出底池；资格相同的相邻层级合并为一个池
+def build_pots(contributions, folded):
+    n = len(contributions)
+    order = sorted(range(n), key=contributions.__getitem__)
+    pots = []
+    prev = 0
+    for k, seat in enumerate(order):
+        level = contributions[seat]
+        if level <= prev:
+            continue
+        amount = (level - prev) * (n - k)
+        eligible = [s for s in order[k:] if not folded[s]]
+        prev = level
+        if pots and (not eligible or pots[-1][1] == eligible):
+            # 只有弃牌者达到的层级并入上一个池
+            pots[-1][0] += amount
+        else:
+            pots.append([amount, eligible])
+    # 座位顺序输出资格列表，便于展示和确定零头归属
+    for pot in pots:
+        pot[1].sort()
+    return pots
+
+
+# 从first_seat开始按座位顺序轮转，作为零头的派发顺序
+def seat_order(n, first_seat=0):
+    return [(first_seat + i) % n for i in range(n)]
+
+
+# 每个池由有资格玩家中牌力最大者平分，零头按order顺序每人一个
+def award_pots(pots, values, order=None):
+    n = len(values)
+    if order is None:
+        order = range(n)
+    payouts = [0] * n
+    winners_by_pot = []
+    for amount, eligible in pots:
+        best = max(values[s] for s in eligible)
+        eligible_set = set(eligible)
+        winners = [s for s in order if s in eligible_set and values[s] == best]
+        share, remainder = divmod(amount, len(winners))
+        for i, seat in enumerate(winners):
+            payouts[seat] += share + (1 if i < remainder else 0)
+        winners_by_pot.append(winners)
+    return payouts, winners_by_pot
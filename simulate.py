@@ -0,0 +1,167 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cards import card_rank
+from game import Player, PokerGame
+from history import ACTIONS, BLIND
+
+# 离线牌局模拟: 不经过Socket.IO，用可替换的机器人策略在一张牌桌上连续打完整手牌
+#
+# 策略是 strategy(game, player, options, rng) -> (操作, 加注额) 的函数，options 即
+# game.get_available_actions(player)，加注额是本次投入的筹码（跟注额加上加注的部分）；
+# 无效的操作按看牌/弃牌处理。策略每手按座位轮换，每手开始时所有人的筹码重置为初始筹码。
+# 结果按策略汇总为NumPy数组，多进程运行时按固定大小分片，各分片的结果直接相加，与进程数无关。
+
+SETTINGS = {'smallBlind': 10, 'bigBlind': 20, 'initialChips': 1000, 'maxRounds': 1, 'maxPlayers': 10}
+MAX_ACTIONS = 500  # 单手操作数上限，防止策略和引擎陷入死循环
+
+
+def passive(game, player, options, rng):
+    return ('check' if 'check' in options['actions'] else 'call'), None
+
+
+def loose(game, player, options, rng):
+    choice = rng.choice(options['actions'])
+    if choice == 'raise':
+        return choice, min(options['maxRaise'], options['callAmount'] + game.big_blind * rng.randint(1, 4))
+    return choice, None
+
+
+def tight(game, player, options, rng):
+    high, low = sorted(card_rank(card) for card in player.cards)[::-1]
+    check = 'check' in options['actions']
+    if game.round == 'pre-flop':
+        if high == low or low >= 9:
+            return 'raise', min(options['maxRaise'], options['callAmount'] + game.big_blind * 3)
+        if high < 10 and not check:
+            return 'fold', None
+    return ('check' if check else 'call'), None
+
+
+def aggressive(game, player, options, rng):
+    if 'raise' in options['actions'] and rng.random() < 0.5:
+        return 'raise', min(options['maxRaise'], options['callAmount'] + game.big_blind * 2)
+    return passive(game, player, options, rng)
+
+
+STRATEGIES = {'passive': passive, 'loose': loose, 'tight': tight, 'aggressive': aggressive}
+
+
+def empty_results(strategies):
+    n = len(strategies)
+    return {
+        'hands': 0,
+        'net': np.zeros(n, dtype=np.int64),        # 每个策略的净赢筹码
+        'net_sq': np.zeros(n, dtype=np.float64),   # 每手净赢的平方和，用于方差和置信区间
+        'won': np.zeros(n, dtype=np.int64),        # 净赢为正的手数
+        'seat_net': np.zeros(n, dtype=np.int64),   # 按座位的净赢筹码
+        'actions': np.zeros((n, len(ACTIONS)), dtype=np.int64),
+        'showdowns': 0,
+        'unbalanced': 0,  # 结算前后筹码总数不一致的手数（派彩审计）
+        'aborted': 0
+    }
+
+
+def merge(results):
+    results = list(results)
+    total = dict(results[0])
+    for result in results[1:]:
+        for key, value in result.items():
+            total[key] = total[key] + value
+    return total
+
+
+def _resolve(strategies):
+    return [STRATEGIES[s] if isinstance(s, str) else s for s in strategies]
+
+
+# 在一张牌桌上打 n_hands 手，strategies 为策略函数或 STRATEGIES 中的名字，长度即座位数
+def simulate(n_hands, strategies, seed=0, settings=None):
+    funcs = _resolve(strategies)
+    n = len(funcs)
+    settings = dict(SETTINGS, **(settings or {}))
+    rng = random.Random(seed)
+    game = PokerGame('sim', settings)
+    for seat in range(n):
+        if not game.add_player(Player(f'seat{seat}', f'seat{seat}', None, settings['initialChips'])):
+            raise ValueError(f'策略数 {n} 超过座位上限 {settings["maxPlayers"]}')
+    stack = settings['initialChips']
+
+    net = [0] * n
+    net_sq = [0] * n
+    won = [0] * n
+    seat_net = [0] * n
+    actions = [[0] * len(ACTIONS) for _ in range(n)]
+    showdowns = unbalanced = aborted = 0
+
+    for hand in range(n_hands):
+        for player in game.players:
+            player.chips = stack
+        owner = [(seat + hand) % n for seat in range(n)]
+        # 人数不够时引擎不开局，座位数对每手都一样，第一手就会报错
+        ok, message = game.start_game(seed=rng.getrandbits(64))
+        if not ok:
+            raise ValueError(message)
+        player = game.players[game.current_player_index]
+        for _ in range(MAX_ACTIONS):
+            options = game.get_available_actions(player)
+            action, amount = funcs[owner[game.current_player_index]](game, player, options, rng)
+            if not game.process_action(player.id, action, amount)[0]:
+                game.process_action(player.id, 'check' if 'check' in options['actions'] else 'fold')
+            player = game.get_next_player()
+            if player is None:
+                break
+        else:
+            aborted += 1
+        if sum(not p.folded for p in game.players) > 1:
+            showdowns += 1
+        game.determine_winner(with_equity=False)
+
+        total = 0
+        for seat, player in enumerate(game.players):
+            s = owner[seat]
+            delta = player.chips - stack
+            total += delta
+            net[s] += delta
+            net_sq[s] += delta * delta
+            won[s] += delta > 0
+            seat_net[seat] += delta
+        unbalanced += total != 0
+        for seat, _, code, _ in game.actions:
+            actions[owner[seat]][code] += 1
+
+    return {
+        'hands': n_hands,
+        'net': np.array(net, dtype=np.int64),
+        'net_sq': np.array(net_sq, dtype=np.float64),
+        'won': np.array(won, dtype=np.int64),
+        'seat_net': np.array(seat_net, dtype=np.int64),
+        'actions': np.array(actions, dtype=np.int64),
+        'showdowns': showdowns,
+        'unbalanced': unbalanced,
+        'aborted': aborted
+    }
+
+
+# 多进程运行：按 shard_hands 手一片分到进程池，每片用由 seed 派生的独立种子
+def simulate_parallel(n_hands, strategies, seed=0, processes=None, shard_hands=10_000, settings=None):
+    shards = [min(shard_hands, n_hands - start) for start in range(0, n_hands, shard_hands)]
+    if not shards:
+        return empty_results(strategies)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(shards))]
+    processes = processes or os.cpu_count()
+    if processes == 1:
+        return merge(simulate(hands, strategies, s, settings) for hands, s in zip(shards, seeds))
+    with ProcessPoolExecutor(processes) as pool:
+        return merge(pool.map(simulate, shards, [strategies] * len(shards), seeds, [settings] * len(shards)))
+
+
+# 每个策略每百手赢得的大盲数及其95%置信区间半宽
+def bb_per_100(results, big_blind=SETTINGS['bigBlind']):
+    hands = max(results['hands'], 1)
+    mean = results['net'] / hands
+    variance = np.maximum(results['net_sq'] / hands - mean ** 2, 0)
+    return mean / big_blind * 100, 1.96 * np.sqrt(variance / hands) / big_blind * 100
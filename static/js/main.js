@@ -992,6 +992,18 @@ socket.on('chat_message', (data) => {
     }
 });
 
+// 服务端把一个节拍内的表情、聊天、离开通知合成一帧，逐条交给对应事件的处理函数
+socket.on('room_frame', (data) => {
+    data.events.forEach(([event, payload]) => {
+        socket.listeners(event).forEach(handler => handler(payload));
+    });
+});
+
+// 加入房间时收到的最近聊天记录
+socket.on('chat_history', (data) => {
+    data.messages.forEach(m => addChatMessage(m.username, m.message, m.timestamp));
+});
+
 // 添加聊天消息到聊天框
 function addChatMessage(username, message, timestamp = null) {
     const messageElement = document.createElement('div');
@@ -1471,6 +1483,15 @@ socket.on('room_created', function(data) {
     updateWaitingPlayers(data.players);
 });
 
+// 房间由其他服务器负责：切换地址重新连接后再加入
+socket.on('room_redirect', function(data) {
+    socket.io.uri = data.url;
+    socket.once('connect', function() {
+        socket.emit('join_room', data.join);
+    });
+    socket.disconnect().connect();
+});
+
 // 房间加入成功事件处理
 socket.on('room_joined', function(data) {
     // 更新房间号显示
@@ -1483,10 +1504,55 @@ socket.on('room_joined', function(data) {
     updateWaitingPlayers(data.players);
 });
 
-// 房间更新事件处理
-socket.on('room_update', function(data) {
+// 房间公共状态，服务端按版本号只发送变化的字段
+const tableState = { version: 0, fields: {}, players: {}, order: [] };
+
+function loadTableState(snapshot) {
+    tableState.version = snapshot.version;
+    tableState.fields = Object.assign({}, snapshot.fields);
+    tableState.players = {};
+    tableState.order = snapshot.players.map(player => {
+        tableState.players[player.id] = Object.assign({}, player);
+        return player.id;
+    });
+}
+
+// 房间状态差量处理，发现缺失版本时请求完整状态
+socket.on('table_delta', function(delta) {
+    if (delta.version <= tableState.version) {
+        return;
+    }
+    if (delta.version !== tableState.version + 1) {
+        socket.emit('request_snapshot');
+        return;
+    }
+    // 值为 null 的字段已被服务端删除
+    Object.entries(delta.fields || {}).forEach(([key, value]) => {
+        if (value === null) {
+            delete tableState.fields[key];
+        } else {
+            tableState.fields[key] = value;
+        }
+    });
+    Object.entries(delta.players || {}).forEach(([id, changes]) => {
+        tableState.players[id] = Object.assign(tableState.players[id] || {}, changes);
+    });
+    if (delta.order) {
+        // 不在新顺序里的玩家已离开
+        const players = {};
+        delta.order.forEach(id => { players[id] = tableState.players[id]; });
+        tableState.players = players;
+        tableState.order = delta.order;
+    }
+    tableState.version = delta.version;
+    
     // 更新玩家列表
-    updateWaitingPlayers(data.players);
+    updateWaitingPlayers(tableState.order.map(id => tableState.players[id]));
+});
+
+socket.on('table_state', function(snapshot) {
+    loadTableState(snapshot);
+    updateWaitingPlayers(tableState.order.map(id => tableState.players[id]));
 });
 
 // 游戏开始事件处理
@@ -16,15 +16,101 @@ const gameState = {
     }
 };
 
+// 牌桌公共状态，服务端按版本号只发送变化的字段
+const tableState = {
+    version: 0,
+    fields: {},
+    players: {},
+    order: []
+};
+
 // Socket.IO 连接
 let socket;
 let socketConnected = false;
 
+// 用完整状态覆盖本地状态（加入房间或版本号不连续时）
+function loadTableState(snapshot) {
+    tableState.version = snapshot.version;
+    tableState.fields = Object.assign({}, snapshot.fields);
+    tableState.players = {};
+    tableState.order = [];
+    snapshot.players.forEach(player => {
+        tableState.players[player.id] = Object.assign({}, player);
+        tableState.order.push(player.id);
+    });
+    onTableStateChanged();
+}
+
+// 应用状态差量，发现缺失版本时请求完整状态
+function applyTableDelta(delta) {
+    if (!gameState.room || delta.version <= tableState.version) {
+        return;
+    }
+    if (delta.version !== tableState.version + 1) {
+        socket.emit('request_snapshot');
+        return;
+    }
+    Object.entries(delta.fields || {}).forEach(([key, value]) => {
+        if (value === null) {
+            delete tableState.fields[key];
+        } else {
+            tableState.fields[key] = value;
+        }
+    });
+    Object.entries(delta.players || {}).forEach(([id, changes]) => {
+        tableState.players[id] = Object.assign(tableState.players[id] || {}, changes);
+    });
+    if (delta.order) {
+        const players = {};
+        delta.order.forEach(id => { players[id] = tableState.players[id]; });
+        tableState.players = players;
+        tableState.order = delta.order;
+    }
+    tableState.version = delta.version;
+    onTableStateChanged();
+}
+
+function onTableStateChanged() {
+    gameState.players = tableState.order.map(id => tableState.players[id]);
+    if (tableState.fields.status === 'waiting') {
+        updateWaitingPanel({ players: gameState.players });
+    }
+}
+
+// 二进制传输格式：加载了 MessagePack 库时向服务端申请，协商成功后服务端返回标签表
+const wireFormat = { tags: null, cardTags: [], suits: [] };
+
+function expandWire(value, tag) {
+    if (Array.isArray(value)) {
+        if (wireFormat.cardTags.includes(tag)) {
+            return value.map(code => ({ suit: wireFormat.suits[code & 3], value: (code >> 2) + 2 }));
+        }
+        return value.map(item => expandWire(item));
+    }
+    if (value && typeof value === 'object') {
+        const result = {};
+        Object.entries(value).forEach(([key, item]) => {
+            result[wireFormat.tags.get(key) || key] = expandWire(item, key);
+        });
+        return result;
+    }
+    return value;
+}
+
+// 二进制帧解码并还原字段名，JSON数据原样返回
+function decodeWire(data) {
+    if (!(data instanceof ArrayBuffer) || !wireFormat.tags) {
+        return data;
+    }
+    return expandWire(MessagePack.decode(new Uint8Array(data)));
+}
+
 // 初始化Socket.IO连接
-function initializeSocket() {
+// url 为空时连接当前服务器，房间在其他服务器上时连接服务端给出的地址
+function initializeSocket(url) {
     console.log('初始化Socket.IO连接...');
     
-    socket = io('/', {
+    socket = io(url || '/', {
         transports: ['websocket', 'polling'],
         reconnection: true,
         reconnectionAttempts: 5,
@@ -36,6 +122,18 @@ function initializeSocket() {
         console.log('Socket.IO连接成功');
         socketConnected = true;
         window.socket = socket;  // 保存到全局变量
+        if (window.MessagePack) {
+            socket.emit('set_wire_format', { format: 'msgpack' });
+        }
+    });
+    
+    // 传输格式协商结果
+    socket.on('wire_format', function(data) {
+        if (data.format === 'msgpack') {
+            wireFormat.tags = new Map(Object.entries(data.tags));
+            wireFormat.cardTags = data.cardTags;
+            wireFormat.suits = data.suits;
+        }
     });
     
     // 连接错误
@@ -85,15 +183,32 @@ function initializeSocket() {
         updateWaitingPanel(data);
     });
     
-    // 玩家列表更新
-    socket.on('player_list_updated', function(data) {
-        console.log('玩家列表更新:', data);
-        gameState.players = data.players;
-        updateWaitingPanel({ players: data.players });
+    // 房间由其他服务器负责：重新连接到那里再加入
+    socket.on('room_redirect', function(data) {
+        console.log('房间在其他服务器上，重新连接:', data.url);
+        socket.disconnect();
+        initializeSocket(data.url);
+        socket.once('connect', function() {
+            socket.emit('join_room', data.join);
+        });
+    });
+    
+    // 牌桌状态差量
+    socket.on('table_delta', data => applyTableDelta(decodeWire(data)));
+    
+    // 完整牌桌状态
+    socket.on('table_state', data => loadTableState(decodeWire(data)));
+    
+    // 服务端把一个节拍内的聊天合成一帧，逐条交给对应事件的处理函数
+    socket.on('room_frame', function(data) {
+        data.events.forEach(([event, payload]) => {
+            socket.listeners(event).forEach(handler => handler(payload));
+        });
     });
     
     // 游戏开始
     socket.on('game_start', function(data) {
+        data = decodeWire(data);
         console.log('游戏开始:', data);
         document.getElementById('waiting-panel').style.display = 'none';
         document.getElementById('game-screen').style.display = 'block';
@@ -0,0 +1,130 @@
+import bisect
+import hashlib
+import json
+
+# 房间目录: 所有工作进程共享的房间记录，以及房间到工作进程的一致性哈希
+#
+# 每个房间的实时状态（玩家、牌局、计时器）只在它所属的工作进程里；共享存储只保存
+# 可序列化的目录记录 {'owner', 'players', 'status', 'settings'}，用来判断房间是否存在、
+# 属于哪个进程以及统计全局房间数。单进程部署使用内存实现，多进程部署使用Redis。
+
+
+class RoomStore:
+    # 房间不存在时写入并返回True，已存在返回False（用于跨进程分配房间号）
+    def claim(self, room_id, record):
+        raise NotImplementedError
+
+    def get(self, room_id):
+        raise NotImplementedError
+
+    def put(self, room_id, record):
+        raise NotImplementedError
+
+    def delete(self, room_id):
+        raise NotImplementedError
+
+    def __contains__(self, room_id):
+        return self.get(room_id) is not None
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+class MemoryRoomStore(RoomStore):
+    def __init__(self):
+        self._rooms = {}
+
+    def claim(self, room_id, record):
+        if room_id in self._rooms:
+            return False
+        self._rooms[room_id] = dict(record)
+        return True
+
+    def get(self, room_id):
+        record = self._rooms.get(room_id)
+        return dict(record) if record is not None else None
+
+    def put(self, room_id, record):
+        self._rooms[room_id] = dict(record)
+
+    def delete(self, room_id):
+        self._rooms.pop(room_id, None)
+
+    def __contains__(self, room_id):
+        return room_id in self._rooms
+
+    def __len__(self):
+        return len(self._rooms)
+
+
+# 房间记录以JSON保存在一个Redis哈希里，任何兼容Redis协议的服务都可以使用
+class RedisRoomStore(RoomStore):
+    def __init__(self, url, key='poker:rooms'):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self.key = key
+
+    def claim(self, room_id, record):
+        return bool(self._redis.hsetnx(self.key, room_id, json.dumps(record)))
+
+    def get(self, room_id):
+        value = self._redis.hget(self.key, room_id)
+        return json.loads(value) if value is not None else None
+
+    def put(self, room_id, record):
+        self._redis.hset(self.key, room_id, json.dumps(record))
+
+    def delete(self, room_id):
+        self._redis.hdel(self.key, room_id)
+
+    def __contains__(self, room_id):
+        return bool(self._redis.hexists(self.key, room_id))
+
+    def __len__(self):
+        return self._redis.hlen(self.key)
+
+
+def create_store(url=None):
+    if not url or url.startswith('memory://'):
+        return MemoryRoomStore()
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisRoomStore(url)
+    raise ValueError(f'Unsupported room store: {url}')
+
+
+# 一致性哈希环: 增减工作进程时只有约 1/N 的房间换主
+class HashRing:
+    def __init__(self, nodes, replicas=100):
+        self.nodes = sorted(nodes)
+        self._points = []
+        self._owners = []
+        for point, node in sorted(
+            (_hash(f'{node}#{i}'), node) for node in self.nodes for i in range(replicas)
+        ):
+            self._points.append(point)
+            self._owners.append(node)
+
+    def node_for(self, key):
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+# 进程间必须一致，不能用内置hash()
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+# 解析 WORKERS 环境变量: "w0=http://host:5001,w1=http://host:5002"
+def parse_workers(spec, default_id):
+    workers = {}
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        worker_id, _, url = item.partition('=')
+        workers[worker_id.strip()] = url.strip()
+    if not workers:
+        return {default_id: ''}
+    if default_id not in workers:
+        raise ValueError(f'WORKER_ID {default_id} is not listed in WORKERS')
+    return workers
@@ -0,0 +1,82 @@
+import time
+from collections import deque
+
+# 房间节拍广播: 表情、聊天、进出房间这类不影响牌局的消息先放进房间的待发列表，
+# 每隔 interval 秒把每个房间攒下的消息合成一帧 room_frame({'events': [[事件, 数据], ...]}) 发出，
+# 一个节拍内只有一条消息时按原事件名发送。牌局状态、行动等消息不经过这里，照常立即发送。
+# 有人进出房间这类不急的状态变化用 touch 标记，节拍到时每个房间只调用一次 publish 发布状态差量。
+
+
+class RoomTicker:
+    def __init__(self, emit, interval=0.05, window=10.0, clock=time.monotonic, publish=None):
+        self.emit = emit  # emit(事件, 数据, room_id)
+        self.publish = publish  # publish(room_id)
+        self.interval = interval
+        self.window = window
+        self._clock = clock
+        self._pending = {}  # room_id -> [[事件, 数据], ...]
+        self._dirty = set()  # 等待发布状态的房间
+        self._recent = deque()  # (时间, 消息数, 帧数)，只保留最近 window 秒
+        self.events = 0
+        self.frames = 0
+        self.ticks = 0
+        self.touches = 0
+        self.publishes = 0
+
+    def queue(self, room_id, event, data):
+        batch = self._pending.get(room_id)
+        if batch is None:
+            batch = self._pending[room_id] = []
+        batch.append([event, data])
+
+    def touch(self, room_id):
+        self.touches += 1
+        self._dirty.add(room_id)
+
+    def forget(self, room_id):
+        self._pending.pop(room_id, None)
+        self._dirty.discard(room_id)
+
+    # 发出所有房间攒下的消息，返回本次发出的帧数
+    def flush(self):
+        if self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            for room_id in dirty:
+                self.publish(room_id)
+            self.publishes += len(dirty)
+        pending, self._pending = self._pending, {}
+        events = 0
+        for room_id, batch in pending.items():
+            events += len(batch)
+            if len(batch) == 1:
+                self.emit(batch[0][0], batch[0][1], room_id)
+            else:
+                self.emit('room_frame', {'events': batch}, room_id)
+        self.ticks += 1
+        self.events += events
+        self.frames += len(pending)
+        if events:
+            now = self._clock()
+            self._recent.append((now, events, len(pending)))
+            while self._recent[0][0] < now - self.window:
+                self._recent.popleft()
+        return len(pending)
+
+    def run(self, sleep):
+        while True:
+            sleep(self.interval)
+            self.flush()
+
+    def stats(self):
+        now = self._clock()
+        recent = [(e, f) for t, e, f in self._recent if t >= now - self.window]
+        saved = sum(e - f for e, f in recent)
+        return {
+            'interval_ms': self.interval * 1000,
+            'pending_rooms': len(self._pending),
+            'events': self.events,
+            'frames': self.frames,
+            'fanouts_saved': self.events - self.frames,
+            'fanouts_saved_per_second': round(saved / self.window, 2),
+            'state_publishes_saved': self.touches - self.publishes
+        }
@@ -0,0 +1,150 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# 分层时间轮: 所有决策计时器由一个后台协程驱动
+#
+# 计时器按到期的tick编号放入槽位: 与当前tick只在低 L+1 位(每位 SLOT_BITS)
+# 不同的计时器放在第L层。每前进一个tick只处理第0层的一个槽；低层转完一圈时
+# 把上一层对应槽里的计时器重新下放。arm/cancel/extend 都是字典操作，O(1)。
+
+SLOT_BITS = 8
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+LEVELS = 3
+
+
+class _Timer:
+    __slots__ = ('key', 'deadline', 'callback', 'args', 'level', 'slot')
+
+    def __init__(self, key, deadline, callback, args):
+        self.key = key
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.level = 0
+        self.slot = 0
+
+
+class TimingWheel:
+    def __init__(self, tick=0.1, clock=time.monotonic):
+        self.tick = tick
+        self._clock = clock
+        self._wheels = [[{} for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self._timers = {}
+        self._current = int(clock() / tick)
+        self._max_delta = (1 << (SLOT_BITS * LEVELS)) - 1
+        self._running = False
+        self.fired = 0
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    # earliest: 新设置的计时器最早在下一个tick触发；下放时可以在当前tick触发
+    def _place(self, timer, earliest=1):
+        current = self._current
+        deadline = min(max(timer.deadline, current + earliest), current + self._max_delta)
+        timer.deadline = deadline
+        diff = deadline ^ current
+        level = 0
+        while level < LEVELS - 1 and diff >> (SLOT_BITS * (level + 1)):
+            level += 1
+        slot = (deadline >> (SLOT_BITS * level)) & SLOT_MASK
+        timer.level = level
+        timer.slot = slot
+        self._wheels[level][slot][timer.key] = timer
+
+    # 正在触发的槽已被摘下，其中的计时器在这里找不到是正常的
+    def _unlink(self, timer):
+        self._wheels[timer.level][timer.slot].pop(timer.key, None)
+
+    # 驱动任务没有运行时 _current 不会前进；空闲很久之后设置第一个计时器前先对齐到当前时间，
+    # 否则按过期的tick计算的到期时间已经过去，第一次推进就会触发
+    def _resync(self):
+        if not self._running and not self._timers:
+            self._current = int(self._clock() / self.tick)
+
+    # 设置计时器，同一个key已有的计时器会被替换
+    def arm(self, key, delay, callback, *args):
+        self._resync()
+        old = self._timers.get(key)
+        if old is not None:
+            self._unlink(old)
+        timer = _Timer(key, self._current + int(round(delay / self.tick)), callback, args)
+        self._timers[key] = timer
+        self._place(timer)
+        return timer
+
+    def cancel(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        self._unlink(timer)
+        return True
+
+    # 延长已有计时器（时间银行），返回新的剩余秒数；计时器不存在返回None
+    def extend(self, key, seconds):
+        timer = self._timers.get(key)
+        if timer is None:
+            return None
+        self._unlink(timer)
+        timer.deadline += int(round(seconds / self.tick))
+        self._place(timer)
+        return self.remaining(key)
+
+    def remaining(self, key):
+        timer = self._timers.get(key)
+        if timer is None:
+            return None
+        return (timer.deadline - self._current) * self.tick
+
+    # 前进到now对应的tick，触发所有到期的计时器，返回触发数量
+    def advance(self, now=None):
+        target = int((self._clock() if now is None else now) / self.tick)
+        fired = 0
+        while self._current < target:
+            self._current += 1
+            current = self._current
+            # 低层转完一圈时从高层开始逐层下放
+            level = 1
+            while level < LEVELS and not (current & ((1 << (SLOT_BITS * level)) - 1)):
+                level += 1
+            for cascade in range(level - 1, 0, -1):
+                slot = (current >> (SLOT_BITS * cascade)) & SLOT_MASK
+                bucket = self._wheels[cascade][slot]
+                if bucket:
+                    self._wheels[cascade][slot] = {}
+                    for timer in bucket.values():
+                        self._place(timer, earliest=0)
+
+            slot = current & SLOT_MASK
+            bucket = self._wheels[0][slot]
+            if not bucket:
+                continue
+            self._wheels[0][slot] = {}
+            for key, timer in bucket.items():
+                # 同一批中先触发的回调可能已经取消或替换了它
+                if self._timers.get(key) is not timer:
+                    continue
+                del self._timers[key]
+                fired += 1
+                try:
+                    timer.callback(*timer.args)
+                except Exception:
+                    logger.exception(f'Timer callback failed: {key}')
+        self.fired += fired
+        return fired
+
+    # 后台驱动循环，sleep由调用方提供（如 socketio.sleep）
+    def run(self, sleep):
+        self._running = True
+        while self._running:
+            sleep(self.tick)
+            self.advance()
+
+    def stop(self):
+        self._running = False
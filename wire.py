@@ -0,0 +1,88 @@
+import msgpack
+
+from cards import SUITS, WireCard
+
+# 二进制传输格式: 客户端通过 set_wire_format 选择 msgpack 后，
+# 游戏事件以 MessagePack 帧发送，字段名换成短标签，牌换成整数编码(rank*4+suit)。
+# 未选择的客户端仍然收到JSON。标签表在协商时发给客户端，由客户端还原。
+
+JSON = 'json'
+MSGPACK = 'msgpack'
+FORMATS = (JSON, MSGPACK)
+
+TAGS = {
+    'version': 'v',
+    'fields': 'f',
+    'players': 'p',
+    'order': 'o',
+    'status': 's',
+    'id': 'i',
+    'username': 'u',
+    'avatar': 'a',
+    'chips': 'c',
+    'bet': 'b',
+    'folded': 'fd',
+    'all_in': 'ai',
+    'is_host': 'ih',
+    'isHost': 'h',
+    'cards': 'cd',
+    'pot': 'pt',
+    'pots': 'ps',
+    'amount': 'am',
+    'currentBet': 'cb',
+    'round': 'r',
+    'current_stage': 'rs',
+    'communityCards': 'cc',
+    'community_cards': 'cs',
+    'currentPlayer': 'cp',
+    'playerId': 'pi',
+    'availableActions': 'aa',
+    'action': 'ac',
+    'deadline': 'dl',
+    'timeBank': 'tb',
+    'small_blind': 'sb',
+    'big_blind': 'bb',
+    'winners': 'w',
+    'winnings': 'wn',
+    'hand': 'hd',
+    'category': 'ct',
+    'place': 'pl',
+    'showdown': 'sd',
+    'equity': 'eq',
+    'runouts': 'ro'
+}
+# 这些字段的值是牌的列表，客户端需要把整数还原成 {suit, value}
+CARD_KEYS = ('cards', 'communityCards', 'community_cards')
+
+assert len(set(TAGS.values())) == len(TAGS) and not set(TAGS.values()) & set(TAGS)
+
+_CARD_CODES = {(suit, rank + 2): rank * 4 + s for rank in range(13) for s, suit in enumerate(SUITS)}
+
+
+def compact(obj):
+    kind = type(obj)
+    if kind is WireCard:
+        return _CARD_CODES[(obj['suit'], obj['value'])]
+    if kind is dict:
+        return {TAGS.get(k, k): compact(v) for k, v in obj.items()}
+    if kind is list or kind is tuple:
+        return [compact(item) for item in obj]
+    return obj
+
+
+def pack(data):
+    return msgpack.packb(compact(data), use_bin_type=True)
+
+
+def unpack(frame):
+    return msgpack.unpackb(frame, raw=False)
+
+
+# 协商成功时发给客户端的标签表
+def schema():
+    return {
+        'format': MSGPACK,
+        'tags': {tag: key for key, tag in TAGS.items()},
+        'cardTags': sorted({TAGS[key] for key in CARD_KEYS}),
+        'suits': list(SUITS)
+    }